@@ -43,8 +43,9 @@ class MainWindow:
         self.text_area.insert("end", content)
 
     def display_tokens(self, file_path: str):
-        content = read_file_utf8(file_path)
-        lexer = Lexer(content)
         self.token_area.delete(1.0, "end")
-        for token in lexer.tokens():
-            self.token_area.insert("end", str(token) + "\n")
\ No newline at end of file
+        # Se tokeniza leyendo el archivo por trozos, sin volver a cargarlo entero
+        with open(file_path, "r", encoding="utf-8") as f:
+            lexer = Lexer.from_stream(f)
+            for token in lexer.tokens():
+                self.token_area.insert("end", str(token) + "\n")
\ No newline at end of file
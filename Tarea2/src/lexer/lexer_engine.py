@@ -1,8 +1,9 @@
 from __future__ import annotations
+import codecs
 from dataclasses import dataclass
 from enum import Enum, unique
 import re
-from typing import Iterator, Dict, Callable, Pattern
+from typing import Iterator, Dict, Callable, Pattern, IO, AnyStr
 
 @unique
 class Category(Enum):
@@ -22,6 +23,12 @@ class Token:
     line: int
     col: int
     value: int | None = None
+    # Posición del token en el texto fuente (en caracteres, desde el inicio)
+    offset: int = -1
+
+    @property
+    def position(self) -> tuple[int, int]:
+        return self.line, self.col
 
     def __str__(self) -> str:
         base = f"{self.category.value}:{self.kind} '{self.lexeme}' ({self.line}:{self.col})"
@@ -47,6 +54,16 @@ class TokenRegistry:
             "}": "RBRACE", ";": "SEMI",
         }
 
+    def kind_table(self) -> list[tuple[Category, str]]:
+        """Todos los pares (categoría, kind) que puede producir un lexer con
+        este registro (la tabla de kinds de los volcados binarios)."""
+        kinds = [(Category.KEYWORD, kind) for kind in self.keywords.values()]
+        kinds += [(Category.OPERATOR, kind) for kind in self.operators.values()]
+        kinds += [(Category.PUNCT, kind) for kind in self.punctuation.values()]
+        kinds += [(Category.IDENT, "ID"), (Category.LIT_INT, "INT"),
+                  (Category.ERROR, "UNKNOWN_CHAR"), (Category.EOF, "EOF")]
+        return list(dict.fromkeys(kinds))
+
     def _create_alternation(self, symbols: list[str]) -> str:
         if not symbols:
             return r"(?!x)x"
@@ -78,32 +95,33 @@ class TokenFactory:
             "PUNCT": self._create_punctuation,
         }
 
-    def create_token(self, token_type: str, lexeme: str, line: int, col: int) -> Token:
+    def create_token(self, token_type: str, lexeme: str, line: int, col: int,
+                     offset: int = -1) -> Token:
         creator = self._creators.get(token_type)
         if creator:
-            return creator(lexeme, line, col)
-        return self._create_error(lexeme, line, col)
+            return creator(lexeme, line, col, offset)
+        return self._create_error(lexeme, line, col, offset)
 
-    def _create_keyword(self, lexeme: str, line: int, col: int) -> Token:
+    def _create_keyword(self, lexeme: str, line: int, col: int, offset: int = -1) -> Token:
         kind = self.registry.keywords[lexeme]
-        return Token(Category.KEYWORD, kind, lexeme, line, col)
+        return Token(Category.KEYWORD, kind, lexeme, line, col, offset=offset)
 
-    def _create_identifier(self, lexeme: str, line: int, col: int) -> Token:
-        return Token(Category.IDENT, "ID", lexeme, line, col)
+    def _create_identifier(self, lexeme: str, line: int, col: int, offset: int = -1) -> Token:
+        return Token(Category.IDENT, "ID", lexeme, line, col, offset=offset)
 
-    def _create_integer(self, lexeme: str, line: int, col: int) -> Token:
-        return Token(Category.LIT_INT, "INT", lexeme, line, col, value=int(lexeme))
+    def _create_integer(self, lexeme: str, line: int, col: int, offset: int = -1) -> Token:
+        return Token(Category.LIT_INT, "INT", lexeme, line, col, value=int(lexeme), offset=offset)
 
-    def _create_operator(self, lexeme: str, line: int, col: int) -> Token:
+    def _create_operator(self, lexeme: str, line: int, col: int, offset: int = -1) -> Token:
         kind = self.registry.operators[lexeme]
-        return Token(Category.OPERATOR, kind, lexeme, line, col)
+        return Token(Category.OPERATOR, kind, lexeme, line, col, offset=offset)
 
-    def _create_punctuation(self, lexeme: str, line: int, col: int) -> Token:
+    def _create_punctuation(self, lexeme: str, line: int, col: int, offset: int = -1) -> Token:
         kind = self.registry.punctuation[lexeme]
-        return Token(Category.PUNCT, kind, lexeme, line, col)
+        return Token(Category.PUNCT, kind, lexeme, line, col, offset=offset)
 
-    def _create_error(self, lexeme: str, line: int, col: int) -> Token:
-        return Token(Category.ERROR, "UNKNOWN_CHAR", lexeme, line, col)
+    def _create_error(self, lexeme: str, line: int, col: int, offset: int = -1) -> Token:
+        return Token(Category.ERROR, "UNKNOWN_CHAR", lexeme, line, col, offset=offset)
 
 class PositionTracker:
     def __init__(self, line: int = 1, col: int = 1):
@@ -133,16 +151,58 @@ class PositionTracker:
             
         return start_line, start_col
 
+# Tamaño de lectura por defecto del modo streaming (caracteres o bytes)
+DEFAULT_CHUNK_SIZE = 1 << 16
+# Caracteres que el patrón puede necesitar ver después de un token (el \b
+# tras una palabra clave, "==" frente a "=") antes de aceptar el match
+STREAM_LOOKAHEAD = 8
+
+def read_chunks(stream: IO[AnyStr], chunk_size: int,
+                encoding: str = "utf-8") -> Iterator[str]:
+    """Lee stream por trozos; los bytes (archivos binarios, mmap) se decodifican
+    de forma incremental para no cortar caracteres multibyte."""
+    decoder = None
+    while True:
+        data = stream.read(chunk_size)
+        if isinstance(data, (bytes, bytearray)):
+            if decoder is None:
+                decoder = codecs.getincrementaldecoder(encoding)()
+            text = decoder.decode(data, final=not data)
+        else:
+            text = data
+        if text:
+            yield text
+        if not data:
+            return
+
 class Lexer:
     def __init__(self, text: str, registry: TokenRegistry | None = None):
         self.text = text
         self.pos = 0
+        # Offset en la entrada completa de text[0] (crece al descartar lo ya
+        # leído en modo streaming)
+        self.base = 0
         self.position_tracker = PositionTracker()
+        self.stream: IO[AnyStr] | None = None
+        self.chunk_size = DEFAULT_CHUNK_SIZE
         
         self.registry = registry or TokenRegistry()
         self.token_factory = TokenFactory(self.registry)
         self.pattern = self._compile_pattern()
 
+    @classmethod
+    def from_stream(cls, stream: IO[AnyStr], registry: TokenRegistry | None = None,
+                    chunk_size: int = DEFAULT_CHUNK_SIZE) -> Lexer:
+        """Lexer que lee un archivo abierto (texto o binario) o un mmap por trozos.
+
+        tokens() mantiene el mismo contrato, pero la memoria usada no depende
+        del tamaño de la entrada sino de chunk_size y del token más largo.
+        """
+        lexer = cls("", registry)
+        lexer.stream = stream
+        lexer.chunk_size = chunk_size
+        return lexer
+
     def _compile_pattern(self) -> Pattern[str]:
         pattern_str = self.registry.build_regex_pattern()
         return re.compile(pattern_str, re.VERBOSE)
@@ -151,17 +211,59 @@ class Lexer:
         self.pattern = self._compile_pattern()
 
     def tokens(self) -> Iterator[Token]:
+        if self.stream is not None:
+            yield from self._stream_tokens()
+            return
+
         while self.pos < len(self.text):
             token = self._next_token()
             if token:
                 yield token
 
         yield Token(Category.EOF, "EOF", "", 
-                   self.position_tracker.line, self.position_tracker.col)
+                   self.position_tracker.line, self.position_tracker.col,
+                   offset=self.base + self.pos)
+
+    def _stream_tokens(self) -> Iterator[Token]:
+        chunks = read_chunks(self.stream, self.chunk_size)
+        eof = False
+
+        def refill(keep_from: int) -> bool:
+            # Descarta lo consumido salvo un carácter de contexto para \b
+            chunk = next(chunks, None)
+            if chunk is None:
+                return False
+            self.text = self.text[keep_from:] + chunk
+            self.pos -= keep_from
+            self.base += keep_from
+            return True
+
+        while True:
+            # Se mantiene al menos un trozo completo por delante de pos
+            if not eof and len(self.text) - self.pos < self.chunk_size:
+                eof = not refill(max(self.pos - 1, 0))
+                continue
+            if self.pos >= len(self.text):
+                break
+
+            match = self.pattern.match(self.text, self.pos)
+            if not eof and match and match.end() + STREAM_LOOKAHEAD > len(self.text):
+                # El token podría continuar en el siguiente trozo
+                eof = not refill(0)
+                continue
+
+            token = self._token_from_match(match)
+            if token:
+                yield token
+
+        yield Token(Category.EOF, "EOF", "",
+                   self.position_tracker.line, self.position_tracker.col,
+                   offset=self.base + self.pos)
 
     def _next_token(self) -> Token | None:
-        match = self.pattern.match(self.text, self.pos)
-        
+        return self._token_from_match(self.pattern.match(self.text, self.pos))
+
+    def _token_from_match(self, match: re.Match[str] | None) -> Token | None:
         if not match:
             return self._handle_unknown_character()
 
@@ -173,11 +275,13 @@ class Lexer:
         if token_type in ("WS", "COMMENT"):
             return None
 
-        return self.token_factory.create_token(token_type, lexeme, start_line, start_col)
+        return self.token_factory.create_token(token_type, lexeme, start_line, start_col,
+                                               self.base + match.start())
 
     def _handle_unknown_character(self) -> Token:
         bad_char = self.text[self.pos]
         start_line, start_col = self.position_tracker.advance_single_char(bad_char)
         self.pos += 1
         
-        return self.token_factory._create_error(bad_char, start_line, start_col)
\ No newline at end of file
+        return self.token_factory._create_error(bad_char, start_line, start_col,
+                                                self.base + self.pos - 1)
\ No newline at end of file
@@ -0,0 +1,469 @@
+"""Formato binario de volcados de tokens, con lectura sin copias.
+
+Un volcado guarda una secuencia de tokens (de Lexer.tokens(), de un
+TokenBuffer o de cualquier objeto con category, kind, lexeme, offset,
+position y value) de forma autocontenida: no hace falta el texto fuente para
+leerlo. Este mismo módulo existe en Tarea2 y Tarea3 (cada copia usa el
+Category, el TokenRegistry y el Lexer de su árbol), así que el formato es
+común a los dos lexers; Tarea3/src/test_dump.py comprueba que cada árbol lee
+los volcados del otro y que las dos copias siguen iguales.
+
+Formato (versión 1, little-endian):
+
+    Cabecera fija, 64 bytes
+      0   magic        8 bytes  b"TOKDUMP\\0"
+      8   versión      u16      1
+      10  record_size  u16      32
+      12  flags        u32      bit 0: volcado completo (el escritor cerró)
+      16  count        u64      cantidad de registros
+      24  records_at   u64      offset de los registros
+      32  strings_at   u64      offset del pool de strings
+      40  values_at    u64      offset del pool de valores
+      48  end          u64      tamaño total del archivo
+      56  reservado    u64
+
+    Tablas (a partir del byte 64)
+      u16 cantidad de categorías, y por cada una: u16 largo + nombre UTF-8
+      u16 cantidad de kinds, y por cada uno: u16 índice de su categoría,
+          u16 largo + nombre UTF-8
+      relleno hasta múltiplo de 8
+
+    Registros: count registros de 32 bytes
+      0   kind     u16  índice en la tabla de kinds
+      2   flags    u8   reservado (0)
+      3   relleno  u8
+      4   length   u32  largo del lexema en caracteres
+      8   offset   u64  offset del token en el texto fuente
+      16  line     u32
+      20  col      u32
+      24  lexeme   u32  índice del lexema en el pool de strings
+      28  value    u32  índice en el pool de valores, 0xFFFFFFFF si no tiene
+
+    Pool de strings (lexemas sin repetir)
+      u64 cantidad n, u64 offsets[n + 1] (relativos al inicio de los datos),
+      datos UTF-8; relleno hasta múltiplo de 8
+
+    Pool de valores (sin repetir)
+      u64 cantidad, y por cada valor 16 bytes: u8 tipo, 7 de relleno y 8 de
+      contenido. Tipos: 1 entero (i64), 2 real (f64), 3 string (u64, índice
+      en el pool de strings), 4 entero que no cabe en i64 (u64, índice del
+      string con sus dígitos)
+
+TokenWriter escribe mientras el lexer escanea: los registros van directo al
+archivo por bloques y los pools se agregan al cerrar, cuando se reescribe la
+cabecera (el archivo tiene que admitir seek). TokenDump lee el archivo con
+mmap: abrir un volcado de 1 GB no lee los registros, y recorrerlo con
+records() reutiliza un único cursor en vez de crear un objeto por registro.
+
+Uso como programa (desde src):
+
+    python -m lexer.token_dump write FUENTE VOLCADO
+    python -m lexer.token_dump read VOLCADO [--limit N]
+"""
+from __future__ import annotations
+import mmap
+import struct
+import sys
+from array import array
+from typing import Any, BinaryIO, Iterable, Iterator, NamedTuple
+
+from .lexer_engine import Category
+
+MAGIC = b"TOKDUMP\0"
+VERSION = 1
+RECORD_SIZE = 32
+NO_VALUE = 0xFFFFFFFF
+COMPLETE = 1
+
+_HEADER = struct.Struct("<8sHHIQQQQQQ")
+_RECORD = struct.Struct("<HBxIQIIII")
+_VALUE = struct.Struct("<B7x8s")
+# Registros que TokenWriter acumula antes de escribir
+_FLUSH_RECORDS = 4096
+
+_INT, _REAL, _STRING, _BIG_INT = 1, 2, 3, 4
+_I64_MIN, _I64_MAX = -(1 << 63), (1 << 63) - 1
+
+assert _HEADER.size == 64 and _RECORD.size == RECORD_SIZE
+
+
+class UnknownCategory(NamedTuple):
+    """Categoría del volcado que el Category de este árbol no define (un
+    volcado de Tarea3 leído con Tarea2, por ejemplo); como un Category, su
+    nombre está en value."""
+    value: str
+
+
+def _aligned(size: int) -> int:
+    return (size + 7) & ~7
+
+
+def _encode_name(name: str) -> bytes:
+    data = name.encode("utf-8")
+    return struct.pack("<H", len(data)) + data
+
+
+class TokenWriter:
+    """Escribe un volcado en file (binario, con seek) a medida que llegan
+    los tokens.
+
+    kinds es la tabla de pares (Category, kind) que puede aparecer, en el
+    orden que tendrá en el archivo; por omisión la de un TokenRegistry nuevo
+    (TokenRegistry.kind_table()). Un token de otro kind es un ValueError.
+    """
+
+    def __init__(self, file: BinaryIO, kinds: Iterable[tuple[Category, str]] | None = None):
+        if kinds is None:
+            from .lexer_engine import TokenRegistry
+            kinds = TokenRegistry().kind_table()
+        self.file = file
+        self.kinds = list(kinds)
+        self._kind_index = {(category.value, kind): i
+                            for i, (category, kind) in enumerate(self.kinds)}
+        self.categories = list(dict.fromkeys(category for category, _ in self.kinds))
+        self.count = 0
+        self.closed = False
+        self._strings: dict[str, int] = {}
+        self._values: dict[tuple[type, Any], int] = {}
+        self._value_data = bytearray()
+        self._pending = bytearray()
+        self._start = file.tell()
+
+        tables = bytearray(struct.pack("<H", len(self.categories)))
+        category_index = {category: i for i, category in enumerate(self.categories)}
+        for category in self.categories:
+            tables += _encode_name(category.value)
+        tables += struct.pack("<H", len(self.kinds))
+        for category, kind in self.kinds:
+            tables += struct.pack("<H", category_index[category]) + _encode_name(kind)
+        tables += bytes(_aligned(len(tables)) - len(tables))
+        self.records_at = _HEADER.size + len(tables)
+        file.write(self._header(0, 0, 0, 0))
+        file.write(tables)
+
+    def _header(self, flags: int, strings_at: int, values_at: int, end: int) -> bytes:
+        return _HEADER.pack(MAGIC, VERSION, RECORD_SIZE, flags, self.count,
+                            self.records_at, strings_at, values_at, end, 0)
+
+    def _string(self, text: str) -> int:
+        index = self._strings.get(text)
+        if index is None:
+            index = self._strings[text] = len(self._strings)
+        return index
+
+    def _value(self, value: Any) -> int:
+        if value is None:
+            return NO_VALUE
+        key = (type(value), value)
+        index = self._values.get(key)
+        if index is not None:
+            return index
+        if isinstance(value, float):
+            entry = _VALUE.pack(_REAL, struct.pack("<d", value))
+        elif isinstance(value, int):
+            if _I64_MIN <= value <= _I64_MAX:
+                entry = _VALUE.pack(_INT, struct.pack("<q", value))
+            else:
+                entry = _VALUE.pack(_BIG_INT, struct.pack("<Q", self._string(str(value))))
+        elif isinstance(value, str):
+            entry = _VALUE.pack(_STRING, struct.pack("<Q", self._string(value)))
+        else:
+            raise TypeError(f"Valor no serializable: {value!r}")
+        index = self._values[key] = len(self._values)
+        self._value_data += entry
+        return index
+
+    def write(self, token) -> None:
+        kind = self._kind_index.get((token.category.value, token.kind))
+        if kind is None:
+            raise ValueError(f"Kind fuera de la tabla del volcado: "
+                             f"{token.category.value}/{token.kind}")
+        lexeme = token.lexeme
+        line, col = token.position
+        self._pending += _RECORD.pack(kind, 0, len(lexeme), token.offset, line, col,
+                                      self._string(lexeme), self._value(token.value))
+        self.count += 1
+        if len(self._pending) >= _FLUSH_RECORDS * RECORD_SIZE:
+            self.file.write(self._pending)
+            self._pending.clear()
+
+    def write_all(self, tokens: Iterable) -> int:
+        write = self.write
+        for token in tokens:
+            write(token)
+        return self.count
+
+    def close(self) -> None:
+        """Agrega los pools y reescribe la cabecera; el archivo queda abierto."""
+        if self.closed:
+            return
+        file = self.file
+        file.write(self._pending)
+        self._pending.clear()
+
+        strings_at = self.records_at + self.count * RECORD_SIZE
+        encoded = [text.encode("utf-8") for text in self._strings]
+        offsets = array("Q", [0])
+        for data in encoded:
+            offsets.append(offsets[-1] + len(data))
+        if sys.byteorder != "little":
+            offsets.byteswap()
+        blob = b"".join(encoded)
+        file.write(struct.pack("<Q", len(encoded)))
+        file.write(offsets.tobytes())
+        file.write(blob)
+        file.write(bytes(_aligned(len(blob)) - len(blob)))
+
+        values_at = strings_at + 8 + len(offsets) * 8 + _aligned(len(blob))
+        file.write(struct.pack("<Q", len(self._values)))
+        file.write(self._value_data)
+        end = values_at + 8 + len(self._value_data)
+
+        file.seek(self._start)
+        file.write(self._header(COMPLETE, strings_at, values_at, end))
+        file.seek(self._start + end)
+        self.closed = True
+
+    def __enter__(self) -> TokenWriter:
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        if exc_type is None:
+            self.close()
+
+
+def dump(tokens: Iterable, path: str,
+         kinds: Iterable[tuple[Category, str]] | None = None) -> int:
+    """Escribe tokens en path a medida que se generan; devuelve cuántos."""
+    with open(path, "wb") as file, TokenWriter(file, kinds) as writer:
+        return writer.write_all(tokens)
+
+
+class TokenRecord:
+    """Vista de un registro del volcado, con la interfaz de lectura de Token.
+
+    Los campos se leen del mapa de memoria al consultarlos; records()
+    reutiliza una sola instancia moviendo index.
+    """
+
+    __slots__ = ("dump", "index")
+
+    def __init__(self, dump: TokenDump, index: int):
+        self.dump = dump
+        self.index = index
+
+    @property
+    def kind(self) -> str:
+        return self.dump.kinds[self.dump._u16[self.index * 16]][1]
+
+    @property
+    def category(self) -> Category | UnknownCategory:
+        return self.dump.kinds[self.dump._u16[self.index * 16]][0]
+
+    @property
+    def length(self) -> int:
+        return self.dump._u32[self.index * 8 + 1]
+
+    @property
+    def offset(self) -> int:
+        return self.dump._u64[self.index * 4 + 1]
+
+    @property
+    def line(self) -> int:
+        return self.dump._u32[self.index * 8 + 4]
+
+    @property
+    def col(self) -> int:
+        return self.dump._u32[self.index * 8 + 5]
+
+    @property
+    def position(self) -> tuple[int, int]:
+        return self.line, self.col
+
+    @property
+    def lexeme(self) -> str:
+        return self.dump.string(self.dump._u32[self.index * 8 + 6])
+
+    @property
+    def value(self) -> int | float | str | None:
+        return self.dump.value(self.dump._u32[self.index * 8 + 7])
+
+    def __str__(self) -> str:
+        val_str = f" = {self.value}" if self.value is not None else ""
+        return (f"[{self.line}:{self.col}] {self.category.value:<14} "
+                f"{self.kind:<10} '{self.lexeme}'{val_str}")
+
+    def __repr__(self) -> str:
+        return f"TokenRecord({self.index}, {self.kind!r}, {self.lexeme!r})"
+
+
+class TokenDump:
+    """Volcado abierto para lectura sobre un mmap (o cualquier buffer).
+
+    Las columnas de los registros son memoryview del mismo mapa con distintos
+    formatos (u16, u32, u64), así que abrir el archivo no lee los registros y
+    leer un campo no copia nada.
+    """
+
+    def __init__(self, buffer):
+        self._mapping = buffer
+        view = memoryview(buffer)
+        if len(view) < _HEADER.size:
+            raise ValueError("El archivo no es un volcado de tokens")
+        (magic, version, record_size, flags, count, records_at, strings_at,
+         values_at, end, _) = _HEADER.unpack_from(view)
+        if magic != MAGIC:
+            raise ValueError("El archivo no es un volcado de tokens")
+        if version != VERSION or record_size != RECORD_SIZE:
+            raise ValueError(f"Versión de volcado no soportada: {version}")
+        if not flags & COMPLETE:
+            raise ValueError("Volcado incompleto (el escritor no se cerró)")
+        if len(view) < end:
+            raise ValueError("Volcado truncado")
+        self.count = count
+
+        position = _HEADER.size
+        categories = []
+        (n,) = struct.unpack_from("<H", view, position)
+        position += 2
+        for _ in range(n):
+            name, position = self._name(view, position)
+            try:
+                categories.append(Category(name))
+            except ValueError:
+                categories.append(UnknownCategory(name))
+        self.kinds: list[tuple[Category | UnknownCategory, str]] = []
+        (n,) = struct.unpack_from("<H", view, position)
+        position += 2
+        for _ in range(n):
+            (category,) = struct.unpack_from("<H", view, position)
+            name, position = self._name(view, position + 2)
+            self.kinds.append((categories[category], name))
+
+        records = view[records_at:records_at + count * RECORD_SIZE]
+        self._u16 = self._column(records, "H")
+        self._u32 = self._column(records, "I")
+        self._u64 = self._column(records, "Q")
+
+        (n,) = struct.unpack_from("<Q", view, strings_at)
+        self._string_offsets = self._column(view[strings_at + 8:strings_at + 16 + n * 8], "Q")
+        self._string_data = view[strings_at + 16 + n * 8:values_at]
+        self._strings: dict[int, str] = {}
+        (n,) = struct.unpack_from("<Q", view, values_at)
+        self._value_data = view[values_at + 8:values_at + 8 + n * _VALUE.size]
+        self._values: dict[int, Any] = {}
+
+    @classmethod
+    def open(cls, path: str) -> TokenDump:
+        with open(path, "rb") as file:
+            return cls(mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ))
+
+    @staticmethod
+    def _name(view: memoryview, position: int) -> tuple[str, int]:
+        (size,) = struct.unpack_from("<H", view, position)
+        start = position + 2
+        return bytes(view[start:start + size]).decode("utf-8"), start + size
+
+    @staticmethod
+    def _column(view: memoryview, typecode: str):
+        if sys.byteorder == "little":
+            return view.cast(typecode)
+        column = array(typecode, view.tobytes())  # Único caso con copia
+        column.byteswap()
+        return column
+
+    def string(self, index: int) -> str:
+        text = self._strings.get(index)
+        if text is None:
+            offsets = self._string_offsets
+            data = self._string_data[offsets[index]:offsets[index + 1]]
+            text = self._strings[index] = str(data, "utf-8")
+        return text
+
+    def value(self, index: int) -> int | float | str | None:
+        if index == NO_VALUE:
+            return None
+        value = self._values.get(index)
+        if value is None:
+            tag, payload = _VALUE.unpack_from(self._value_data, index * _VALUE.size)
+            if tag == _INT:
+                (value,) = struct.unpack("<q", payload)
+            elif tag == _REAL:
+                (value,) = struct.unpack("<d", payload)
+            elif tag == _STRING:
+                value = self.string(struct.unpack("<Q", payload)[0])
+            elif tag == _BIG_INT:
+                value = int(self.string(struct.unpack("<Q", payload)[0]))
+            else:
+                raise ValueError(f"Tipo de valor desconocido en el volcado: {tag}")
+            self._values[index] = value
+        return value
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, index: int) -> TokenRecord:
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError("índice de token fuera de rango")
+        return TokenRecord(self, index)
+
+    def records(self) -> Iterator[TokenRecord]:
+        """Recorre los registros con un único cursor: el objeto entregado es
+        siempre el mismo y solo cambia su índice."""
+        cursor = TokenRecord(self, 0)
+        for index in range(self.count):
+            cursor.index = index
+            yield cursor
+
+    def __iter__(self) -> Iterator[TokenRecord]:
+        return self.records()
+
+    def tokens(self) -> Iterator[TokenRecord]:
+        """Un TokenRecord propio por token, para quien los guarde."""
+        for index in range(self.count):
+            yield TokenRecord(self, index)
+
+    def kind_counts(self) -> dict[str, int]:
+        """Tokens por kind, contados sobre la columna sin crear registros."""
+        counts = [0] * len(self.kinds)
+        for kind in self._u16[::16]:
+            counts[kind] += 1
+        return {self.kinds[i][1]: count for i, count in enumerate(counts) if count}
+
+
+def main(argv: list[str] | None = None) -> int:
+    import argparse
+    import time
+    from .lexer_engine import Lexer
+
+    parser = argparse.ArgumentParser(prog="python -m lexer.token_dump",
+                                     description="Volcados binarios de tokens")
+    commands = parser.add_subparsers(dest="command", required=True)
+    write = commands.add_parser("write", help="tokenizar un archivo y volcar sus tokens")
+    write.add_argument("source")
+    write.add_argument("output")
+    read = commands.add_parser("read", help="mostrar los tokens de un volcado")
+    read.add_argument("dump")
+    read.add_argument("--limit", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    if args.command == "write":
+        with open(args.source, "rb") as source:
+            count = dump(Lexer.from_stream(source).tokens(), args.output)
+        print(f"{count} tokens volcados en {time.perf_counter() - start:.2f} s",
+              file=sys.stderr)
+        return 0
+
+    tokens = TokenDump.open(args.dump)
+    for index, record in enumerate(tokens.records()):
+        if args.limit is not None and index >= args.limit:
+            break
+        print(record)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,167 @@
+"""Análisis léxico por lotes de directorios completos de Fortran 77.
+
+Uso (desde Tarea3/src):
+
+    python batch.py CARPETA [CARPETA|ARCHIVO ...] [-j N] [--ext .f .for]
+                    [--max-errors N] [--max-error-ratio R] [--cache [DIR]]
+
+Los archivos se reparten entre procesos; cada proceso mantiene un único
+Lexer ya compilado y devuelve solo un resumen compacto por archivo. Con
+--max-errors / --max-error-ratio se abandona cada archivo que no parece
+Fortran (binarios, otra codificación) en lugar de tokenizarlo entero. Con
+--cache los tokens de cada archivo se guardan en una caché en disco indexada
+por contenido (lexer.token_cache): en la corrida siguiente los archivos que no
+cambiaron solo se leen para calcular su hash.
+"""
+from __future__ import annotations
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator
+
+from lexer.lexer_engine import Lexer, TokenRegistry, TooManyLexicalErrors
+from lexer.token_buffer import TokenBuffer
+from lexer.token_cache import DEFAULT_MAX_BYTES, TokenCache, default_cache_dir
+
+DEFAULT_EXTENSIONS = (".f", ".for", ".f77")
+
+
+@dataclass
+class FileResult:
+    path: str
+    size: int
+    tokens: int = 0
+    categories: Dict[str, int] = field(default_factory=dict)
+    error: str | None = None
+
+
+# Lexer "caliente" de cada proceso trabajador y su caché de tokens (si hay)
+_worker_lexer: Lexer | None = None
+_worker_cache: TokenCache | None = None
+
+
+def _init_worker(fixed_form: bool = True, max_errors: int | None = None,
+                 max_error_ratio: float | None = None, cache_dir: str | None = None,
+                 cache_bytes: int = DEFAULT_MAX_BYTES) -> None:
+    global _worker_lexer, _worker_cache
+    _worker_lexer = Lexer(registry=TokenRegistry(), fixed_form=fixed_form,
+                          max_errors=max_errors, max_error_ratio=max_error_ratio)
+    _worker_cache = TokenCache(cache_dir, cache_bytes) if cache_dir is not None else None
+
+
+def lex_file(path: str) -> FileResult:
+    if _worker_lexer is None:
+        _init_worker()
+    try:
+        if _worker_cache is not None:
+            with open(path, "rb") as file:
+                data = file.read()
+            tokens = _worker_cache.tokenize(data, _worker_lexer)
+            size = len(data)
+        else:
+            with open(path, "r", encoding="utf-8", errors="replace") as file:
+                text = file.read()
+            tokens = TokenBuffer.from_lexer(_worker_lexer, text)
+            size = len(text.encode("utf-8"))
+    except (OSError, TooManyLexicalErrors) as e:
+        return FileResult(path, 0, error=str(e))
+    return FileResult(path, size, len(tokens), tokens.category_counts())
+
+
+def collect_files(paths: Iterable[str], extensions: tuple[str, ...]) -> Iterator[str]:
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                for name in sorted(names):
+                    if name.lower().endswith(extensions):
+                        yield os.path.join(root, name)
+        else:
+            yield path
+
+
+def run_batch(files: list[str], jobs: int, fixed_form: bool = True,
+              max_errors: int | None = None, max_error_ratio: float | None = None,
+              cache_dir: str | None = None,
+              cache_bytes: int = DEFAULT_MAX_BYTES) -> Iterator[FileResult]:
+    options = (fixed_form, max_errors, max_error_ratio, cache_dir, cache_bytes)
+    if jobs <= 1:
+        _init_worker(*options)
+        yield from map(lex_file, files)
+        return
+
+    # Varios archivos por envío para que el costo de IPC no domine en
+    # corpus de miles de archivos pequeños
+    chunksize = max(1, len(files) // (jobs * 8))
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                             initargs=options) as executor:
+        yield from executor.map(lex_file, files, chunksize=chunksize)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Lexer de Fortran 77 por lotes")
+    parser.add_argument("paths", nargs="+", help="archivos o carpetas a analizar")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1,
+                        help="cantidad de procesos (1 = sin pool)")
+    parser.add_argument("--ext", nargs="+", default=list(DEFAULT_EXTENSIONS),
+                        help="extensiones a incluir al recorrer carpetas")
+    parser.add_argument("--free-form", action="store_true",
+                        help="no aplicar las reglas de columnas del formato fijo")
+    parser.add_argument("--max-errors", type=int, default=None,
+                        help="abandonar un archivo al superar N errores léxicos")
+    parser.add_argument("--max-error-ratio", type=float, default=None,
+                        help="abandonar un archivo si la fracción de caracteres "
+                             "erróneos supera R (0-1)")
+    parser.add_argument("--cache", nargs="?", const=default_cache_dir(), default=None,
+                        metavar="DIR", help="usar la caché de tokens en disco "
+                                            f"(por omisión en {default_cache_dir()})")
+    parser.add_argument("--cache-size", type=int, default=DEFAULT_MAX_BYTES // 2 ** 20,
+                        metavar="MB", help="tamaño máximo de la caché")
+    parser.add_argument("-v", "--verbose", action="store_true",
+                        help="mostrar el resultado de cada archivo")
+    args = parser.parse_args(argv)
+
+    files = list(collect_files(args.paths, tuple(e.lower() for e in args.ext)))
+    if not files:
+        print("No se encontraron archivos Fortran.")
+        return 1
+
+    start = time.perf_counter()
+    total_bytes = total_tokens = 0
+    categories: Dict[str, int] = {}
+    failed: list[FileResult] = []
+
+    for result in run_batch(files, args.jobs, not args.free_form,
+                            args.max_errors, args.max_error_ratio,
+                            args.cache, args.cache_size * 2 ** 20):
+        if result.error is not None:
+            failed.append(result)
+            continue
+        total_bytes += result.size
+        total_tokens += result.tokens
+        for cat, count in result.categories.items():
+            categories[cat] = categories.get(cat, 0) + count
+        if args.verbose:
+            print(f"{result.path}: {result.tokens} tokens")
+
+    elapsed = time.perf_counter() - start
+
+    print(f"\nArchivos analizados: {len(files) - len(failed)} de {len(files)}")
+    print(f"Total de tokens: {total_tokens}")
+    print("\nTokens por categoría:")
+    for cat, count in sorted(categories.items()):
+        print(f"  {cat}: {count}")
+
+    print(f"\nTiempo: {elapsed:.2f} s con {args.jobs} proceso(s)")
+    print(f"Rendimiento: {total_bytes / 1e6 / elapsed:.2f} MB/s, "
+          f"{total_tokens / elapsed:,.0f} tokens/s")
+
+    for result in failed:
+        print(f"Error en {result.path}: {result.error}", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
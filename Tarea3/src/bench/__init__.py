@@ -0,0 +1,10 @@
+"""Benchmarks del lexer y los parsers de Fortran 77.
+
+Se ejecutan como módulos desde Tarea3/src, por ejemplo:
+
+    python -m bench.positions
+    python -m bench run --sizes 1KB 1MB --output resultados.json
+
+`python -m bench` es la suite completa (ver bench/__main__.py): genera
+programas sintéticos con bench.generator y mide con bench.runners.
+"""
@@ -0,0 +1,173 @@
+"""Suite de benchmarks: genera programas sintéticos, mide el lexer y los
+parsers y compara contra una línea base.
+
+    python -m bench run --sizes 1KB 1MB 16MB --output resultados.json
+    python -m bench run --baseline base.json        # corre y compara
+    python -m bench compare base.json resultados.json --threshold 0.1
+    python -m bench generate 10MB programa.f --seed 3
+"""
+from __future__ import annotations
+import argparse
+import json
+import platform
+import sys
+import time
+
+from bench.generator import GeneratorConfig, format_size, parse_size, write_program
+from bench.runners import RUNNERS, measure_isolated
+
+DEFAULT_SIZES = ("1KB", "64KB", "1MB")
+DEFAULT_THRESHOLD = 0.10
+
+# Métrica -> True si un valor mayor es mejor
+METRICS = {
+    "tokens_per_sec": True,
+    "rss_peak_kb": False,
+    "alloc_peak_bytes": False,
+}
+
+
+def _add_generator_options(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--expr-depth", type=int, default=4,
+                        help="operadores por expresión como máximo")
+    parser.add_argument("--if-depth", type=int, default=2,
+                        help="anidamiento máximo de IF")
+    parser.add_argument("--comment-ratio", type=float, default=0.1,
+                        help="fracción de líneas de comentario")
+
+
+def _config(args: argparse.Namespace, size: int) -> GeneratorConfig:
+    return GeneratorConfig(size=size, seed=args.seed, expr_depth=args.expr_depth,
+                           if_depth=args.if_depth, comment_ratio=args.comment_ratio)
+
+
+def run(args: argparse.Namespace) -> int:
+    results = []
+    for size in map(parse_size, args.sizes):
+        config = _config(args, size)
+        for runner in args.runners:
+            result = measure_isolated(runner, config, args.repeat, not args.no_alloc)
+            results.append(result.to_dict())
+            if result.error:
+                print(f"{runner:<7} {result.size:>6}  ERROR {result.error}")
+            else:
+                alloc = (f"{result.alloc_peak_bytes / 1024:10,.0f} KB asig."
+                         if result.alloc_peak_bytes is not None else "")
+                print(f"{runner:<7} {result.size:>6}  {result.tokens:>10} tokens  "
+                      f"{result.tokens_per_sec:>12,.0f} tokens/s  "
+                      f"{result.rss_peak_kb or 0:>8,} KB RSS  {alloc}")
+
+    report = {
+        "meta": {
+            "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": args.seed, "expr_depth": args.expr_depth,
+            "if_depth": args.if_depth, "comment_ratio": args.comment_ratio,
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+        print(f"\nResultados guardados en {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as file:
+            return 1 if compare_reports(json.load(file), report, args.threshold) else 0
+    return 0
+
+
+def compare_reports(baseline: dict, current: dict, threshold: float) -> list[str]:
+    """Imprime la comparación caso a caso y devuelve las regresiones."""
+    base_by_case = {(r["runner"], r["size"]): r for r in baseline["results"]}
+    regressions: list[str] = []
+
+    print(f"\nComparación con la línea base (umbral {threshold:.0%}):")
+    for result in current["results"]:
+        case = (result["runner"], result["size"])
+        base = base_by_case.get(case)
+        label = f"{case[0]} {case[1]}"
+        if base is None:
+            print(f"  {label:<16} sin línea base")
+            continue
+        if result["error"] and not base["error"]:
+            regressions.append(f"{label}: ahora falla ({result['error']})")
+            print(f"  {label:<16} REGRESIÓN: ahora falla")
+            continue
+
+        for metric, higher_is_better in METRICS.items():
+            old, new = base.get(metric), result.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            worse = -change if higher_is_better else change
+            flag = "REGRESIÓN" if worse > threshold else "ok"
+            print(f"  {label:<16} {metric:<17} {old:>14,.0f} -> {new:>14,.0f}  "
+                  f"{change:+7.1%}  {flag}")
+            if worse > threshold:
+                regressions.append(f"{label}: {metric} {change:+.1%}")
+
+    if regressions:
+        print(f"\n{len(regressions)} regresión(es):")
+        for regression in regressions:
+            print(f"  - {regression}")
+    else:
+        print("\nSin regresiones.")
+    return regressions
+
+
+def compare(args: argparse.Namespace) -> int:
+    with open(args.baseline, encoding="utf-8") as file:
+        baseline = json.load(file)
+    with open(args.current, encoding="utf-8") as file:
+        current = json.load(file)
+    return 1 if compare_reports(baseline, current, args.threshold) else 0
+
+
+def generate(args: argparse.Namespace) -> int:
+    size = write_program(args.path, _config(args, parse_size(args.size)))
+    print(f"{args.path}: {format_size(size) if size % 1024 == 0 else f'{size} bytes'}")
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m bench", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="ejecutar los benchmarks")
+    run_parser.add_argument("--sizes", nargs="+", default=list(DEFAULT_SIZES),
+                            help="tamaños de los programas (1KB a 500MB)")
+    run_parser.add_argument("--runners", nargs="+", choices=sorted(RUNNERS),
+                            default=list(RUNNERS))
+    run_parser.add_argument("--repeat", type=int, default=3,
+                            help="corridas por caso (se toma la mejor)")
+    run_parser.add_argument("--no-alloc", action="store_true",
+                            help="no medir asignaciones con tracemalloc")
+    run_parser.add_argument("--output", help="archivo JSON de resultados")
+    run_parser.add_argument("--baseline", help="JSON con el que comparar al terminar")
+    run_parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    _add_generator_options(run_parser)
+    run_parser.set_defaults(handler=run)
+
+    compare_parser = commands.add_parser("compare", help="comparar dos resultados JSON")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    compare_parser.set_defaults(handler=compare)
+
+    generate_parser = commands.add_parser("generate", help="escribir un programa sintético")
+    generate_parser.add_argument("size")
+    generate_parser.add_argument("path")
+    _add_generator_options(generate_parser)
+    generate_parser.set_defaults(handler=generate)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,160 @@
+"""Compara la ejecución de programas traducidos a Python (lexer.codegen) con
+un intérprete ingenuo que recorre el árbol en cada ejecución y, si NumPy
+está instalado, con la ejecución vectorizada (lexer.vectorized), que hace
+todas las ejecuciones a la vez.
+
+Se genera un programa, se ejecuta muchas veces con valores iniciales
+distintos y se comprueba que los motores den exactamente lo mismo.
+
+    python -m bench.execution --size-kb 64 --runs 200
+"""
+from __future__ import annotations
+import argparse
+import random
+import time
+
+from lexer.ast_nodes import Assignment, Constant, If, Name, Node, Program, UnaryOp
+from lexer.codegen import compile_program, program_variables
+from lexer.lexer_engine import Lexer
+from lexer.parser import Parser
+from lexer.runtime import (INTEGER_MAX, INTEGER_MIN, binary_type, convert, integer_div,
+                           integer_pow, real_div, real_pow, wrap_integer)
+from lexer.vectorized import VectorizedProgram
+from bench.generator import GeneratorConfig, generate_program
+
+_COMPARISONS = {
+    "EQ": lambda a, b: a == b, "NE": lambda a, b: a != b,
+    "LT": lambda a, b: a < b, "LE": lambda a, b: a <= b,
+    "GT": lambda a, b: a > b, "GE": lambda a, b: a >= b,
+}
+
+
+class TreeInterpreter:
+    """Evalúa el árbol directamente: un diccionario de variables y una
+    llamada recursiva por nodo, con la misma semántica de lexer.runtime.
+    Reduce cada resultado INTEGER a 32 bits, tal como dice la regla, sin el
+    atajo de los otros motores."""
+
+    def __init__(self, program: Program):
+        self.program = program
+        self.types = program_variables(program)
+
+    def run(self, inputs: dict | None = None) -> dict:
+        variables = {name: 0 if type_name == "INTEGER" else 0.0
+                     for name, type_name in self.types.items()}
+        for name, value in (inputs or {}).items():
+            variables[name] = convert(value, self.types[name])
+        self.execute(self.program.statements, variables)
+        return variables
+
+    def execute(self, statements: list[Node], variables: dict) -> None:
+        for statement in statements:
+            if isinstance(statement, Assignment):
+                name = statement.target.name
+                value, _ = self.evaluate(statement.value, variables)
+                variables[name] = convert(value, self.types[name])
+            elif isinstance(statement, If):
+                condition, _ = self.evaluate(statement.condition, variables)
+                if condition:
+                    self.execute(statement.body, variables)
+
+    def evaluate(self, node: Node, variables: dict) -> tuple:
+        if isinstance(node, Name):
+            return variables[node.name], self.types[node.name]
+        if isinstance(node, Constant):
+            if node.kind == "INT":
+                return wrap_integer(node.value), "INTEGER"
+            return node.value, "REAL"
+        if isinstance(node, UnaryOp):
+            value, type_name = self.evaluate(node.operand, variables)
+            if node.op == "MINUS":
+                value = wrap_integer(-value) if type_name == "INTEGER" else -value
+            return value, type_name
+        left, left_type = self.evaluate(node.left, variables)
+        right, right_type = self.evaluate(node.right, variables)
+        type_name = binary_type(node.op, left_type, right_type)
+        op = node.op
+        if op in _COMPARISONS:
+            return _COMPARISONS[op](left, right), type_name
+        if op == "PLUS":
+            value = left + right
+        elif op == "MINUS":
+            value = left - right
+        elif op == "MULT":
+            value = left * right
+        elif op == "DIV":
+            if type_name != "INTEGER":
+                return real_div(left, right), type_name
+            value = integer_div(left, right)
+        elif type_name == "INTEGER":
+            return integer_pow(left, right), type_name
+        else:
+            return real_pow(left, right), type_name
+        return (wrap_integer(value) if type_name == "INTEGER" else value), type_name
+
+
+def timed(label: str, run, inputs: list[dict]) -> tuple[float, list]:
+    start = time.perf_counter()
+    results = [run(values) for values in inputs]
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<34} {elapsed:8.3f} s   {len(inputs) / elapsed:10,.1f} ejecuciones/s")
+    return elapsed, results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size-kb", type=int, default=64,
+                        help="tamaño aproximado del programa generado (KB)")
+    parser.add_argument("--runs", type=int, default=200,
+                        help="ejecuciones con valores iniciales distintos")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    text = generate_program(GeneratorConfig(size=args.size_kb * 1024, seed=args.seed,
+                                            comment_ratio=0.0, constant_divisors=True))
+    program = Parser(Lexer(text)).parse_programa()
+    print(f"Programa generado: {len(text) / 1024:.0f} KB, "
+          f"{len(program.statements)} sentencias de primer nivel")
+
+    start = time.perf_counter()
+    compiled = compile_program(program)
+    cold = time.perf_counter() - start
+    start = time.perf_counter()
+    compile_program(program)
+    warm = time.perf_counter() - start
+    print(f"  traducción y compile()             {cold:8.3f} s")
+    print(f"  traducción con la caché            {warm:8.3f} s")
+
+    rng = random.Random(args.seed)
+    names = [declaration.target.name for declaration in program.declarations]
+    # Una de cada cuatro ejecuciones usa valores de todo el rango de INTEGER,
+    # para que los motores también coincidan cuando las expresiones desbordan
+    inputs = [{name: rng.randint(INTEGER_MIN, INTEGER_MAX) if run % 4 == 3
+               else rng.randint(-1000, 1000) for name in names}
+              for run in range(args.runs)]
+
+    interpreted, expected = timed("intérprete del árbol", TreeInterpreter(program).run, inputs)
+    generated, results = timed("código Python generado", compiled.run, inputs)
+    # repr: nan == nan es falso, pero ambos motores deben dar el mismo nan
+    if any(repr(a) != repr(b) for a, b in zip(expected, results)):
+        raise SystemExit("Los resultados de los dos motores difieren")
+    print(f"  Aceleración: {interpreted / generated:.1f}x")
+
+    try:
+        import numpy
+    except ImportError:
+        return
+    table = {name: numpy.array([values[name] for values in inputs]) for name in names}
+    start = time.perf_counter()
+    columns = VectorizedProgram(program).run(table)
+    vectorized = time.perf_counter() - start
+    print(f"  {'NumPy vectorizado':<34} {vectorized:8.3f} s   "
+          f"{len(inputs) / vectorized:10,.1f} ejecuciones/s")
+    for row, values in enumerate(results):
+        if any(repr(value) != repr(columns[name][row].item()) for name, value in values.items()):
+            raise SystemExit("La ejecución vectorizada difiere del código generado")
+    print(f"  Aceleración sobre el código generado: {generated / vectorized:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
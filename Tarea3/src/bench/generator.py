@@ -0,0 +1,170 @@
+"""Generador reproducible de programas Fortran 77 sintéticos.
+
+Los programas usan solo el subconjunto que aceptan Parser y LL1Parser
+(PROGRAM, declaraciones INTEGER/REAL, asignaciones con + - * / ** e IF ... THEN
+... ENDIF con un operador relacional), así que sirven tanto para medir el
+lexer como los parsers. La misma configuración (incluida la semilla) produce
+siempre el mismo texto.
+"""
+from __future__ import annotations
+import random
+from dataclasses import dataclass
+from typing import Iterator
+
+_UNITS = {"B": 1, "KB": 1024, "MB": 1024 ** 2, "GB": 1024 ** 3}
+
+ARITHMETIC_OPS = ("+", "-", "*", "/", "**")
+RELATIONAL_OPS = (".EQ.", ".NE.", ".LT.", ".LE.", ".GT.", ".GE.")
+COMMENT_WORDS = ("calcula", "valor", "del", "indice", "temporal", "suma", "total",
+                 "ver", "rutina", "anterior", "resultado", "contador")
+
+MIN_SIZE = 1024
+MAX_SIZE = 500 * 1024 ** 2
+
+
+def parse_size(text: str) -> int:
+    """Convierte "64KB", "1.5MB" o "2048" a bytes."""
+    text = text.strip().upper()
+    for unit in sorted(_UNITS, key=len, reverse=True):
+        if text.endswith(unit):
+            return int(float(text[:-len(unit)]) * _UNITS[unit])
+    return int(text)
+
+
+def format_size(size: int) -> str:
+    for unit in ("GB", "MB", "KB"):
+        if size >= _UNITS[unit] and size % _UNITS[unit] == 0:
+            return f"{size // _UNITS[unit]}{unit}"
+    return f"{size}B"
+
+
+@dataclass(frozen=True)
+class GeneratorConfig:
+    size: int = 64 * 1024       # tamaño aproximado del programa en bytes
+    seed: int = 0
+    expr_depth: int = 4         # operadores por expresión como máximo
+    if_depth: int = 2           # anidamiento máximo de IF
+    comment_ratio: float = 0.1  # fracción de líneas de comentario
+    variables: int = 32
+    # Divisores siempre constantes distintas de cero y exponentes que no son
+    # INTEGER negativos, para programas que se ejecutan (dividir un INTEGER
+    # por cero o elevar 0 a un exponente negativo es un error)
+    constant_divisors: bool = False
+
+    def __post_init__(self):
+        if not MIN_SIZE <= self.size <= MAX_SIZE:
+            raise ValueError(f"El tamaño debe estar entre {format_size(MIN_SIZE)} "
+                             f"y {format_size(MAX_SIZE)}")
+        if self.expr_depth < 0 or self.if_depth < 0 or self.variables < 1:
+            raise ValueError("Profundidades y cantidad de variables deben ser positivas")
+        if not 0.0 <= self.comment_ratio < 1.0:
+            raise ValueError("comment_ratio debe estar en [0, 1)")
+
+
+class _ProgramWriter:
+    def __init__(self, config: GeneratorConfig):
+        self.config = config
+        self.rng = random.Random(config.seed)
+        self.names = [f"V{i}" for i in range(config.variables)]
+        self.reals: list[str] = []
+
+    def comment(self) -> str:
+        words = self.rng.choices(COMMENT_WORDS, k=self.rng.randint(2, 8))
+        return "C     " + " ".join(words) + "\n"
+
+    def term(self) -> str:
+        roll = self.rng.random()
+        if roll < 0.6:
+            return self.rng.choice(self.names)
+        if roll < 0.85:
+            return str(self.rng.randint(0, 9999))
+        return f"{self.rng.randint(0, 999)}.{self.rng.randint(0, 99)}"
+
+    def divisor(self) -> str:
+        if self.rng.random() < 0.7:
+            return str(self.rng.randint(1, 99))
+        return f"{self.rng.randint(1, 99)}.{self.rng.randint(0, 99)}"
+
+    def exponent(self) -> str:
+        # Un REAL o un INTEGER entre 0 y 2: una cadena A ** 2 ** 2 ** ... de
+        # esos nunca da un exponente INTEGER negativo
+        roll = self.rng.random()
+        if roll < 0.4 and self.reals:
+            return self.rng.choice(self.reals)
+        if roll < 0.7:
+            return f"{self.rng.randint(0, 9)}.{self.rng.randint(0, 99)}"
+        return str(self.rng.randint(0, 2))
+
+    def expression(self) -> str:
+        depth = self.rng.randint(0, self.config.expr_depth)
+        parts = [self.term()]
+        previous = None
+        for _ in range(depth):
+            op = self.rng.choice(ARITHMETIC_OPS)
+            if not self.config.constant_divisors:
+                operand = self.term()
+            elif op == "/":
+                operand = self.divisor()
+            elif op == "**":
+                if previous == "/":
+                    op = "*"  # ** se aplicaría al divisor, que podría dar 0
+                operand = self.exponent()
+            else:
+                operand = self.term()
+            parts.append(op)
+            parts.append(operand)
+            previous = op
+        return " ".join(parts)
+
+    def lines(self) -> Iterator[str]:
+        config, rng = self.config, self.rng
+        indent = "      "
+        yield f"{indent}PROGRAM SINT{config.seed}\n"
+        for name in self.names:
+            kind = "INTEGER" if rng.random() < 0.5 else "REAL"
+            if kind == "REAL":
+                self.reals.append(name)
+            yield f"{indent}{kind} {name}\n"
+
+        # Se reserva espacio para cerrar los IF abiertos y el END final
+        budget = config.size - 6 * len(self.names) - 64
+        written, depth = 0, 0
+        while written < budget or depth:
+            if written >= budget:
+                line = f"{indent}{'   ' * (depth - 1)}ENDIF\n"
+                depth -= 1
+            elif rng.random() < config.comment_ratio:
+                line = self.comment()
+            else:
+                pad = indent + "   " * depth
+                roll = rng.random()
+                if roll < 0.12 and depth < config.if_depth:
+                    op = rng.choice(RELATIONAL_OPS)
+                    line = f"{pad}IF ({self.expression()} {op} {self.expression()}) THEN\n"
+                    depth += 1
+                elif roll < 0.24 and depth:
+                    line = f"{indent}{'   ' * (depth - 1)}ENDIF\n"
+                    depth -= 1
+                else:
+                    line = f"{pad}{rng.choice(self.names)} = {self.expression()}\n"
+            written += len(line)
+            yield line
+        yield f"{indent}END\n"
+
+
+def generate_lines(config: GeneratorConfig) -> Iterator[str]:
+    """Líneas del programa, sin armar el texto completo en memoria."""
+    return _ProgramWriter(config).lines()
+
+
+def generate_program(config: GeneratorConfig) -> str:
+    return "".join(generate_lines(config))
+
+
+def write_program(path: str, config: GeneratorConfig) -> int:
+    """Escribe el programa en path y devuelve los bytes escritos."""
+    size = 0
+    with open(path, "w", encoding="ascii", newline="\n") as file:
+        for line in generate_lines(config):
+            size += file.write(line)
+    return size
@@ -0,0 +1,79 @@
+"""Compara el reconocimiento de palabras clave por alternación en la regex
+(antes) con la búsqueda en tabla sobre los identificadores (después), a medida
+que el registro crece desde las 12 palabras del curso hasta el conjunto
+completo de Fortran 77."""
+from __future__ import annotations
+import argparse
+import time
+
+from lexer.lexer_engine import Lexer, TokenRegistry
+from bench.positions import generate_source
+
+# Sentencias y palabras reservadas de Fortran 77
+F77_KEYWORDS = (
+    "assign", "backspace", "block", "blockdata", "call", "character", "close",
+    "common", "complex", "continue", "data", "dimension", "do", "double",
+    "doubleprecision", "else", "elseif", "end", "enddo", "endfile", "endif",
+    "entry", "equivalence", "external", "false", "file", "format", "function",
+    "go", "goto", "if", "implicit", "include", "inquire", "integer",
+    "intrinsic", "logical", "none", "open", "parameter", "pause", "precision",
+    "print", "program", "read", "real", "return", "rewind", "save", "status",
+    "stop", "subroutine", "then", "to", "true", "unit", "while", "write",
+    "iostat", "err",
+)
+
+
+class F77Registry(TokenRegistry):
+    """Registro del curso ampliado con todas las palabras de F77_KEYWORDS."""
+
+    def __init__(self, size: int | None = None):
+        super().__init__()
+        extra = [kw for kw in F77_KEYWORDS if kw not in self.keywords]
+        for keyword in extra[:None if size is None else max(0, size - len(self.keywords))]:
+            self.keywords[keyword] = keyword.upper()
+
+
+class LegacyRegistry(F77Registry):
+    """Patrón original: las palabras clave como alternación \\b(?i:kw1|kw2|...)\\b
+    delante del grupo ID."""
+
+    def build_regex_pattern(self) -> str:
+        kw_alt = self._create_alternation(list(self.keywords))
+        return super().build_regex_pattern().replace(
+            "(?P<ID>", rf"(?P<KEYWORD>   \b(?i:{kw_alt})\b )                 |" "\n"
+                       "            (?P<ID>", 1)
+
+
+def measure(label: str, text: str, registry: TokenRegistry) -> float:
+    lexer = Lexer(text, registry)
+    elapsed = float("inf")
+    for _ in range(3):  # mejor de tres corridas
+        start = time.perf_counter()
+        count = sum(1 for _ in lexer.tokens())
+        elapsed = min(elapsed, time.perf_counter() - start)
+    print(f"  {label:<34} {count:>10} tokens  {elapsed:8.3f} s  "
+          f"{count / elapsed:>12,.0f} tokens/s")
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size-mb", type=float, default=4.0,
+                        help="tamaño aproximado del archivo generado (MB)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[12, 30, len(F77_KEYWORDS)],
+                        help="cantidades de palabras clave a comparar")
+    args = parser.parse_args()
+
+    text = generate_source(int(args.size_mb * 1024 * 1024))
+    print(f"Entrada generada: {len(text) / 1e6:.1f} MB")
+
+    for size in args.sizes:
+        legacy, table = LegacyRegistry(size), F77Registry(size)
+        print(f"\n{len(table.keywords)} palabras clave:")
+        before = measure("antes (alternación en la regex)", text, legacy)
+        after = measure("después (tabla hash)", text, table)
+        print(f"  Aceleración: {before / after:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Mide la conversión de literales en archivos dominados por tablas de
+datos: conversión al crear cada token (antes), conversión diferida que solo
+ocurre si se lee el valor (después) y conversión en bloque con NumPy sobre
+las columnas de un TokenBuffer."""
+from __future__ import annotations
+import argparse
+import random
+import time
+
+from lexer.lexer_engine import Lexer
+from lexer.token_buffer import TokenBuffer
+
+
+def generate_data_table(size_bytes: int, seed: int = 0) -> str:
+    """Bloque de sentencias de asignación con muchas constantes por línea."""
+    rng = random.Random(seed)
+    lines, size = [], 0
+    while size < size_bytes:
+        numbers = []
+        for _ in range(8):
+            roll = rng.random()
+            if roll < 0.5:
+                numbers.append(str(rng.randint(0, 99999)))
+            elif roll < 0.8:
+                numbers.append(f"{rng.uniform(-1e3, 1e3):.4f}".lstrip("-"))
+            else:
+                numbers.append(f"{rng.uniform(0, 10):.3f}E{rng.randint(-9, 9)}")
+        line = "      T = " + " + ".join(numbers) + "\n"
+        lines.append(line)
+        size += len(line)
+    return "".join(lines)
+
+
+def timed(label: str, run, setup=None) -> float:
+    elapsed = float("inf")
+    for _ in range(3):  # mejor de tres corridas
+        arg = setup() if setup else None
+        start = time.perf_counter()
+        result = run(arg) if setup else run()
+        elapsed = min(elapsed, time.perf_counter() - start)
+    print(f"  {label:<40} {elapsed:8.3f} s   ({result})")
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size-mb", type=float, default=4.0,
+                        help="tamaño aproximado del archivo generado (MB)")
+    args = parser.parse_args()
+
+    text = generate_data_table(int(args.size_mb * 1024 * 1024))
+    lexer = Lexer(text)
+    print(f"Entrada generada: {len(text) / 1e6:.1f} MB")
+
+    def eager() -> str:
+        # Equivale a la fábrica anterior: cada literal se convierte al crearlo
+        count = sum(1 for token in lexer.tokens() if token.value is not None)
+        return f"{count} valores"
+
+    def lazy() -> str:
+        return f"{sum(1 for _ in lexer.tokens())} tokens, valores sin convertir"
+
+    print("\nTokens:")
+    before = timed("antes (conversión al crear el token)", eager)
+    after = timed("después (conversión diferida)", lazy)
+    print(f"  Aceleración cuando no se leen los valores: {before / after:.2f}x")
+
+    def build() -> TokenBuffer:
+        return TokenBuffer.from_lexer(lexer)
+
+    def one_by_one(buffer: TokenBuffer) -> str:
+        values = sum(1 for index in range(len(buffer)) if buffer.value_at(index) is not None)
+        return f"{values} valores"
+
+    def batched(buffer: TokenBuffer) -> str:
+        return f"{buffer.convert_literals()} valores"
+
+    print("\nTokenBuffer (solo la conversión, el buffer ya está armado):")
+    loop = timed("conversión uno a uno al leer", one_by_one, build)
+    batch = timed("convert_literals() en bloque", batched, build)
+    print(f"  Aceleración: {loop / batch:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
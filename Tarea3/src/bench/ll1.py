@@ -0,0 +1,49 @@
+"""Compara el recorrido LL(1) sobre diccionarios de símbolos con el recorrido
+sobre la tabla compilada a enteros (CompiledTable). Los tokens se generan
+antes de medir, así solo se mide el parser y no el lexer."""
+from __future__ import annotations
+import argparse
+import time
+
+from lexer.lexer_engine import Lexer
+from lexer.ll1_parser import LL1Parser
+from bench.generator import GeneratorConfig, generate_program
+
+
+class _PreLexed:
+    """Hace las veces de Lexer: entrega una lista de tokens ya generada."""
+
+    def __init__(self, tokens: list):
+        self._tokens = tokens
+
+    def tokens(self):
+        return iter(self._tokens)
+
+
+def timed(label: str, tokens: list, compiled: bool) -> float:
+    elapsed = float("inf")
+    for _ in range(3):  # mejor de tres corridas
+        parser = LL1Parser(_PreLexed(tokens), compiled=compiled)
+        start = time.perf_counter()
+        parser.parse()
+        elapsed = min(elapsed, time.perf_counter() - start)
+    print(f"  {label:<30} {elapsed:8.3f} s   {len(tokens) / elapsed:14,.0f} tokens/s")
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size-mb", type=float, default=4.0,
+                        help="tamaño aproximado del programa generado (MB)")
+    args = parser.parse_args()
+
+    text = generate_program(GeneratorConfig(size=int(args.size_mb * 1024 * 1024)))
+    tokens = list(Lexer(text).tokens())
+    print(f"Entrada generada: {len(text) / 1e6:.1f} MB, {len(tokens)} tokens")
+    symbolic = timed("símbolos y diccionarios", tokens, compiled=False)
+    compiled = timed("tabla compilada a enteros", tokens, compiled=True)
+    print(f"  Aceleración: {symbolic / compiled:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Compara el seguimiento de posiciones carácter a carácter (antes) con el
+índice de inicios de línea que resuelve line/col bajo demanda (después)."""
+from __future__ import annotations
+import argparse
+import time
+from pathlib import Path
+from typing import Iterator
+
+from lexer.lexer_engine import Lexer, Token, TokenRegistry, SKIPPED_GROUPS
+
+RECURSO = Path(__file__).resolve().parents[2] / "recurso.f"
+
+
+class EagerPositionTracker:
+    """Seguimiento de línea/columna tal como lo hacía el lexer original."""
+
+    def __init__(self):
+        self.line = 1
+        self.col = 1
+
+    def advance(self, text: str) -> tuple[int, int]:
+        start_line, start_col = self.line, self.col
+        for char in text:
+            if char == "\n":
+                self.line += 1
+                self.col = 1
+            else:
+                self.col += 1
+        return start_line, start_col
+
+
+def eager_tokens(lexer: Lexer) -> Iterator[Token]:
+    """Bucle original: cada lexema se recorre en Python para actualizar la
+    posición. Se crean los mismos tokens para que la comparación sea justa."""
+    text, pos = lexer.text, 0
+    tracker = EagerPositionTracker()
+    match = lexer.pattern.match
+    create_token = lexer.token_factory.create_token
+
+    while pos < len(text):
+        m = match(text, pos)
+        if not m:
+            tracker.advance(text[pos])
+            yield create_token("ERROR", text[pos], pos)
+            pos += 1
+            continue
+        token_type = m.lastgroup
+        lexeme = m.group(token_type)
+        tracker.advance(lexeme)
+        start, pos = pos, m.end()
+        if token_type not in SKIPPED_GROUPS:
+            yield create_token(token_type, lexeme, start)
+
+
+def lazy_tokens(lexer: Lexer) -> Iterator[Token]:
+    return lexer.tokens()
+
+
+def generate_source(size_bytes: int, header: str = "") -> str:
+    """Repite recurso.f (precedido de header) hasta alcanzar aproximadamente size_bytes."""
+    base = header + RECURSO.read_text(encoding="utf-8") + "\n"
+    return base * max(1, size_bytes // len(base))
+
+
+def measure(label: str, run, text: str, registry: TokenRegistry) -> float:
+    lexer = Lexer(text, registry)
+    start = time.perf_counter()
+    count = sum(1 for _ in run(lexer))
+    elapsed = time.perf_counter() - start
+    rate = count / elapsed
+    print(f"  {label:<28} {count:>10} tokens  {elapsed:8.3f} s  {rate:>12,.0f} tokens/s")
+    return rate
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size-mb", type=float, default=8.0,
+                        help="tamaño aproximado del archivo generado (MB)")
+    args = parser.parse_args()
+
+    text = generate_source(int(args.size_mb * 1024 * 1024))
+    registry = TokenRegistry()
+    print(f"Entrada generada: {len(text) / 1e6:.1f} MB, {text.count(chr(10))} líneas")
+
+    before = measure("antes (PositionTracker)", eager_tokens, text, registry)
+    after = measure("después (LineIndex)", lazy_tokens, text, registry)
+    print(f"  Aceleración: {after / before:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
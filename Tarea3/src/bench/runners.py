@@ -0,0 +1,117 @@
+"""Mediciones de tokens/s, memoria y asignaciones para el lexer y los parsers.
+
+Cada caso se ejecuta en un proceso nuevo para que el pico de RSS de un caso
+no contamine al siguiente. El tiempo se toma sin tracemalloc (que hace más
+lento al intérprete); las asignaciones se miden en una corrida aparte.
+"""
+from __future__ import annotations
+import gc
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, asdict
+from typing import Callable, Dict
+
+try:
+    import resource
+except ImportError:  # Windows: sin getrusage
+    resource = None
+
+from lexer.lexer_engine import Lexer
+from lexer.parser import Parser
+from lexer.ll1_parser import LL1Parser
+from bench.generator import GeneratorConfig, generate_program, format_size
+
+
+def run_lexer(text: str) -> None:
+    for _ in Lexer(text).tokens():
+        pass
+
+
+def run_parser(text: str) -> None:
+    Parser(Lexer(text)).parse_programa()
+
+
+def run_ll1(text: str) -> None:
+    LL1Parser(Lexer(text)).parse()
+
+
+RUNNERS: Dict[str, Callable[[str], None]] = {
+    "lexer": run_lexer,
+    "parser": run_parser,
+    "ll1": run_ll1,
+}
+
+
+@dataclass
+class BenchResult:
+    runner: str
+    size: str
+    bytes: int
+    tokens: int
+    seconds: float | None = None
+    tokens_per_sec: float | None = None
+    rss_peak_kb: int | None = None
+    alloc_peak_bytes: int | None = None
+    alloc_blocks: int | None = None
+    error: str | None = None
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def _peak_rss_kb() -> int | None:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa KB; macOS, bytes
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def _call(runner: Callable[[str], None], text: str) -> str | None:
+    try:
+        runner(text)
+    except (SyntaxError, RecursionError) as e:
+        return f"{type(e).__name__}: {e}"
+    return None
+
+
+def measure(runner_name: str, config: GeneratorConfig, repeat: int = 3,
+            allocations: bool = True) -> BenchResult:
+    """Mide un runner sobre el programa generado con config (en este proceso)."""
+    runner = RUNNERS[runner_name]
+    text = generate_program(config)
+    tokens = sum(1 for _ in Lexer(text).tokens())
+    result = BenchResult(runner_name, format_size(config.size), len(text), tokens)
+
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        error = _call(runner, text)
+        best = min(best, time.perf_counter() - start)
+        if error is not None:
+            result.error = error
+            break
+    if result.error is None:
+        result.seconds = best
+        result.tokens_per_sec = tokens / best if best > 0 else None
+    result.rss_peak_kb = _peak_rss_kb()
+
+    if allocations and result.error is None:
+        gc.collect()
+        blocks = sys.getallocatedblocks()
+        tracemalloc.start()
+        _call(runner, text)
+        _, result.alloc_peak_bytes = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        result.alloc_blocks = sys.getallocatedblocks() - blocks
+    return result
+
+
+def measure_isolated(runner_name: str, config: GeneratorConfig, repeat: int = 3,
+                     allocations: bool = True) -> BenchResult:
+    """Como measure(), pero en un proceso nuevo (RSS pico propio del caso)."""
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        return executor.submit(measure, runner_name, config, repeat, allocations).result()
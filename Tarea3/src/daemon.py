@@ -0,0 +1,353 @@
+"""Servicio de análisis léxico y sintáctico que queda corriendo en segundo
+plano, y su cliente.
+
+Cada invocación de main.py o de python -m lexer.diagnostics paga el arranque
+del intérprete, los imports y la compilación de las expresiones regulares y
+de la tabla LL(1) antes de analizar unos pocos KB. El daemon paga eso una sola
+vez: escucha en un socket Unix, mantiene el registro, los lexers y la tabla
+compilados, y atiende a muchos clientes a la vez con asyncio.
+
+Uso (desde Tarea3/src):
+
+    python daemon.py serve [--socket RUTA] [-j N]
+    python daemon.py lex|parse|diagnostics ARCHIVO [ARCHIVO ...] [--ll1]
+                     [--free-form] [--json] [--socket RUTA] [--no-daemon]
+    python daemon.py ping|stats|stop [--socket RUTA]
+
+Los comandos de cliente usan el daemon si está corriendo y, si no, hacen el
+mismo trabajo en el propio proceso (salvo con --require-daemon): el resultado
+es idéntico en los dos casos.
+
+Protocolo: cada mensaje es un marco de 4 bytes (largo, big-endian) seguido de
+un objeto JSON en UTF-8. Una petición es
+
+    {"id": 1, "op": "diagnostics", "params": {"source": "...", "path": "a.f"}}
+
+y la respuesta lleva el mismo id, con "ok": true y "result", o "ok": false y
+"error" ({"type", "message"}). Un cliente puede enviar varias peticiones sin
+esperar las respuestas; estas llegan a medida que terminan, no en orden.
+
+Este módulo es el cliente (y lo que comparten cliente y daemon); el
+servidor asyncio está en daemon_server.py y solo se importa con serve.
+"""
+from __future__ import annotations
+import argparse
+import json
+import os
+import socket
+import struct
+import sys
+import tempfile
+from typing import Any, Dict
+
+# Al nivel del módulo solo lo más liviano de la biblioteca estándar: con el
+# daemon corriendo, el cliente no paga los imports del lexer ni los de
+# asyncio. El análisis importa lexer.* la primera vez que se usa (ver
+# _service).
+
+FRAME_HEADER = struct.Struct("!I")
+# Tamaño máximo de un mensaje; uno mayor corta la conexión
+MAX_FRAME = 64 * 1024 * 1024
+# Espera máxima del cliente por una respuesta (segundos)
+CLIENT_TIMEOUT = 300.0
+
+OPERATIONS = ("lex", "parse", "diagnostics")
+
+
+def default_socket_path() -> str:
+    runtime = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime:
+        return os.path.join(runtime, "teoria-computacion", "daemon.sock")
+    return os.path.join(tempfile.gettempdir(), f"teoria-computacion-{os.getuid()}.sock")
+
+
+class DaemonError(Exception):
+    """Error que el daemon devolvió en lugar de un resultado."""
+
+    def __init__(self, type_name: str, message: str):
+        super().__init__(f"{type_name}: {message}")
+        self.type_name = type_name
+        self.message = message
+
+    def __reduce__(self):
+        return type(self), (self.type_name, self.message)
+
+
+# ---------------------------------------------------------------------
+# Análisis (igual en el daemon, en sus trabajadores y en el cliente sin daemon)
+# ---------------------------------------------------------------------
+
+_registry = None
+
+
+def _service():
+    """Importa el lexer y crea el registro compartido la primera vez."""
+    global _registry
+    from lexer.lexer_engine import Lexer, TokenRegistry
+    if _registry is None:
+        _registry = TokenRegistry()
+    return Lexer, _registry
+
+
+def warm_up() -> None:
+    """Deja compilados los patrones de los dos formatos y la tabla LL(1)."""
+    from lexer.ll1_parser import compiled_table_for, parsing_table
+    source = "      PROGRAM P\n      INTEGER X\n      X = 1\n      END\n"
+    for fixed_form in (True, False):
+        _diagnostics({"source": source, "fixed_form": fixed_form, "ll1": True})
+        _diagnostics({"source": source, "fixed_form": fixed_form})
+    compiled_table_for(parsing_table())
+
+
+def _tokens(params: Dict[str, Any]):
+    from lexer.token_buffer import TokenBuffer
+    Lexer, registry = _service()
+    # Un Lexer por petición: la SymbolTable de un lexer reutilizado crecería
+    # sin límite en un proceso de larga vida. Con el registro compartido el
+    # patrón y la fábrica salen de la caché de especificaciones.
+    lexer = Lexer(params["source"], registry=registry,
+                  fixed_form=params.get("fixed_form", True),
+                  max_errors=params.get("max_errors"),
+                  max_error_ratio=params.get("max_error_ratio"))
+    return TokenBuffer.from_lexer(lexer)
+
+
+def _lex(params: Dict[str, Any]) -> Dict[str, Any]:
+    tokens = _tokens(params)
+    result: Dict[str, Any] = {"count": len(tokens), "categories": tokens.category_counts()}
+    if params.get("tokens", True):
+        result["tokens"] = [[*token.position, token.category.value, token.kind, token.lexeme]
+                            for token in tokens]
+    return result
+
+
+def _check(params: Dict[str, Any], tokens):
+    """Parser con recuperación ya ejecutado sobre tokens (y el programa, si
+    es el descendente recursivo)."""
+    from lexer.diagnostics import DEFAULT_MAX_ERRORS
+    max_errors = params.get("max_parse_errors", DEFAULT_MAX_ERRORS)
+    if params.get("ll1"):
+        from lexer.ll1_parser import LL1Parser
+        checker = LL1Parser(tokens, recover=True, max_errors=max_errors)
+        checker.parse()
+        return checker, None
+    from lexer.parser import Parser
+    checker = Parser(tokens, recover=True, max_errors=max_errors)
+    return checker, checker.parse_programa()
+
+
+def _syntax_errors(checker) -> list[Dict[str, Any]]:
+    return [{"line": d.line, "col": d.col, "offset": d.offset, "source": "parser",
+             "message": d.message} for d in checker.diagnostics]
+
+
+def _parse(params: Dict[str, Any]) -> Dict[str, Any]:
+    from lexer.ast_nodes import dump
+    checker, program = _check(params, _tokens(params))
+    result: Dict[str, Any] = {"diagnostics": _syntax_errors(checker),
+                              "truncated": checker.diagnostics.truncated}
+    if program is not None:
+        result.update(program=program.name, declarations=len(program.declarations),
+                      statements=len(program.statements))
+        if params.get("ast"):
+            result["ast"] = dump(program)
+    return result
+
+
+def _diagnostics(params: Dict[str, Any]) -> Dict[str, Any]:
+    """Errores léxicos (caracteres no reconocidos) y sintácticos, por posición."""
+    from lexer.lexer_engine import Category
+    tokens = _tokens(params)
+    lexical = [{"line": line, "col": col, "offset": token.offset, "source": "lexer",
+                "message": f"Carácter no reconocido '{token.lexeme}'"}
+               for token in tokens if token.category is Category.ERROR
+               for line, col in (token.position,)]
+    checker, _ = _check(params, tokens)
+    diagnostics = sorted(lexical + _syntax_errors(checker), key=lambda d: d["offset"])
+    return {"diagnostics": diagnostics, "truncated": checker.diagnostics.truncated}
+
+
+_HANDLERS = {"lex": _lex, "parse": _parse, "diagnostics": _diagnostics}
+
+
+def execute(op: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    """Resultado de la operación op; lo mismo que respondería el daemon."""
+    handler = _HANDLERS.get(op)
+    if handler is None:
+        raise ValueError(f"Operación desconocida: {op!r}")
+    if not isinstance(params.get("source"), str):
+        raise ValueError("Falta el texto fuente (params.source)")
+    return handler(params)
+
+
+# ---------------------------------------------------------------------
+# Marcos
+# ---------------------------------------------------------------------
+
+def encode_frame(message: Dict[str, Any]) -> bytes:
+    payload = json.dumps(message, ensure_ascii=False).encode("utf-8")
+    if len(payload) > MAX_FRAME:
+        raise ValueError(f"Mensaje de {len(payload)} bytes; el máximo es {MAX_FRAME}")
+    return FRAME_HEADER.pack(len(payload)) + payload
+
+
+# ---------------------------------------------------------------------
+# Cliente
+# ---------------------------------------------------------------------
+
+class Client:
+    """Cliente síncrono de una conexión; connect() lanza OSError si no hay
+    daemon escuchando."""
+
+    def __init__(self, socket_path: str | None = None, timeout: float = CLIENT_TIMEOUT):
+        self.socket_path = socket_path or default_socket_path()
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(timeout)
+        self._next_id = 0
+
+    def connect(self) -> Client:
+        try:
+            self.sock.connect(self.socket_path)
+        except OSError:
+            self.sock.close()
+            raise
+        return self
+
+    def close(self) -> None:
+        self.sock.close()
+
+    def __enter__(self) -> Client:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _receive(self, size: int) -> bytes:
+        data = bytearray()
+        while len(data) < size:
+            chunk = self.sock.recv(min(size - len(data), 1 << 20))
+            if not chunk:
+                raise ConnectionError("El daemon cerró la conexión")
+            data += chunk
+        return bytes(data)
+
+    def request(self, op: str, params: Dict[str, Any] | None = None) -> Dict[str, Any]:
+        self._next_id += 1
+        self.sock.sendall(encode_frame({"id": self._next_id, "op": op, "params": params or {}}))
+        (size,) = FRAME_HEADER.unpack(self._receive(FRAME_HEADER.size))
+        response = json.loads(self._receive(size))
+        if not response.get("ok"):
+            error = response.get("error") or {}
+            raise DaemonError(error.get("type", "Error"), error.get("message", ""))
+        return response["result"]
+
+
+def call(op: str, params: Dict[str, Any], socket_path: str | None = None,
+         fallback: bool = True) -> Dict[str, Any]:
+    """Ejecuta op en el daemon; si no hay daemon y fallback es verdadero, en
+    este mismo proceso."""
+    try:
+        client = Client(socket_path).connect()
+    except (FileNotFoundError, ConnectionRefusedError):
+        if not fallback:
+            raise
+        return execute(op, params)
+    with client:
+        return client.request(op, params)
+
+
+def _failed(op: str, result: Dict[str, Any]) -> bool:
+    """Si el archivo tuvo errores (tokens ERROR al tokenizar, diagnósticos
+    al analizar); decide el código de salida con y sin --json."""
+    if op == "lex":
+        return result["categories"].get("ERROR", 0) > 0
+    return bool(result["diagnostics"])
+
+
+def _print_result(op: str, path: str, result: Dict[str, Any]) -> None:
+    """Muestra el resultado como los demás programas del repositorio."""
+    if op == "lex":
+        for line, col, category, kind, lexeme in result.get("tokens", ()):
+            print(f"[{line}:{col}] {category:<14} {kind:<10} '{lexeme}'")
+        print(f"{path}: {result['count']} tokens")
+        return
+    if "ast" in result:
+        print(result["ast"])
+    for diagnostic in result["diagnostics"]:
+        print(f"{path}:{diagnostic['line']}:{diagnostic['col']}: {diagnostic['message']}")
+    if result["truncated"]:
+        print(f"{path}: demasiados errores, análisis detenido")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Daemon de análisis de Fortran 77")
+    parser.add_argument("command", choices=("serve", *OPERATIONS, "ping", "stats", "stop"))
+    parser.add_argument("paths", nargs="*", help="archivos a analizar")
+    parser.add_argument("--socket", default=None,
+                        help=f"ruta del socket (por omisión {default_socket_path()})")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1,
+                        help="procesos para las peticiones grandes (0 = ninguno)")
+    parser.add_argument("--free-form", action="store_true",
+                        help="no aplicar las reglas de columnas del formato fijo")
+    parser.add_argument("--ll1", action="store_true", help="usar LL1Parser")
+    parser.add_argument("--ast", action="store_true", help="mostrar el árbol (parse)")
+    parser.add_argument("--json", action="store_true", help="mostrar la respuesta en JSON")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--no-daemon", action="store_true",
+                       help="analizar en este proceso aunque haya daemon")
+    group.add_argument("--require-daemon", action="store_true",
+                       help="fallar si no hay daemon en vez de analizar en este proceso")
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        from daemon_server import serve
+        serve(args.socket, args.jobs)
+        return 0
+    if args.command in ("ping", "stats", "stop"):
+        try:
+            with Client(args.socket).connect() as client:
+                result = client.request("shutdown" if args.command == "stop" else args.command)
+        except (FileNotFoundError, ConnectionRefusedError):
+            print("No hay un daemon corriendo.", file=sys.stderr)
+            return 1
+        print(json.dumps(result, indent=2))
+        return 0
+
+    if not args.paths:
+        parser.error(f"{args.command} necesita al menos un archivo")
+    failed = 0
+    client = None
+    if not args.no_daemon:
+        try:
+            client = Client(args.socket).connect()
+        except (FileNotFoundError, ConnectionRefusedError):
+            if args.require_daemon:
+                print("No hay un daemon corriendo.", file=sys.stderr)
+                return 1
+    try:
+        for path in args.paths:
+            with open(path, encoding="utf-8", errors="replace") as file:
+                params = {"source": file.read(), "path": path,
+                          "fixed_form": not args.free_form, "ll1": args.ll1, "ast": args.ast}
+            try:
+                if client is not None:
+                    result = client.request(args.command, params)
+                else:
+                    result = execute(args.command, params)
+            except Exception as error:
+                print(f"{path}: {error}", file=sys.stderr)
+                failed += 1
+                continue
+            if args.json:
+                print(json.dumps(result, ensure_ascii=False))
+            else:
+                _print_result(args.command, path, result)
+            failed += _failed(args.command, result)
+    finally:
+        if client is not None:
+            client.close()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,238 @@
+"""Servidor del daemon de análisis (ver daemon.py para el protocolo y el
+cliente).
+
+Un bucle asyncio atiende todas las conexiones del socket Unix; cada petición
+de una conexión es una tarea propia, así que un cliente puede tener varias en
+curso y las respuestas salen a medida que terminan. Las peticiones chicas
+(hasta INLINE_LIMIT caracteres de fuente) se resuelven en el propio bucle,
+porque tardan menos que el viaje a otro proceso; las grandes van a un
+ProcessPoolExecutor, así un archivo pesado no frena a los demás clientes.
+El daemon y sus trabajadores compilan patrones y tabla LL(1) al arrancar.
+
+    python daemon.py serve [--socket RUTA] [-j N]
+"""
+from __future__ import annotations
+import asyncio
+import json
+import os
+import signal
+import socket
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict
+
+from daemon import (FRAME_HEADER, MAX_FRAME, DaemonError, default_socket_path,
+                    encode_frame, execute, warm_up)
+
+# Fuentes de hasta este largo se analizan en el bucle, sin ir al pool
+INLINE_LIMIT = 32 * 1024
+# Peticiones en curso por conexión antes de dejar de leer (contrapresión)
+MAX_IN_FLIGHT = 64
+
+
+def _execute_pooled(op: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    # No todas las excepciones del lexer se pueden reconstruir al volver del
+    # trabajador (TooManyLexicalErrors recibe más de un argumento)
+    try:
+        return execute(op, params)
+    except Exception as error:
+        raise DaemonError(type(error).__name__, str(error)) from None
+
+
+async def read_frame(reader: asyncio.StreamReader) -> bytes | None:
+    """Contenido del siguiente marco, o None si el otro extremo cerró entre
+    marcos."""
+    try:
+        header = await reader.readexactly(FRAME_HEADER.size)
+    except asyncio.IncompleteReadError as error:
+        if error.partial:
+            raise ConnectionError("Conexión cerrada a mitad de un marco") from None
+        return None
+    (size,) = FRAME_HEADER.unpack(header)
+    if size > MAX_FRAME:
+        raise ValueError(f"Marco de {size} bytes; el máximo es {MAX_FRAME}")
+    return await reader.readexactly(size)
+
+
+def _error(request_id, error: BaseException) -> Dict[str, Any]:
+    if isinstance(error, DaemonError):
+        type_name, message = error.type_name, error.message
+    else:
+        type_name, message = type(error).__name__, str(error)
+    return {"id": request_id, "ok": False, "error": {"type": type_name, "message": message}}
+
+
+def _init_worker() -> None:
+    # Con fork los trabajadores heredan lo ya compilado; con spawn lo compilan
+    # una vez al arrancar y no en la primera petición
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    warm_up()
+
+
+class Daemon:
+    def __init__(self, socket_path: str | None = None, jobs: int = os.cpu_count() or 1,
+                 inline_limit: int = INLINE_LIMIT):
+        self.socket_path = socket_path or default_socket_path()
+        self.jobs = jobs
+        self.inline_limit = inline_limit
+        self.pool: ProcessPoolExecutor | None = None
+        self.started = time.time()
+        self.requests = 0
+        self.pooled = 0
+        self.failures = 0
+        self.clients = 0
+        # Conexiones abiertas y la tarea que atiende a cada una
+        self._connections: dict[asyncio.StreamWriter, asyncio.Task] = {}
+        self._stopping: asyncio.Event | None = None
+
+    async def run(self) -> None:
+        self._stopping = asyncio.Event()
+        warm_up()
+        if self.jobs > 0:
+            self.pool = ProcessPoolExecutor(max_workers=self.jobs, initializer=_init_worker)
+        directory = os.path.dirname(self.socket_path)
+        if directory:
+            os.makedirs(directory, mode=0o700, exist_ok=True)
+        self._remove_stale_socket()
+        server = await asyncio.start_unix_server(self._serve_client, path=self.socket_path,
+                                                 limit=MAX_FRAME)
+        os.chmod(self.socket_path, 0o600)
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signum, self._stopping.set)
+        print(f"Daemon escuchando en {self.socket_path} "
+              f"({self.jobs} proceso(s) para peticiones de más de "
+              f"{self.inline_limit // 1024} KB)", file=sys.stderr)
+        try:
+            async with server:
+                await self._stopping.wait()
+                # Se cierran las conexiones abiertas y se esperan las
+                # peticiones en curso, en vez de cancelarlas a la mitad
+                server.close()
+                for writer in list(self._connections):
+                    writer.close()
+                await asyncio.gather(*self._connections.values(), return_exceptions=True)
+        finally:
+            for signum in (signal.SIGINT, signal.SIGTERM):
+                loop.remove_signal_handler(signum)
+            try:
+                os.unlink(self.socket_path)
+            except FileNotFoundError:
+                pass
+            if self.pool is not None:
+                self.pool.shutdown(cancel_futures=True)
+
+    def _remove_stale_socket(self) -> None:
+        """Borra el socket de un daemon que ya no corre; si hay uno vivo,
+        no se arranca otro."""
+        if not os.path.exists(self.socket_path):
+            return
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(self.socket_path)
+        except (ConnectionRefusedError, FileNotFoundError):
+            os.unlink(self.socket_path)
+            return
+        finally:
+            probe.close()
+        raise RuntimeError(f"Ya hay un daemon escuchando en {self.socket_path}")
+
+    async def _serve_client(self, reader: asyncio.StreamReader,
+                            writer: asyncio.StreamWriter) -> None:
+        self.clients += 1
+        self._connections[writer] = asyncio.current_task()
+        write_lock = asyncio.Lock()
+        slots = asyncio.Semaphore(MAX_IN_FLIGHT)
+        tasks: set[asyncio.Task] = set()
+
+        async def reply(message: Dict[str, Any]) -> None:
+            try:
+                frame = encode_frame(message)
+            except ValueError as error:  # Resultado demasiado grande
+                frame = encode_frame(_error(message.get("id"), error))
+            async with write_lock:
+                writer.write(frame)
+                await writer.drain()
+
+        async def answer(payload: bytes) -> None:
+            request = None
+            try:
+                try:
+                    request = json.loads(payload)
+                except ValueError as error:
+                    # El marco estaba bien: la conexión sigue sirviendo
+                    await reply(_error(None, error))
+                else:
+                    await reply(await self.handle(request))
+            except (ConnectionError, asyncio.CancelledError):
+                pass
+            finally:
+                slots.release()
+            # Se detiene después de responder, para que stop reciba su respuesta
+            if isinstance(request, dict) and request.get("op") == "shutdown":
+                self._stopping.set()
+
+        try:
+            while True:
+                await slots.acquire()
+                try:
+                    payload = await read_frame(reader)
+                except (ValueError, ConnectionError) as error:
+                    # Marco inválido: no se puede saber dónde empieza el
+                    # siguiente, así que se responde y se corta
+                    await reply(_error(None, error))
+                    break
+                if payload is None:
+                    break
+                task = asyncio.create_task(answer(payload))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.wait(tasks)
+        except ConnectionError:
+            for task in tasks:
+                task.cancel()
+        finally:
+            self.clients -= 1
+            del self._connections[writer]
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def handle(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        request_id = request.get("id") if isinstance(request, dict) else None
+        try:
+            if not isinstance(request, dict):
+                raise ValueError("La petición debe ser un objeto JSON")
+            op = request.get("op")
+            params = request.get("params") or {}
+            self.requests += 1
+            if op == "ping":
+                result: Dict[str, Any] = {"pid": os.getpid()}
+            elif op == "stats":
+                result = self.stats()
+            elif op == "shutdown":
+                result = {}
+            elif len(params.get("source") or "") <= self.inline_limit or self.pool is None:
+                result = execute(op, params)
+            else:
+                self.pooled += 1
+                loop = asyncio.get_running_loop()
+                result = await loop.run_in_executor(self.pool, _execute_pooled, op, params)
+        except Exception as error:
+            self.failures += 1
+            return _error(request_id, error)
+        return {"id": request_id, "ok": True, "result": result}
+
+    def stats(self) -> Dict[str, Any]:
+        return {"pid": os.getpid(), "uptime": round(time.time() - self.started, 3),
+                "requests": self.requests, "pooled": self.pooled,
+                "failures": self.failures, "clients": self.clients, "jobs": self.jobs}
+
+
+def serve(socket_path: str | None = None, jobs: int = os.cpu_count() or 1,
+          inline_limit: int = INLINE_LIMIT) -> None:
+    asyncio.run(Daemon(socket_path, jobs, inline_limit).run())
@@ -1,5 +1,10 @@
-from .lexer_engine import Lexer, Token, TokenRegistry
+from .lexer_engine import Lexer, Token, TokenRegistry, TooManyLexicalErrors
+from .symbols import SymbolTable
+from .token_source import TokenSource
+from .token_buffer import TokenBuffer, TokenView
+from .incremental import IncrementalLexer
+from .dfa import DFALexer
 from .parser import Parser
 from .ll1_parser import LL1Parser
 
-__all__ = ["Lexer", "Token","TokenRegistry", "Parser", "LL1Parser"]
+__all__ = ["Lexer", "Token","TokenRegistry", "TooManyLexicalErrors", "SymbolTable", "TokenBuffer", "TokenView", "TokenSource", "IncrementalLexer", "DFALexer", "Parser", "LL1Parser"]
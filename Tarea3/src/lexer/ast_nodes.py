@@ -0,0 +1,437 @@
+"""Árbol sintáctico que devuelve Parser.parse_programa().
+
+Las sentencias y las expresiones se guardan en un NodeStore, un arena de
+arrays paralelos con un índice por nodo; los cuerpos de los IF y la lista de
+sentencias del programa son rangos contiguos de otro array. Assignment, If,
+BinOp y UnaryOp son vistas de dos campos (store, index) que se crean al leer
+el árbol, así un programa de 100k sentencias ocupa unos pocos MB en lugar de
+decenas. Dos lecturas del mismo hijo dan vistas distintas que se comparan
+iguales (==) pero no son el mismo objeto (is).
+
+Las hojas se comparten: cada variable es un único nodo Name por id de símbolo
+y cada constante un único nodo Constant por lexema. Program, Declaration,
+Name y Constant son clases comunes con __slots__.
+
+Los recorridos (walk, postorder, NodeVisitor, dump y repr) usan una pila
+explícita, de modo que la profundidad del árbol no está limitada por la
+recursión de Python.
+"""
+from __future__ import annotations
+from array import array
+from collections.abc import Sequence
+from typing import Callable, Iterable, Iterator
+
+from .lexer_engine import integer_value, real_value
+from .symbols import KINDS
+
+# Referencia a una expresión en el NodeStore: >= 0 es el índice de un
+# BinOp/UnaryOp y < 0 la hoja leaves[~ref]. NO_NODE marca un hijo ausente: el
+# segundo operando de un UnaryOp, la condición descartada de un IF o el
+# destino de un IF (así se distingue de una asignación).
+NO_NODE = 2 ** 31 - 1
+
+# kind id -> nombre; la lista de la KindTable crece sin cambiar de objeto
+_KIND_NAMES = KINDS.names
+
+
+class Node:
+    __slots__ = ()
+    # Atributos del nodo, en orden; los que son Node o listas de Node son hijos
+    _fields: tuple[str, ...] = ()
+
+    def children(self) -> Iterator[Node]:
+        for name in self._fields:
+            value = getattr(self, name)
+            if isinstance(value, Node):
+                yield value
+            elif isinstance(value, (list, NodeList)):
+                yield from value
+
+    def __repr__(self) -> str:
+        return _node_repr(self)
+
+
+class NodeStore:
+    """Arena de sentencias y expresiones en arrays paralelos.
+
+    Expresiones: ops (kind id del operador), lefts y rights (referencias).
+    Sentencias: targets (hoja destino de la asignación, NO_NODE en un IF),
+    values (valor o condición), starts/ends (rango del cuerpo del IF en
+    blocks) y offsets. blocks guarda los índices de sentencia de cada bloque
+    uno tras otro. Por nodo se pagan 10 bytes (expresión) o 24 (sentencia).
+    """
+    __slots__ = ("leaves", "ops", "lefts", "rights", "targets", "values", "starts", "ends",
+                 "offsets", "blocks", "_leaf_refs")
+
+    def __init__(self):
+        self.leaves: list[Node] = []
+        self.ops = array("H")
+        self.lefts = array("i")
+        self.rights = array("i")
+        self.targets = array("i")
+        self.values = array("i")
+        self.starts = array("i")
+        self.ends = array("i")
+        self.offsets = array("q")
+        self.blocks = array("i")
+        self._leaf_refs: dict[int, int] = {}    # id(hoja) -> referencia
+
+    # -- construcción (la usa Parser) ---------------------------------
+
+    def ref(self, node: Node | None) -> int:
+        """Referencia de una expresión de este arena o de una hoja (que se
+        registra la primera vez)."""
+        if node is None:
+            return NO_NODE
+        if isinstance(node, (BinOp, UnaryOp)):
+            return node.index
+        ref = self._leaf_refs.get(id(node))
+        if ref is None:
+            self.leaves.append(node)
+            ref = self._leaf_refs[id(node)] = ~(len(self.leaves) - 1)
+        return ref
+
+    def binary(self, op: int, left: int, right: int) -> int:
+        self.ops.append(op)
+        self.lefts.append(left)
+        self.rights.append(right)
+        return len(self.ops) - 1
+
+    def unary(self, op: int, operand: int) -> int:
+        return self.binary(op, operand, NO_NODE)
+
+    def _statement(self, target: int, value: int, start: int, end: int, offset: int) -> int:
+        self.targets.append(target)
+        self.values.append(value)
+        self.starts.append(start)
+        self.ends.append(end)
+        self.offsets.append(offset)
+        return len(self.targets) - 1
+
+    def assignment(self, target: Name, value: Node, offset: int = -1) -> Assignment:
+        return Assignment(self, self._statement(self.ref(target), self.ref(value), 0, 0, offset))
+
+    def conditional(self, condition: Node | None, body: NodeList, offset: int = -1) -> If:
+        return If(self, self._statement(NO_NODE, self.ref(condition), body.start, body.stop,
+                                        offset))
+
+    def block(self, statements: Iterable[int]) -> NodeList:
+        """Agrega un bloque con los índices de sentencia dados."""
+        start = len(self.blocks)
+        self.blocks.extend(statements)
+        return NodeList(self, start, len(self.blocks))
+
+    # -- lectura ------------------------------------------------------
+
+    def expression(self, ref: int) -> Node | None:
+        if ref < 0:
+            return self.leaves[~ref]
+        if ref == NO_NODE:
+            return None
+        return (UnaryOp if self.rights[ref] == NO_NODE else BinOp)(self, ref)
+
+    def statement(self, index: int) -> Assignment | If:
+        return (If if self.targets[index] == NO_NODE else Assignment)(self, index)
+
+
+class NodeList(Sequence):
+    """Sentencias de un bloque: el rango [start, stop) de NodeStore.blocks."""
+    __slots__ = ("store", "start", "stop")
+
+    def __init__(self, store: NodeStore, start: int, stop: int):
+        self.store = store
+        self.start = start
+        self.stop = stop
+
+    def __len__(self) -> int:
+        return self.stop - self.start
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [self[i] for i in range(*position.indices(len(self)))]
+        if position < 0:
+            position += len(self)
+        if not 0 <= position < len(self):
+            raise IndexError("índice de sentencia fuera de rango")
+        return self.store.statement(self.store.blocks[self.start + position])
+
+    def __iter__(self) -> Iterator[Node]:
+        statement, blocks = self.store.statement, self.store.blocks
+        for position in range(self.start, self.stop):
+            yield statement(blocks[position])
+
+    def __reversed__(self) -> Iterator[Node]:
+        statement, blocks = self.store.statement, self.store.blocks
+        for position in range(self.stop - 1, self.start - 1, -1):
+            yield statement(blocks[position])
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (NodeList, list)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return repr(list(self))
+
+
+class StoredNode(Node):
+    """Vista de un nodo del NodeStore; se compara por (store, index)."""
+    __slots__ = ("store", "index")
+
+    def __init__(self, store: NodeStore, index: int):
+        self.store = store
+        self.index = index
+
+    def __eq__(self, other) -> bool:
+        return (type(other) is type(self) and other.store is self.store
+                and other.index == self.index)
+
+    def __hash__(self) -> int:
+        return hash((id(self.store), self.index))
+
+
+class Program(Node):
+    __slots__ = ("name", "declarations", "statements", "offset")
+    _fields = ("name", "declarations", "statements")
+
+    def __init__(self, name: str, declarations: list[Declaration],
+                 statements: NodeList, offset: int = -1):
+        self.name = name
+        self.declarations = declarations
+        self.statements = statements
+        self.offset = offset
+
+
+class Declaration(Node):
+    __slots__ = ("type_name", "target", "offset")
+    _fields = ("type_name", "target")
+
+    def __init__(self, type_name: str, target: Name, offset: int = -1):
+        self.type_name = type_name      # "INTEGER" o "REAL"
+        self.target = target
+        self.offset = offset
+
+
+class Assignment(StoredNode):
+    __slots__ = ()
+    _fields = ("target", "value")
+
+    @property
+    def target(self) -> Name:
+        return self.store.leaves[~self.store.targets[self.index]]
+
+    @property
+    def value(self) -> Node:
+        return self.store.expression(self.store.values[self.index])
+
+    @property
+    def offset(self) -> int:
+        return self.store.offsets[self.index]
+
+    def children(self) -> Iterator[Node]:
+        store = self.store
+        yield store.leaves[~store.targets[self.index]]
+        yield store.expression(store.values[self.index])
+
+
+class If(StoredNode):
+    __slots__ = ()
+    _fields = ("condition", "body")
+
+    @property
+    def condition(self) -> BinOp | None:
+        # None si el parser se recuperó de un error en la condición
+        return self.store.expression(self.store.values[self.index])
+
+    @property
+    def body(self) -> NodeList:
+        store = self.store
+        return NodeList(store, store.starts[self.index], store.ends[self.index])
+
+    @property
+    def offset(self) -> int:
+        return self.store.offsets[self.index]
+
+    def children(self) -> Iterator[Node]:
+        condition = self.condition
+        if condition is not None:
+            yield condition
+        yield from self.body
+
+
+class BinOp(StoredNode):
+    """Operación binaria; op es el kind del operador ("PLUS", "GT", ...).
+
+    Sin offset propio: es el nodo más numeroso y la posición de la sentencia
+    que lo contiene alcanza para reportar errores.
+    """
+    __slots__ = ()
+    _fields = ("op", "left", "right")
+
+    @property
+    def op(self) -> str:
+        return _KIND_NAMES[self.store.ops[self.index]]
+
+    @property
+    def left(self) -> Node:
+        return self.store.expression(self.store.lefts[self.index])
+
+    @property
+    def right(self) -> Node:
+        return self.store.expression(self.store.rights[self.index])
+
+    def children(self) -> Iterator[Node]:
+        store = self.store
+        yield store.expression(store.lefts[self.index])
+        yield store.expression(store.rights[self.index])
+
+
+class UnaryOp(StoredNode):
+    """Signo al comienzo de una expresión; op es "PLUS" o "MINUS"."""
+    __slots__ = ()
+    _fields = ("op", "operand")
+
+    @property
+    def op(self) -> str:
+        return _KIND_NAMES[self.store.ops[self.index]]
+
+    @property
+    def operand(self) -> Node:
+        return self.store.expression(self.store.lefts[self.index])
+
+    def children(self) -> Iterator[Node]:
+        yield self.store.expression(self.store.lefts[self.index])
+
+
+class Name(Node):
+    """Variable; name es la forma canónica (mayúsculas) de la SymbolTable."""
+    __slots__ = ("symbol", "name")
+    _fields = ("name",)
+
+    def __init__(self, symbol: int, name: str):
+        self.symbol = symbol
+        self.name = name
+
+
+class Constant(Node):
+    """Literal numérico; kind es "INT" o "REAL" y el valor se calcula al leerlo."""
+    __slots__ = ("kind", "lexeme")
+    _fields = ("kind", "lexeme")
+
+    def __init__(self, kind: str, lexeme: str):
+        self.kind = kind
+        self.lexeme = lexeme
+
+    @property
+    def value(self) -> int | float:
+        return integer_value(self.lexeme) if self.kind == "INT" else real_value(self.lexeme)
+
+
+# ---------------------------------------------------------------------
+# Recorridos sin recursión
+# ---------------------------------------------------------------------
+
+def walk(node: Node) -> Iterator[Node]:
+    """Nodos en preorden (padre antes que hijos, hijos de izquierda a derecha)."""
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        yield node
+        children = list(node.children())
+        children.reverse()
+        stack.extend(children)
+
+
+def postorder(node: Node) -> Iterator[Node]:
+    """Nodos en postorden (hijos antes que el padre), útil para evaluar."""
+    stack: list[tuple[Node, bool]] = [(node, False)]
+    while stack:
+        node, expanded = stack.pop()
+        if expanded:
+            yield node
+            continue
+        stack.append((node, True))
+        children = list(node.children())
+        children.reverse()
+        stack.extend((child, False) for child in children)
+
+
+class NodeVisitor:
+    """Recorre el árbol llamando visit_<Clase>(nodo) al entrar y
+    leave_<Clase>(nodo) al salir de cada nodo, sin recursión.
+
+    Si visit_<Clase> devuelve False no se recorren los hijos de ese nodo.
+    """
+
+    def visit(self, node: Node) -> None:
+        handlers: dict[tuple[type, str], Callable[[Node], object] | None] = {}
+
+        def handler(cls: type, prefix: str) -> Callable[[Node], object] | None:
+            key = (cls, prefix)
+            if key not in handlers:
+                handlers[key] = getattr(self, prefix + cls.__name__, None)
+            return handlers[key]
+
+        stack: list[tuple[Node, bool]] = [(node, False)]
+        while stack:
+            node, leaving = stack.pop()
+            cls = type(node)
+            if leaving:
+                leave = handler(cls, "leave_")
+                if leave is not None:
+                    leave(node)
+                continue
+            enter = handler(cls, "visit_")
+            if enter is not None and enter(node) is False:
+                continue
+            stack.append((node, True))
+            children = list(node.children())
+            children.reverse()
+            stack.extend((child, False) for child in children)
+
+
+def _node_repr(node: Node) -> str:
+    """Tipo(campo=valor, ...) con los hijos anidados, armado con una pila de
+    nodos por expandir y fragmentos ya listos (str) en vez de un repr()
+    recursivo por hijo."""
+    parts: list[str] = []
+    stack: list[Node | str] = [node]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, str):
+            parts.append(item)
+            continue
+        pending: list[Node | str] = [f"{type(item).__name__}("]
+        for i, name in enumerate(item._fields):
+            value = getattr(item, name)
+            pending.append(f", {name}=" if i else f"{name}=")
+            if isinstance(value, (list, NodeList)):
+                pending.append("[")
+                for j, element in enumerate(value):
+                    if j:
+                        pending.append(", ")
+                    pending.append(element if isinstance(element, Node) else repr(element))
+                pending.append("]")
+            else:
+                pending.append(value if isinstance(value, Node) else repr(value))
+        pending.append(")")
+        pending.reverse()
+        stack.extend(pending)
+    return "".join(parts)
+
+
+def dump(node: Node, indent: str = "  ") -> str:
+    """Representación del árbol con una línea por nodo."""
+    lines: list[str] = []
+    stack: list[tuple[Node, int]] = [(node, 0)]
+    while stack:
+        node, depth = stack.pop()
+        attributes = [f"{name}={getattr(node, name)!r}" for name in node._fields
+                      if not isinstance(getattr(node, name), (Node, list, NodeList))]
+        lines.append(f"{indent * depth}{type(node).__name__}({', '.join(attributes)})")
+        children = list(node.children())
+        children.reverse()
+        stack.extend((child, depth + 1) for child in children)
+    return "\n".join(lines)
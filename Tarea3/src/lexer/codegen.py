@@ -0,0 +1,333 @@
+"""Ejecución de programas: traducción del árbol sintáctico a Python.
+
+compile_program() genera el código fuente Python de una función equivalente
+al Program (una asignación por sentencia, un if por IF), lo compila una
+sola vez con compile() y guarda el objeto código en una caché indexada por
+el hash de ese fuente. Ejecutar el programa es llamar a esa función: las
+variables son variables locales y las operaciones son las de Python, sin
+recorrer el árbol.
+
+    programa = Parser(Lexer(texto)).parse_programa()
+    compilado = compile_program(programa)
+    compilado.run({"X": 3})          # {"X": ..., "Y": ..., ...}
+
+La semántica numérica (INTEGER de 32 bits también en los resultados
+intermedios, división entera, REAL IEEE) es la de lexer.runtime.
+
+Uso como programa (desde Tarea3/src):
+
+    python -m lexer.codegen ARCHIVO.f [VAR=VALOR ...] [--source]
+"""
+from __future__ import annotations
+import hashlib
+import math
+import sys
+import threading
+from types import CodeType
+from typing import Callable, Dict
+
+from .ast_nodes import Assignment, BinOp, Constant, If, Name, Node, Program, UnaryOp
+from .runtime import (INTEGER_MIN, MODULAR_OPS, binary_type, convert, implicit_type, integer_div,
+                      integer_pow, real_div, real_pow, real_to_integer, wrap_integer)
+
+# Más anidamiento que esto en una expresión se parte en variables temporales
+# (el compilador de Python limita los paréntesis anidados a 200)
+MAX_EXPRESSION_DEPTH = 64
+# Más IF anidados que esto se traducen con variables de guarda en vez de
+# sangría (Python admite 100 niveles)
+MAX_BLOCK_DEPTH = 64
+
+_PYTHON_OPERATORS = {
+    "PLUS": "+", "MINUS": "-", "MULT": "*",
+    "EQ": "==", "NE": "!=", "LT": "<", "LE": "<=", "GT": ">", "GE": ">=",
+}
+# Lo que ve el código generado como variables globales
+_RUNTIME = {
+    "_idiv": integer_div, "_ipow": integer_pow,
+    "_rdiv": real_div, "_rpow": real_pow, "_r2i": real_to_integer,
+}
+
+
+class CompileError(ValueError):
+    pass
+
+
+class CompiledProgram:
+    """Un programa traducido: el fuente generado, su objeto código y la
+    función lista para llamar."""
+
+    def __init__(self, name: str, source: str, code: CodeType, variables: Dict[str, str]):
+        self.name = name
+        self.source = source
+        self.code = code
+        self.variables = variables      # nombre -> "INTEGER" o "REAL"
+        namespace = dict(_RUNTIME)
+        exec(code, namespace)
+        self.function: Callable[..., Dict[str, int | float]] = namespace[_function_name(name)]
+
+    def run(self, inputs: Dict[str, int | float] | None = None) -> Dict[str, int | float]:
+        """Ejecuta el programa con los valores iniciales dados (las demás
+        variables empiezan en cero) y devuelve el valor final de todas."""
+        if not inputs:
+            return self.function()
+        arguments = {}
+        for name, value in inputs.items():
+            key = name.upper()
+            if key not in self.variables:
+                raise KeyError(f"El programa {self.name} no usa la variable {name}")
+            arguments[key] = convert(value, self.variables[key])
+        return self.function(**arguments)
+
+
+def _function_name(program_name: str) -> str:
+    return f"programa_{program_name}"
+
+
+def program_variables(program: Program) -> Dict[str, str]:
+    """Variables del programa con su tipo, declaradas primero y después las
+    implícitas en orden de aparición."""
+    variables = {declaration.target.name: declaration.type_name
+                 for declaration in program.declarations}
+    stack: list[Node] = list(reversed(program.statements))
+    while stack:
+        node = stack.pop()
+        if isinstance(node, Name):
+            variables.setdefault(node.name, implicit_type(node.name))
+        else:
+            children = list(node.children())
+            children.reverse()
+            stack.extend(children)
+    return variables
+
+
+def _literal(node: Constant) -> str:
+    value = node.value
+    if isinstance(value, float):
+        return repr(value) if math.isfinite(value) else f"float({str(value)!r})"
+    value = wrap_integer(value)
+    return str(value) if value >= 0 else f"({value})"
+
+
+def _wrapped(code: str) -> str:
+    """Código que reduce un INTEGER a 32 bits en complemento a dos."""
+    return f"(({code} + {-INTEGER_MIN} & {2 * -INTEGER_MIN - 1}) - {-INTEGER_MIN})"
+
+
+class _SourceWriter:
+    def __init__(self, variables: Dict[str, str]):
+        self.variables = variables
+        self.lines: list[str] = []
+        self.temporaries = 0
+        self.guards = 0
+
+    def emit(self, indent: int, line: str) -> None:
+        self.lines.append("    " * indent + line)
+
+    def expression(self, node: Node, indent: int) -> tuple[str, str, bool]:
+        """Código y tipo de la expresión, y si su valor ya está reducido a 32
+        bits (si es INTEGER). Los subárboles demasiado profundos se asignan
+        antes a temporales (emitidas con la sangría dada).
+
+        Las sumas, restas y productos INTEGER se calculan con enteros exactos
+        y se reducen recién donde lexer.runtime lo exige, así el resultado
+        es el mismo que reduciendo cada operación.
+        """
+        # (código, tipo, profundidad, reducido)
+        values: list[tuple[str, str, int, bool]] = []
+        stack: list[tuple[Node, bool]] = [(node, False)]
+        while stack:
+            node, expanded = stack.pop()
+            if isinstance(node, Name):
+                values.append((node.name, self.variables[node.name], 0, True))
+                continue
+            if isinstance(node, Constant):
+                values.append((_literal(node), "INTEGER" if node.kind == "INT" else "REAL", 0,
+                               True))
+                continue
+            if not isinstance(node, (BinOp, UnaryOp)):
+                raise CompileError(f"Expresión no soportada: {type(node).__name__}")
+            if not expanded:
+                stack.append((node, True))
+                if isinstance(node, BinOp):
+                    stack.append((node.right, False))
+                    stack.append((node.left, False))
+                else:
+                    stack.append((node.operand, False))
+                continue
+
+            if isinstance(node, UnaryOp):
+                code, type_name, depth, wrapped = values.pop()
+                if node.op == "MINUS":
+                    code, depth = f"(-{code})", depth + 1
+                    wrapped = type_name != "INTEGER"
+            else:
+                right, right_type, right_depth, right_wrapped = values.pop()
+                left, left_type, left_depth, left_wrapped = values.pop()
+                op = node.op
+                type_name = binary_type(op, left_type, right_type)
+                if type_name != "INTEGER" or op not in MODULAR_OPS:
+                    if left_type == "INTEGER" and not left_wrapped:
+                        left, left_depth = _wrapped(left), left_depth + 2
+                    if right_type == "INTEGER" and not right_wrapped:
+                        right, right_depth = _wrapped(right), right_depth + 2
+                depth = max(left_depth, right_depth) + 1
+                code = self.operation(node, left, right, type_name)
+                # _ipow ya reduce; el cociente de INTEGER_MIN / -1 no cabe
+                wrapped = type_name != "INTEGER" or op == "POWER"
+            if depth >= MAX_EXPRESSION_DEPTH:
+                self.temporaries += 1
+                temporary = f"_t{self.temporaries}"
+                self.emit(indent, f"{temporary} = {code}")
+                code, depth = temporary, 0
+            values.append((code, type_name, depth, wrapped))
+        code, type_name, _, wrapped = values.pop()
+        return code, type_name, wrapped
+
+    @staticmethod
+    def operation(node: BinOp, left: str, right: str, type_name: str) -> str:
+        op = node.op
+        if op == "DIV":
+            if type_name == "INTEGER":
+                return f"_idiv({left}, {right})"
+            divisor = node.right
+            if isinstance(divisor, Constant) and (divisor.value if divisor.kind != "INT"
+                                                  else wrap_integer(divisor.value)):
+                return f"({left} / {right})"
+            return f"_rdiv({left}, {right})"
+        if op == "POWER":
+            if type_name == "INTEGER":
+                return f"_ipow({left}, {right})"
+            return f"_rpow({left}, {right})"
+        if op not in _PYTHON_OPERATORS:
+            raise CompileError(f"Operador no soportado: {op}")
+        return f"({left} {_PYTHON_OPERATORS[op]} {right})"
+
+    def assignment(self, statement: Assignment, indent: int) -> None:
+        target = statement.target.name
+        code, type_name, wrapped = self.expression(statement.value, indent)
+        if self.variables[target] == "REAL":
+            if type_name == "INTEGER":
+                code = f"float({code if wrapped else _wrapped(code)})"
+        elif type_name == "REAL":
+            code = f"_r2i({code})"
+        elif not wrapped:
+            code = _wrapped(code)
+        self.emit(indent, f"{target} = {code}")
+
+    def block(self, statements: list[Node], indent: int) -> None:
+        """Emite las sentencias; cada marco de la pila es (sentencias, posición,
+        sangría, guarda), con guarda None fuera del modo de guardas."""
+        stack: list[tuple[list[Node], int, int, str | None]] = [(statements, 0, indent, None)]
+        while stack:
+            statements, index, indent, guard = stack.pop()
+            if index == len(statements):
+                continue
+            stack.append((statements, index + 1, indent, guard))
+            statement = statements[index]
+
+            if isinstance(statement, If) and statement.condition is None:
+                raise CompileError("El programa tiene errores sintácticos (IF sin condición)")
+            if isinstance(statement, If) and (guard is not None or indent >= MAX_BLOCK_DEPTH):
+                # Modo de guardas: el cuerpo queda a la misma sangría y cada
+                # sentencia se ejecuta bajo "if _gN:"
+                self.guards += 1
+                name = f"_g{self.guards}"
+                inner = indent
+                if guard is not None:
+                    self.emit(indent, f"{name} = False")
+                    self.emit(indent, f"if {guard}:")
+                    inner = indent + 1
+                condition = self.expression(statement.condition, inner)[0]
+                self.emit(inner, f"{name} = {condition}")
+                stack.append((statement.body, 0, indent, name))
+                continue
+
+            inner = indent
+            if guard is not None:
+                self.emit(indent, f"if {guard}:")
+                inner = indent + 1
+            if isinstance(statement, Assignment):
+                self.assignment(statement, inner)
+            elif isinstance(statement, If):
+                condition = self.expression(statement.condition, indent)[0]
+                self.emit(indent, f"if {condition}:")
+                if not statement.body:
+                    self.emit(indent + 1, "pass")
+                stack.append((statement.body, 0, indent + 1, None))
+            else:
+                raise CompileError(f"Sentencia no soportada: {type(statement).__name__}")
+
+
+def python_source(program: Program) -> str:
+    """Fuente Python de la función que ejecuta el programa."""
+    variables = program_variables(program)
+    writer = _SourceWriter(variables)
+    parameters = ", ".join(f"{name}={0 if type_name == 'INTEGER' else 0.0}"
+                           for name, type_name in variables.items())
+    writer.emit(0, f"# PROGRAM {program.name}")
+    writer.emit(0, f"def {_function_name(program.name)}({parameters}):")
+    writer.block(program.statements, 1)
+    result = ", ".join(f"{name!r}: {name}" for name in variables)
+    writer.emit(1, f"return {{{result}}}")
+    return "\n".join(writer.lines) + "\n"
+
+
+# Caché de todo el proceso, indexada por el sha256 del fuente generado
+_CODE_CACHE: Dict[str, CodeType] = {}
+_CODE_CACHE_LOCK = threading.Lock()
+_CODE_CACHE_SIZE = 64
+
+
+def compile_source(source: str, name: str = "programa") -> CodeType:
+    key = hashlib.sha256(source.encode("utf-8")).hexdigest()
+    code = _CODE_CACHE.get(key)
+    if code is not None:
+        return code
+
+    with _CODE_CACHE_LOCK:
+        code = _CODE_CACHE.get(key)
+        if code is None:
+            code = compile(source, f"<fortran {name}>", "exec")
+            if len(_CODE_CACHE) >= _CODE_CACHE_SIZE:
+                # Se descarta la entrada más antigua (orden de inserción)
+                del _CODE_CACHE[next(iter(_CODE_CACHE))]
+            _CODE_CACHE[key] = code
+    return code
+
+
+def compile_program(program: Program) -> CompiledProgram:
+    source = python_source(program)
+    return CompiledProgram(program.name, source, compile_source(source, program.name),
+                           program_variables(program))
+
+
+def main(argv: list[str] | None = None) -> int:
+    import argparse
+    from .lexer_engine import Lexer
+    from .parser import Parser
+
+    parser = argparse.ArgumentParser(prog="python -m lexer.codegen",
+                                     description="Ejecuta un programa Fortran")
+    parser.add_argument("path")
+    parser.add_argument("inputs", nargs="*", metavar="VAR=VALOR")
+    parser.add_argument("--source", action="store_true",
+                        help="mostrar el Python generado en vez de ejecutar")
+    args = parser.parse_args(argv)
+
+    with open(args.path, encoding="utf-8") as file:
+        program = Parser(Lexer(file.read())).parse_programa()
+    compiled = compile_program(program)
+    if args.source:
+        print(compiled.source, end="")
+        return 0
+    inputs: Dict[str, int | float] = {}
+    for item in args.inputs:
+        name, _, value = item.partition("=")
+        inputs[name] = float(value) if any(c in value for c in ".eEdD") else int(value)
+    for name, value in compiled.run(inputs).items():
+        print(f"{name} = {value}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
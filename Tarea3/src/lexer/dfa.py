@@ -0,0 +1,654 @@
+"""Generador de lexers por tabla: regex del registro -> AFN -> AFD mínimo.
+
+El patrón que arma TokenRegistry.build_regex_pattern() se traduce con la
+construcción de Thompson a un AFN, se determiniza por subconjuntos y se
+minimiza con el algoritmo de Hopcroft. El resultado es una tabla de
+transiciones (estados x clases de caracteres) guardada en un `array`, que
+DFALexer recorre con la regla del match más largo en tiempo lineal.
+
+Uso (desde Tarea3/src):
+
+    python -m lexer.dfa [ARCHIVO]     # construye la tabla y la guarda
+"""
+from __future__ import annotations
+import json
+import os
+import struct
+import sys
+import threading
+from array import array
+from collections import deque
+from typing import Dict, Iterator
+
+from .lexer_engine import ErrorBudget, Lexer, LexerSpec, TokenRegistry, SKIPPED_GROUPS
+
+# Alfabeto: los 128 códigos ASCII más un símbolo que representa a todos los
+# caracteres no ASCII (ninguna regla los distingue entre sí)
+OTHER = 128
+ALPHABET_SIZE = 129
+FULL_SET = (1 << ALPHABET_SIZE) - 1
+NEWLINE_SET = 1 << ord("\n")
+
+DEAD = 0  # estado sumidero: ningún token puede continuar
+
+_ESCAPES = {"t": "\t", "n": "\n", "r": "\r", "f": "\f", "v": "\v"}
+# Alternación vacía de TokenRegistry._create_alternation
+_NEVER = "(?!x)x"
+
+
+class RegexSyntaxError(ValueError):
+    """Construcción de la regex que el generador no sabe traducir."""
+
+
+def _char_set(char: str, ignore_case: bool) -> int:
+    code = ord(char)
+    mask = 1 << (code if code < OTHER else OTHER)
+    if ignore_case and char.isascii() and char.isalpha():
+        mask |= 1 << ord(char.swapcase())
+    return mask
+
+
+class _RegexParser:
+    """Analizador descendente del subconjunto de `re` que usa el registro:
+    grupos (con nombre, (?:...) y (?i:...)), alternación, clases [...],
+    escapes, *, +, ?, {m,n} y ^ al comienzo de una regla. Ignora los
+    espacios como re.VERBOSE.
+
+    Los nodos son tuplas: ("set", máscara), ("cat", [..]), ("alt", [..]),
+    ("star", n), ("plus", n), ("opt", n), ("rep", n, min, max), ("bol",),
+    ("group", nombre, n).
+    """
+
+    def __init__(self, pattern: str):
+        self.pattern = pattern
+        self.pos = 0
+
+    def error(self, message: str) -> RegexSyntaxError:
+        return RegexSyntaxError(f"{message} en la posición {self.pos} del patrón")
+
+    def peek(self) -> str:
+        self._skip_blanks()
+        return self.pattern[self.pos] if self.pos < len(self.pattern) else ""
+
+    def _skip_blanks(self) -> None:
+        while self.pos < len(self.pattern) and self.pattern[self.pos] in " \t\r\n":
+            self.pos += 1
+
+    def take(self) -> str:
+        char = self.peek()
+        self.pos += 1
+        return char
+
+    def parse(self) -> tuple:
+        node = self.parse_alternation(False)
+        if self.peek():
+            raise self.error(f"carácter inesperado {self.peek()!r}")
+        return node
+
+    def parse_alternation(self, ignore_case: bool) -> tuple:
+        branches = [self.parse_concatenation(ignore_case)]
+        while self.peek() == "|":
+            self.pos += 1
+            branches.append(self.parse_concatenation(ignore_case))
+        return branches[0] if len(branches) == 1 else ("alt", branches)
+
+    def parse_concatenation(self, ignore_case: bool) -> tuple:
+        items = []
+        while self.peek() not in ("", "|", ")"):
+            items.append(self.parse_repetition(ignore_case))
+        return items[0] if len(items) == 1 else ("cat", items)
+
+    def parse_repetition(self, ignore_case: bool) -> tuple:
+        node = self.parse_atom(ignore_case)
+        while True:
+            char = self.peek()
+            if char == "*":
+                node = ("star", node)
+            elif char == "+":
+                node = ("plus", node)
+            elif char == "?":
+                node = ("opt", node)
+            elif char == "{":
+                node = self.parse_bounds(node)
+                continue
+            else:
+                return node
+            self.pos += 1
+            if self.pattern.startswith(("?", "+"), self.pos):
+                raise self.error("cuantificador perezoso o posesivo")
+
+    def parse_bounds(self, node: tuple) -> tuple:
+        end = self.pattern.find("}", self.pos)
+        low, comma, high = self.pattern[self.pos + 1:end].partition(",")
+        try:
+            minimum = int(low)
+            maximum = minimum if not comma else (int(high) if high else None)
+        except ValueError:
+            raise self.error("repetición {m,n} inválida") from None
+        self.pos = end + 1
+        return ("rep", node, minimum, maximum)
+
+    def parse_atom(self, ignore_case: bool) -> tuple:
+        char = self.take()
+        if char == "(":
+            return self.parse_group(ignore_case)
+        if char == "[":
+            return ("set", self.parse_class(ignore_case))
+        if char == "\\":
+            return ("set", self.parse_escape(ignore_case))
+        if char == "^":
+            return ("bol",)
+        if char == ".":
+            return ("set", FULL_SET & ~NEWLINE_SET)
+        if char == "$":
+            raise self.error("ancla $ no soportada")
+        return ("set", _char_set(char, ignore_case))
+
+    def parse_group(self, ignore_case: bool) -> tuple:
+        name = None
+        if self.pattern.startswith("?!x)x", self.pos):
+            # Alternación vacía: un lenguaje sin palabras
+            self.pos += len(_NEVER) - 1
+            return ("set", 0)
+        if self.pattern.startswith("?P<", self.pos):
+            end = self.pattern.index(">", self.pos)
+            name = self.pattern[self.pos + 3:end]
+            self.pos = end + 1
+        elif self.pattern.startswith("?:", self.pos):
+            self.pos += 2
+        elif self.pattern.startswith("?i:", self.pos):
+            self.pos += 3
+            ignore_case = True
+        elif self.pattern.startswith("?", self.pos):
+            raise self.error("grupo especial no soportado")
+
+        node = self.parse_alternation(ignore_case)
+        if self.take() != ")":
+            raise self.error("falta ')'")
+        return node if name is None else ("group", name, node)
+
+    def parse_class(self, ignore_case: bool) -> int:
+        # Dentro de [...] los espacios son literales (también en VERBOSE)
+        pattern = self.pattern
+        negated = pattern.startswith("^", self.pos)
+        if negated:
+            self.pos += 1
+        mask = 0
+        first = True
+        while True:
+            if self.pos >= len(pattern):
+                raise self.error("falta ']'")
+            char = pattern[self.pos]
+            self.pos += 1
+            if char == "]" and not first:
+                break
+            first = False
+            if char == "\\":
+                low = self.parse_escape(ignore_case)
+                mask |= low
+                continue
+            if pattern.startswith("-", self.pos) and not pattern.startswith("-]", self.pos):
+                high = pattern[self.pos + 1]
+                self.pos += 2
+                for code in range(ord(char), ord(high) + 1):
+                    mask |= _char_set(chr(code), ignore_case)
+            else:
+                mask |= _char_set(char, ignore_case)
+        return FULL_SET & ~mask if negated else mask
+
+    def parse_escape(self, ignore_case: bool) -> int:
+        char = self.pattern[self.pos]
+        self.pos += 1
+        if char in _ESCAPES:
+            return _char_set(_ESCAPES[char], False)
+        if char.isalnum():
+            raise self.error(f"escape \\{char} no soportado")
+        return _char_set(char, ignore_case)
+
+
+def registry_rules(registry: TokenRegistry) -> list[tuple[str, tuple, bool]]:
+    """Reglas (grupo, nodo, solo_inicio_de_línea) en el orden de prioridad del patrón."""
+    tree = _RegexParser(registry.build_regex_pattern()).parse()
+    branches = tree[1] if tree[0] == "alt" else [tree]
+    rules = []
+    for branch in branches:
+        if branch[0] != "group":
+            raise RegexSyntaxError("cada alternativa del patrón debe ser un grupo con nombre")
+        _, name, node = branch
+        items = list(node[1]) if node[0] == "cat" else [node]
+        line_start = items[0] == ("bol",)
+        if line_start:
+            items.pop(0)
+        rules.append((name, items[0] if len(items) == 1 else ("cat", items), line_start))
+    return rules
+
+
+class _NFA:
+    """AFN de Thompson: transiciones por conjunto de caracteres y épsilon."""
+
+    def __init__(self):
+        self.edges: list[list[tuple[int, int]]] = []
+        self.epsilon: list[list[int]] = []
+        self.accepts: Dict[int, int] = {}
+
+    def new_state(self) -> int:
+        self.edges.append([])
+        self.epsilon.append([])
+        return len(self.edges) - 1
+
+    def build(self, node: tuple) -> tuple[int, int]:
+        """Fragmento (inicio, fin) que reconoce node."""
+        kind = node[0]
+        if kind == "set":
+            start, end = self.new_state(), self.new_state()
+            if node[1]:
+                self.edges[start].append((node[1], end))
+            return start, end
+        if kind == "cat":
+            start, end = self.build(node[1][0])
+            for item in node[1][1:]:
+                item_start, item_end = self.build(item)
+                self.epsilon[end].append(item_start)
+                end = item_end
+            return start, end
+        if kind == "alt":
+            start, end = self.new_state(), self.new_state()
+            for branch in node[1]:
+                branch_start, branch_end = self.build(branch)
+                self.epsilon[start].append(branch_start)
+                self.epsilon[branch_end].append(end)
+            return start, end
+        if kind in ("star", "plus", "opt"):
+            start, end = self.new_state(), self.new_state()
+            inner_start, inner_end = self.build(node[1])
+            self.epsilon[start].append(inner_start)
+            self.epsilon[inner_end].append(end)
+            if kind != "plus":
+                self.epsilon[start].append(end)
+            if kind != "opt":
+                self.epsilon[inner_end].append(inner_start)
+            return start, end
+        if kind == "rep":
+            _, inner, minimum, maximum = node
+            items = [inner] * minimum
+            if maximum is None:
+                items.append(("star", inner))
+            else:
+                items += [("opt", inner)] * (maximum - minimum)
+            if not items:
+                start = self.new_state()
+                return start, start
+            return self.build(("cat", items))
+        if kind == "group":
+            return self.build(node[2])
+        raise RegexSyntaxError("^ solo se admite al comienzo de una regla")
+
+
+def _byte_classes(nfa: _NFA) -> tuple[bytes, list[int]]:
+    """Agrupa los caracteres que ninguna transición distingue entre sí."""
+    masks = {mask for edges in nfa.edges for mask, _ in edges}
+    signatures: Dict[tuple[bool, ...], int] = {}
+    class_map = bytearray(ALPHABET_SIZE)
+    class_masks: list[int] = []
+    ordered = sorted(masks)
+    for code in range(ALPHABET_SIZE):
+        bit = 1 << code
+        signature = tuple(bool(mask & bit) for mask in ordered)
+        class_id = signatures.get(signature)
+        if class_id is None:
+            class_id = signatures[signature] = len(class_masks)
+            class_masks.append(0)
+        class_map[code] = class_id
+        class_masks[class_id] |= bit
+    if len(class_masks) > 255:
+        raise RegexSyntaxError("demasiadas clases de caracteres para la tabla")
+    return bytes(class_map), class_masks
+
+
+class DFATable:
+    """AFD mínimo en forma de tabla.
+
+    transitions[state * n_classes + clase] es el estado siguiente (DEAD = 0),
+    accepts[state] el índice de la regla aceptada o -1, y class_map asigna a
+    cada código ASCII (y a OTHER) su clase de caracteres.
+    """
+
+    MAGIC = b"F77DFA1\n"
+
+    def __init__(self, fingerprint: str, rule_names: list[str], class_map: bytes,
+                 transitions: array, accepts: array, start_bol: int, start_mid: int):
+        self.fingerprint = fingerprint
+        self.rule_names = list(rule_names)
+        self.class_map = bytes(class_map)
+        self.n_classes = max(self.class_map) + 1
+        self.transitions = transitions
+        self.accepts = accepts
+        self.start_bol = start_bol
+        self.start_mid = start_mid
+        self._translation = _ClassTranslation(self.class_map)
+        self.emitted = [name not in SKIPPED_GROUPS for name in self.rule_names]
+        self._premultiplied: tuple[list[int], list[int], int, int] | None = None
+
+    @property
+    def n_states(self) -> int:
+        return len(self.accepts)
+
+    @classmethod
+    def from_registry(cls, registry: TokenRegistry) -> DFATable:
+        rules = registry_rules(registry)
+        nfa = _NFA()
+        start_mid, start_bol = nfa.new_state(), nfa.new_state()
+        for index, (name, node, line_start) in enumerate(rules):
+            start, end = nfa.build(node)
+            nfa.accepts[end] = index
+            nfa.epsilon[start_bol].append(start)
+            if not line_start:
+                nfa.epsilon[start_mid].append(start)
+
+        class_map, class_masks = _byte_classes(nfa)
+        states, delta, accepts, starts = _subset_construction(nfa, class_masks, (start_bol, start_mid))
+        transitions, accepts, (bol, mid) = _hopcroft(delta, accepts, len(class_masks), starts)
+        table = cls(registry.fingerprint(), [name for name, _, _ in rules], class_map,
+                    transitions, accepts, bol, mid)
+        table.stats = {"nfa": len(nfa.edges), "dfa": len(states), "min": table.n_states,
+                       "classes": len(class_masks)}
+        return table
+
+    def premultiplied(self) -> tuple[list[int], list[int], int, int]:
+        """(transiciones, aceptaciones, inicio_bol, inicio) con cada estado
+        multiplicado por n_classes: el driver avanza con una sola suma."""
+        if self._premultiplied is None:
+            n_classes = self.n_classes
+            self._premultiplied = (
+                [target * n_classes for target in self.transitions],
+                [rule for rule in self.accepts for _ in range(n_classes)],
+                self.start_bol * n_classes, self.start_mid * n_classes)
+        return self._premultiplied
+
+    def classify(self, text: str) -> bytes:
+        """Clase de cada carácter de text, en un solo recorrido hecho en C."""
+        return text.translate(self._translation).encode("latin-1")
+
+    def to_bytes(self) -> bytes:
+        header = json.dumps({
+            "fingerprint": self.fingerprint, "rules": self.rule_names,
+            "states": self.n_states, "start_bol": self.start_bol,
+            "start_mid": self.start_mid, "byteorder": sys.byteorder,
+        }).encode("utf-8")
+        return b"".join((self.MAGIC, struct.pack("<I", len(header)), header, self.class_map,
+                         self.accepts.tobytes(), self.transitions.tobytes()))
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> DFATable:
+        if not data.startswith(cls.MAGIC):
+            raise ValueError("no es una tabla de AFD")
+        pos = len(cls.MAGIC)
+        (size,) = struct.unpack_from("<I", data, pos)
+        pos += 4
+        header = json.loads(data[pos:pos + size])
+        pos += size
+        class_map = data[pos:pos + ALPHABET_SIZE]
+        pos += ALPHABET_SIZE
+
+        accepts, transitions = array("h"), array("H")
+        n_states = header["states"]
+        accepts_end = pos + n_states * accepts.itemsize
+        accepts.frombytes(data[pos:accepts_end])
+        transitions.frombytes(data[accepts_end:accepts_end + n_states * (max(class_map) + 1) *
+                                   transitions.itemsize])
+        if header["byteorder"] != sys.byteorder:
+            accepts.byteswap()
+            transitions.byteswap()
+        return cls(header["fingerprint"], header["rules"], class_map, transitions,
+                   accepts, header["start_bol"], header["start_mid"])
+
+    def save(self, path: str) -> None:
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as file:
+            file.write(self.to_bytes())
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str) -> DFATable:
+        with open(path, "rb") as file:
+            return cls.from_bytes(file.read())
+
+
+class _ClassTranslation(dict):
+    """Tabla para str.translate: carácter -> clase (como carácter latin-1)."""
+
+    def __init__(self, class_map: bytes):
+        super().__init__((code, chr(class_map[code])) for code in range(OTHER))
+        self.other = chr(class_map[OTHER])
+
+    def __missing__(self, code: int) -> str:
+        return self.other
+
+
+def _subset_construction(nfa: _NFA, class_masks: list[int], starts: tuple[int, ...]):
+    n_classes = len(class_masks)
+    # Destinos de cada estado del AFN por clase (una clase cae entera dentro
+    # o fuera de cada máscara, por cómo se calcularon)
+    moves = [[[target for mask, target in edges if mask & class_mask]
+              for class_mask in class_masks] for edges in nfa.edges]
+
+    def closure(states) -> frozenset[int]:
+        seen = set(states)
+        stack = list(states)
+        while stack:
+            for target in nfa.epsilon[stack.pop()]:
+                if target not in seen:
+                    seen.add(target)
+                    stack.append(target)
+        return frozenset(seen)
+
+    ids: Dict[frozenset[int], int] = {frozenset(): DEAD}
+    states: list[frozenset[int]] = [frozenset()]
+    start_ids = []
+    for start in starts:
+        subset = closure([start])
+        if subset not in ids:
+            ids[subset] = len(states)
+            states.append(subset)
+        start_ids.append(ids[subset])
+
+    delta: list[list[int]] = []
+    accepts: list[int] = []
+    index = 0
+    while index < len(states):
+        subset = states[index]
+        row = []
+        for class_id in range(n_classes):
+            targets = {target for state in subset for target in moves[state][class_id]}
+            next_subset = closure(targets) if targets else frozenset()
+            next_id = ids.get(next_subset)
+            if next_id is None:
+                next_id = ids[next_subset] = len(states)
+                states.append(next_subset)
+            row.append(next_id)
+        delta.append(row)
+        rules = [nfa.accepts[state] for state in subset if state in nfa.accepts]
+        accepts.append(min(rules) if rules else -1)
+        index += 1
+    return states, delta, accepts, start_ids
+
+
+def _hopcroft(delta: list[list[int]], accepts: list[int], n_classes: int,
+              starts: list[int]) -> tuple[array, array, list[int]]:
+    """Minimiza el AFD; dos estados son equivalentes si aceptan la misma
+    regla y van a bloques equivalentes con cada clase."""
+    n_states = len(delta)
+    inverse = [[[] for _ in range(n_states)] for _ in range(n_classes)]
+    for state, row in enumerate(delta):
+        for class_id, target in enumerate(row):
+            inverse[class_id][target].append(state)
+
+    groups: Dict[int, set[int]] = {}
+    for state, rule in enumerate(accepts):
+        groups.setdefault(rule, set()).add(state)
+    partition = list(groups.values())
+    worklist = [set(block) for block in partition]
+
+    while worklist:
+        splitter = worklist.pop()
+        for class_id in range(n_classes):
+            predecessors = {source for target in splitter for source in inverse[class_id][target]}
+            if not predecessors:
+                continue
+            refined = []
+            for block in partition:
+                inside = block & predecessors
+                if not inside or len(inside) == len(block):
+                    refined.append(block)
+                    continue
+                outside = block - predecessors
+                refined += [inside, outside]
+                if block in worklist:
+                    worklist.remove(block)
+                    worklist += [inside, outside]
+                else:
+                    worklist.append(inside if len(inside) <= len(outside) else outside)
+            partition = refined
+
+    # Renumeración: el bloque del sumidero es el 0 y el resto en orden BFS
+    block_of = {}
+    for number, block in enumerate(partition):
+        for state in block:
+            block_of[state] = number
+    order = {block_of[DEAD]: DEAD}
+    queue = deque(block_of[start] for start in starts)
+    representative = {block_of[state]: state for state in range(n_states)}
+    while queue:
+        block = queue.popleft()
+        if block in order:
+            continue
+        order[block] = len(order)
+        queue.extend(block_of[target] for target in delta[representative[block]])
+
+    transitions = array("H", bytes(2 * len(order) * n_classes))
+    min_accepts = array("h", [-1] * len(order))
+    for block, number in order.items():
+        state = representative[block]
+        min_accepts[number] = accepts[state]
+        for class_id, target in enumerate(delta[state]):
+            transitions[number * n_classes + class_id] = order[block_of[target]]
+    return transitions, min_accepts, [order[block_of[start]] for start in starts]
+
+
+# Tablas de todo el proceso, indexadas por TokenRegistry.fingerprint()
+_DFA_CACHE: Dict[str, DFATable] = {}
+_DFA_CACHE_LOCK = threading.Lock()
+
+
+def compiled_dfa(registry: TokenRegistry, path: str | None = None) -> DFATable:
+    """Tabla del registro: desde la caché, desde path si su huella coincide,
+    o construida (y guardada en path si se indicó)."""
+    fingerprint = registry.fingerprint()
+    table = _DFA_CACHE.get(fingerprint)
+    if table is not None:
+        return table
+
+    with _DFA_CACHE_LOCK:
+        table = _DFA_CACHE.get(fingerprint)
+        if table is None:
+            if path is not None and os.path.exists(path):
+                try:
+                    table = DFATable.load(path)
+                except (OSError, ValueError):
+                    table = None
+                if table is not None and table.fingerprint != fingerprint:
+                    table = None
+            if table is None:
+                table = DFATable.from_registry(registry)
+                if path is not None:
+                    table.save(path)
+            _DFA_CACHE[fingerprint] = table
+    return table
+
+
+class DFALexer(Lexer):
+    """Lexer que reemplaza la regex de `re` por la tabla del AFD mínimo.
+
+    Entrega el mismo flujo de tokens que Lexer (también en formato fijo);
+    la lectura por trozos de from_stream sigue usando la regex.
+    """
+
+    def __init__(self, text: str = "", registry: TokenRegistry | None = None,
+                 fixed_form: bool = False, table_path: str | None = None,
+                 max_errors: int | None = None, max_error_ratio: float | None = None):
+        super().__init__(text, registry, fixed_form, max_errors, max_error_ratio)
+        self.table_path = table_path
+        self.dfa = compiled_dfa(self.registry, table_path)
+
+    def _scan(self, text: str, pos: int = 0, spec: LexerSpec | None = None,
+              endpos: int | None = None,
+              budget: ErrorBudget | None = None) -> Iterator[tuple[str, int, int]]:
+        """Match más largo con la tabla; ante empate gana la regla anterior,
+        igual que el orden de los grupos en la regex."""
+        spec = spec or self.spec
+        dfa = self.dfa
+        if dfa.fingerprint != spec.fingerprint:
+            # El registro cambió (tokens()/tokenize() ya tomaron el spec nuevo)
+            dfa = self.dfa = compiled_dfa(self.registry, self.table_path)
+        end_of_text = len(text) if endpos is None else endpos
+        # Solo se clasifica el tramo [pos, end_of_text): en formato fijo cada
+        # línea es una llamada, y el estado queda local a la llamada para que
+        # tokenize() siga siendo reentrante
+        first = pos
+        classes = dfa.classify(text[first:end_of_text])
+
+        transitions, accepts, start_bol, start_mid = dfa.premultiplied()
+        names = dfa.rule_names
+        emitted = dfa.emitted
+        stride = len(transitions)
+        # Pares (estado, posición) desde los que ya se sabe que no se llega a
+        # aceptar: evitan recorrer dos veces la misma cola sin salida, lo que
+        # mantiene el costo total lineal en el largo del texto
+        failed: set[int] = set()
+
+        while pos < end_of_text:
+            state = start_bol if pos == 0 or text[pos - 1] == "\n" else start_mid
+            rule, token_end, accept_state = -1, pos, state
+            i = pos
+            while i < end_of_text:
+                if failed and i * stride + state in failed:
+                    break
+                state = transitions[state + classes[i - first]]
+                if not state:
+                    break
+                i += 1
+                if accepts[state] >= 0:
+                    rule, token_end, accept_state = accepts[state], i, state
+
+            if i > token_end:
+                state = accept_state
+                for j in range(token_end, i):
+                    failed.add(j * stride + state)
+                    state = transitions[state + classes[j - first]]
+
+            if rule < 0:
+                end = self._unknown_run_end(text, pos, end_of_text, spec, budget)
+                yield "ERROR", pos, end
+                pos = end
+                continue
+            if emitted[rule]:
+                yield names[rule], pos, token_end
+            pos = token_end
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = sys.argv[1:] if argv is None else argv
+    table = DFATable.from_registry(TokenRegistry())
+    stats = table.stats
+    print(f"AFN de Thompson: {stats['nfa']} estados")
+    print(f"AFD por subconjuntos: {stats['dfa']} estados")
+    print(f"AFD mínimo (Hopcroft): {stats['min']} estados x {stats['classes']} clases")
+    print(f"Tabla: {len(table.transitions) * table.transitions.itemsize} bytes")
+    if args:
+        table.save(args[0])
+        print(f"Guardada en {args[0]}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+"""Errores sintácticos y diagnósticos de los parsers.
+
+Sin recuperación, los parsers lanzan ParseError (un SyntaxError) en el primer
+error, como siempre. Con recover=True cada error se guarda como Diagnostic,
+el parser se resincroniza (modo pánico) y sigue, de modo que una sola pasada
+entrega la lista completa de errores del archivo.
+
+Uso como programa (desde Tarea3/src), por ejemplo en integración continua:
+
+    python -m lexer.diagnostics ARCHIVO.f [ARCHIVO.f ...] [--max-errors N] [--ll1]
+"""
+from __future__ import annotations
+import argparse
+import sys
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Iterator
+
+if TYPE_CHECKING:
+    from .lexer_engine import Token
+
+DEFAULT_MAX_ERRORS = 100
+
+
+class ParseError(SyntaxError):
+    """Error sintáctico con el token donde se detectó.
+
+    detail es el mensaje sin la posición (cuando el mensaje completo la
+    incluye), para los diagnósticos que la llevan aparte.
+    """
+
+    def __init__(self, message: str, token: Token, detail: str | None = None):
+        super().__init__(message)
+        self.token = token
+        self.detail = detail or message
+
+
+@dataclass(frozen=True)
+class Diagnostic:
+    message: str
+    line: int
+    col: int
+    offset: int
+    found: str      # kind del token encontrado
+
+    @classmethod
+    def from_error(cls, error: ParseError) -> Diagnostic:
+        token = error.token
+        line, col = token.position
+        return cls(error.detail, line, col, token.offset, token.kind)
+
+    def __str__(self) -> str:
+        return f"[{self.line}:{self.col}] {self.message}"
+
+
+class Diagnostics:
+    """Diagnósticos de un análisis, con un máximo de errores: al alcanzarlo
+    add() devuelve False y el parser deja de analizar."""
+
+    def __init__(self, max_errors: int | None = DEFAULT_MAX_ERRORS):
+        self.items: list[Diagnostic] = []
+        self.max_errors = max_errors
+        self.truncated = False
+
+    def add(self, error: ParseError) -> bool:
+        if self.truncated:
+            return False
+        self.items.append(Diagnostic.from_error(error))
+        if self.max_errors is not None and len(self.items) >= self.max_errors:
+            self.truncated = True
+            return False
+        return True
+
+    def __iter__(self) -> Iterator[Diagnostic]:
+        return iter(self.items)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def __bool__(self) -> bool:
+        return bool(self.items)
+
+    def report(self) -> str:
+        lines = [str(diagnostic) for diagnostic in self.items]
+        if self.truncated:
+            lines.append(f"Demasiados errores ({len(self.items)}); análisis detenido.")
+        return "\n".join(lines)
+
+
+def main(argv: list[str] | None = None) -> int:
+    from .lexer_engine import Lexer
+    from .parser import Parser
+    from .ll1_parser import LL1Parser
+
+    parser = argparse.ArgumentParser(prog="python -m lexer.diagnostics",
+                                     description="Lista todos los errores sintácticos")
+    parser.add_argument("paths", nargs="+")
+    parser.add_argument("--max-errors", type=int, default=DEFAULT_MAX_ERRORS)
+    parser.add_argument("--ll1", action="store_true", help="usar LL1Parser")
+    parser.add_argument("--free-form", action="store_true",
+                        help="no aplicar las reglas de columnas del formato fijo")
+    args = parser.parse_args(argv)
+
+    failed = 0
+    for path in args.paths:
+        with open(path, encoding="utf-8", errors="replace") as file:
+            lexer = Lexer(file.read(), fixed_form=not args.free_form)
+        if args.ll1:
+            checker = LL1Parser(lexer, recover=True, max_errors=args.max_errors)
+            checker.parse()
+        else:
+            checker = Parser(lexer, recover=True, max_errors=args.max_errors)
+            checker.parse_programa()
+        for diagnostic in checker.diagnostics:
+            print(f"{path}:{diagnostic.line}:{diagnostic.col}: {diagnostic.message}")
+        if checker.diagnostics.truncated:
+            print(f"{path}: demasiados errores, análisis detenido")
+        failed += bool(checker.diagnostics)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,324 @@
+"""Herramientas de gramáticas LL(1): lectura de BNF, conjuntos anulables,
+FIRST y FOLLOW, y construcción de la tabla M.
+
+Los tres conjuntos se calculan como puntos fijos con listas de trabajo:
+cuando el conjunto de un no terminal cambia, solo se revisan las
+producciones (o restricciones) que dependen de él.
+
+La tabla generada se guarda en disco, bajo un nombre que es el hash de la
+gramática normalizada, para no recalcularla en cada arranque. Uso como
+programa (desde Tarea3/src):
+
+    python -m lexer.grammar [GRAMATICA.bnf]     # conjuntos, tabla y conflictos
+"""
+from __future__ import annotations
+import hashlib
+import json
+import os
+import sys
+import threading
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, Iterable
+
+GRAMMAR_PATH = os.path.join(os.path.dirname(__file__), "fortran.bnf")
+EPSILON = "ε"
+END_MARKER = "EOF"
+# Cambiar si cambia el formato de la caché o el algoritmo
+CACHE_FORMAT = 1
+
+
+def default_cache_dir() -> str:
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "teoria-computacion", "ll1")
+
+
+def is_nonterminal(symbol: str) -> bool:
+    return symbol.startswith("<") and symbol.endswith(">")
+
+
+@dataclass(frozen=True)
+class Grammar:
+    start: str
+    # (lado izquierdo, lado derecho) en el orden del archivo
+    productions: tuple[tuple[str, tuple[str, ...]], ...]
+
+    @classmethod
+    def parse(cls, text: str) -> Grammar:
+        productions: list[tuple[str, tuple[str, ...]]] = []
+        lhs = None
+        for number, raw in enumerate(text.splitlines(), 1):
+            line = raw.split("#", 1)[0].strip()
+            if not line:
+                continue
+            if "::=" in line:
+                lhs, _, line = (part.strip() for part in line.partition("::="))
+                if not is_nonterminal(lhs):
+                    raise ValueError(f"línea {number}: '{lhs}' no es un no terminal")
+            elif line.startswith("|") and lhs is not None:
+                line = line[1:]
+            else:
+                raise ValueError(f"línea {number}: se esperaba '<no_terminal> ::= ...'")
+            for alternative in line.split("|"):
+                symbols = tuple(s for s in alternative.split() if s != EPSILON)
+                productions.append((lhs, symbols))
+        if not productions:
+            raise ValueError("la gramática no tiene producciones")
+
+        grammar = cls(productions[0][0], tuple(productions))
+        undefined = {s for _, rhs in productions for s in rhs
+                     if is_nonterminal(s)} - set(grammar.nonterminals)
+        if undefined:
+            raise ValueError(f"no terminales sin reglas: {', '.join(sorted(undefined))}")
+        return grammar
+
+    @classmethod
+    def from_file(cls, path: str) -> Grammar:
+        with open(path, encoding="utf-8") as file:
+            return cls.parse(file.read())
+
+    @property
+    def nonterminals(self) -> list[str]:
+        return list(dict.fromkeys(lhs for lhs, _ in self.productions))
+
+    @property
+    def terminals(self) -> list[str]:
+        return list(dict.fromkeys(s for _, rhs in self.productions
+                                  for s in rhs if not is_nonterminal(s)))
+
+    def canonical(self) -> str:
+        """Texto normalizado: sin comentarios ni espacios de más."""
+        return "\n".join(f"{lhs} ::= {' '.join(rhs) or EPSILON}"
+                         for lhs, rhs in self.productions)
+
+    def fingerprint(self) -> str:
+        return hashlib.sha256(f"{CACHE_FORMAT}\n{self.canonical()}".encode("utf-8")).hexdigest()
+
+
+def _uses(grammar: Grammar) -> Dict[str, list[int]]:
+    """No terminal -> índices de las producciones en cuyo lado derecho aparece."""
+    uses: Dict[str, list[int]] = defaultdict(list)
+    for index, (_, rhs) in enumerate(grammar.productions):
+        for symbol in set(rhs):
+            if is_nonterminal(symbol):
+                uses[symbol].append(index)
+    return uses
+
+
+def nullable_set(grammar: Grammar) -> frozenset[str]:
+    productions, uses = grammar.productions, _uses(grammar)
+    nullable: set[str] = set()
+    worklist = list(range(len(productions)))
+    while worklist:
+        lhs, rhs = productions[worklist.pop()]
+        if lhs not in nullable and all(s in nullable for s in rhs):
+            nullable.add(lhs)
+            worklist.extend(uses[lhs])
+    return frozenset(nullable)
+
+
+def first_of(symbols: Iterable[str], first: Dict[str, set[str]],
+             nullable: frozenset[str]) -> tuple[set[str], bool]:
+    """FIRST de una secuencia y si la secuencia completa es anulable."""
+    result: set[str] = set()
+    for symbol in symbols:
+        if not is_nonterminal(symbol):
+            result.add(symbol)
+            return result, False
+        result |= first[symbol]
+        if symbol not in nullable:
+            return result, False
+    return result, True
+
+
+def first_sets(grammar: Grammar, nullable: frozenset[str]) -> Dict[str, frozenset[str]]:
+    productions, uses = grammar.productions, _uses(grammar)
+    first: Dict[str, set[str]] = {nt: set() for nt in grammar.nonterminals}
+    worklist = list(range(len(productions)))
+    while worklist:
+        lhs, rhs = productions[worklist.pop()]
+        symbols, _ = first_of(rhs, first, nullable)
+        if not symbols <= first[lhs]:
+            first[lhs] |= symbols
+            worklist.extend(uses[lhs])
+    return {nt: frozenset(symbols) for nt, symbols in first.items()}
+
+
+def follow_sets(grammar: Grammar, nullable: frozenset[str],
+                first: Dict[str, frozenset[str]]) -> Dict[str, frozenset[str]]:
+    follow: Dict[str, set[str]] = {nt: set() for nt in grammar.nonterminals}
+    follow[grammar.start].add(END_MARKER)
+    # A -> α B β con β anulable: FOLLOW(A) ⊆ FOLLOW(B)
+    feeds: Dict[str, set[str]] = defaultdict(set)
+    for lhs, rhs in grammar.productions:
+        for position, symbol in enumerate(rhs):
+            if not is_nonterminal(symbol):
+                continue
+            symbols, rest_nullable = first_of(rhs[position + 1:], first, nullable)
+            follow[symbol] |= symbols
+            if rest_nullable and symbol != lhs:
+                feeds[lhs].add(symbol)
+
+    worklist = list(follow)
+    while worklist:
+        source = worklist.pop()
+        for target in feeds[source]:
+            if not follow[source] <= follow[target]:
+                follow[target] |= follow[source]
+                worklist.append(target)
+    return {nt: frozenset(symbols) for nt, symbols in follow.items()}
+
+
+@dataclass(frozen=True)
+class Conflict:
+    nonterminal: str
+    terminal: str
+    # Producciones en conflicto; la tabla se queda con la primera
+    productions: tuple[tuple[str, ...], ...]
+
+    def __str__(self) -> str:
+        alternatives = " | ".join(" ".join(rhs) or EPSILON for rhs in self.productions)
+        return f"M[{self.nonterminal}, {self.terminal}]: {alternatives}"
+
+
+@dataclass
+class LL1Table:
+    fingerprint: str
+    start: str
+    nullable: frozenset[str]
+    first: Dict[str, frozenset[str]]
+    follow: Dict[str, frozenset[str]]
+    # M[no terminal][terminal] -> lado derecho de la producción
+    table: Dict[str, Dict[str, tuple[str, ...]]]
+    conflicts: list[Conflict] = field(default_factory=list)
+
+    @classmethod
+    def from_grammar(cls, grammar: Grammar) -> LL1Table:
+        nullable = nullable_set(grammar)
+        first = first_sets(grammar, nullable)
+        follow = follow_sets(grammar, nullable, first)
+
+        table: Dict[str, Dict[str, tuple[str, ...]]] = {nt: {} for nt in grammar.nonterminals}
+        candidates: Dict[tuple[str, str], list[tuple[str, ...]]] = defaultdict(list)
+        for lhs, rhs in grammar.productions:
+            lookaheads, rhs_nullable = first_of(rhs, first, nullable)
+            if rhs_nullable:
+                lookaheads = lookaheads | follow[lhs]
+            for terminal in lookaheads:
+                candidates[lhs, terminal].append(rhs)
+                table[lhs].setdefault(terminal, rhs)
+
+        conflicts = [Conflict(nt, terminal, tuple(rhss))
+                     for (nt, terminal), rhss in candidates.items() if len(rhss) > 1]
+        return cls(grammar.fingerprint(), grammar.start, nullable, first, follow, table, conflicts)
+
+    def to_dict(self) -> dict:
+        return {
+            "format": CACHE_FORMAT, "fingerprint": self.fingerprint, "start": self.start,
+            "nullable": sorted(self.nullable),
+            "first": {nt: sorted(s) for nt, s in self.first.items()},
+            "follow": {nt: sorted(s) for nt, s in self.follow.items()},
+            "table": {nt: {t: list(rhs) for t, rhs in row.items()}
+                      for nt, row in self.table.items()},
+            "conflicts": [[c.nonterminal, c.terminal, [list(rhs) for rhs in c.productions]]
+                          for c in self.conflicts],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> LL1Table:
+        if data.get("format") != CACHE_FORMAT:
+            raise ValueError("formato de tabla desconocido")
+        return cls(
+            data["fingerprint"], data["start"], frozenset(data["nullable"]),
+            {nt: frozenset(s) for nt, s in data["first"].items()},
+            {nt: frozenset(s) for nt, s in data["follow"].items()},
+            {nt: {t: tuple(rhs) for t, rhs in row.items()} for nt, row in data["table"].items()},
+            [Conflict(nt, t, tuple(tuple(rhs) for rhs in rhss))
+             for nt, t, rhss in data["conflicts"]],
+        )
+
+    def save(self, path: str) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as file:
+            json.dump(self.to_dict(), file)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str) -> LL1Table:
+        with open(path, encoding="utf-8") as file:
+            return cls.from_dict(json.load(file))
+
+
+# Tablas por huella de la gramática y, para no releer el archivo en cada
+# llamada, por (ruta, mtime, tamaño) del archivo del que salieron
+_TABLE_CACHE: Dict[str, LL1Table] = {}
+_FILE_TABLES: Dict[tuple[str, int, int], LL1Table] = {}
+_TABLE_CACHE_LOCK = threading.Lock()
+
+
+def compiled_table(path: str = GRAMMAR_PATH, cache_dir: str | None = None,
+                   disk_cache: bool = True) -> LL1Table:
+    """Tabla LL(1) de la gramática en path: desde la caché del proceso, desde
+    cache_dir (por omisión default_cache_dir()) si ya se generó para esta
+    misma gramática, o calculada y guardada ahí. Mientras el archivo no
+    cambie (misma fecha de modificación y tamaño) solo se consulta su stat."""
+    stat = os.stat(path)
+    file_key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+    table = _FILE_TABLES.get(file_key)
+    if table is not None:
+        return table
+
+    grammar = Grammar.from_file(path)
+    fingerprint = grammar.fingerprint()
+    with _TABLE_CACHE_LOCK:
+        table = _TABLE_CACHE.get(fingerprint)
+        if table is None:
+            cache_path = (os.path.join(cache_dir or default_cache_dir(), f"{fingerprint}.json")
+                          if disk_cache else None)
+            if cache_path is not None and os.path.exists(cache_path):
+                try:
+                    table = LL1Table.load(cache_path)
+                except (OSError, ValueError, KeyError):
+                    table = None
+                if table is not None and table.fingerprint != fingerprint:
+                    table = None
+            if table is None:
+                table = LL1Table.from_grammar(grammar)
+                if cache_path is not None:
+                    try:
+                        table.save(cache_path)
+                    except OSError:
+                        pass  # Sin caché en disco (directorio de solo lectura)
+            _TABLE_CACHE[fingerprint] = table
+        _FILE_TABLES[file_key] = table
+    return table
+
+
+def main(argv: list[str] | None = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    path = argv[0] if argv else GRAMMAR_PATH
+    table = LL1Table.from_grammar(Grammar.from_file(path))
+
+    print(f"Gramática: {path} (símbolo inicial {table.start})")
+    print(f"\nAnulables: {', '.join(sorted(table.nullable)) or '-'}")
+    print("\nFIRST / FOLLOW:")
+    for nt in table.table:
+        print(f"  {nt:<24} FIRST = {{{', '.join(sorted(table.first[nt]))}}}")
+        print(f"  {'':<24} FOLLOW = {{{', '.join(sorted(table.follow[nt]))}}}")
+    print("\nTabla M:")
+    for nt, row in table.table.items():
+        for terminal, rhs in sorted(row.items()):
+            print(f"  M[{nt}, {terminal}] = {' '.join(rhs) or EPSILON}")
+
+    if table.conflicts:
+        print(f"\n{len(table.conflicts)} conflicto(s), la gramática no es LL(1):")
+        for conflict in table.conflicts:
+            print(f"  {conflict}")
+        return 1
+    print("\nSin conflictos: la gramática es LL(1).")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
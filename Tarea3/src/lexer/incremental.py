@@ -0,0 +1,197 @@
+from __future__ import annotations
+from typing import Iterator
+
+from .lexer_engine import (Category, Lexer, LineIndex, Token, TokenRegistry,
+                           SKIPPED_GROUPS, STREAM_LOOKAHEAD, match_needs_more_text)
+
+# Token guardado por línea: (grupo, inicio, fin) relativos al inicio de la línea
+LineToken = tuple[str, int, int]
+
+
+def split_lines(text: str) -> list[str]:
+    """Divide en líneas conservando el "\\n" (la última línea nunca lo tiene)."""
+    parts = text.split("\n")
+    return [part + "\n" for part in parts[:-1]] + [parts[-1]]
+
+
+class IncrementalLexer:
+    """Lexer que conserva el flujo de tokens entre ediciones.
+
+    Por cada línea se guardan los tokens que comienzan en ella y su estado de
+    inicio: cuántos caracteres de la línea consume un token que empezó en una
+    línea anterior (p. ej. el espacio en blanco que cruza el salto de línea).
+    Al editar se vuelve a analizar solo desde la línea afectada y se detiene
+    en cuanto una línea no modificada recibe el mismo estado que tenía.
+    """
+
+    def __init__(self, text: str = "", registry: TokenRegistry | None = None,
+                 fixed_form: bool = False):
+        self.lexer = Lexer(registry=registry, fixed_form=fixed_form)
+        self.lines: list[str] = split_lines(text)
+        # Offsets de inicio de las primeras líneas: una edición descarta los
+        # de las líneas siguientes y se vuelven a calcular al leer hasta ahí,
+        # así editar y pedir los primeros tokens no recorre todo el archivo.
+        # La edición crea una lista nueva: los tokens ya entregados
+        # conservan la suya y sus posiciones
+        self._starts: list[int] = [0]
+        self._text: str | None = text
+        self.line_tokens: list[list[LineToken]] = [[] for _ in self.lines]
+        self.line_states: list[int | None] = [None] * len(self.lines)
+        self.line_states[0] = 0
+        # Líneas con una comilla sin cerrar: su resultado depende de las
+        # comillas de todo el texto siguiente, así que una edición posterior
+        # que agregue o quite una comilla puede cambiarlas
+        self.line_unbounded: list[bool] = [False] * len(self.lines)
+        self._relex(0, len(self.lines) - 1)
+
+    @property
+    def text(self) -> str:
+        if self._text is None:
+            self._text = "".join(self.lines)  # Se une una vez por edición
+        return self._text
+
+    def _line_start(self, i: int) -> int:
+        starts = self._starts
+        if i >= len(starts):
+            lines = self.lines
+            for j in range(len(starts) - 1, i):
+                starts.append(starts[j] + len(lines[j]))
+        return starts[i]
+
+    def edit(self, start: tuple[int, int], end: tuple[int, int], new_text: str) -> tuple[int, int]:
+        """Reemplaza el texto entre start y end (pares (línea, columna) desde 1,
+        end exclusivo) por new_text. Devuelve el rango de líneas re-analizadas."""
+        first, first_col = start[0] - 1, start[1] - 1
+        last, last_col = end[0] - 1, end[1] - 1
+        if not (0 <= first <= last < len(self.lines)) or (first, first_col) > (last, last_col):
+            raise ValueError(f"Rango de edición inválido: {start} - {end}")
+
+        # Primera línea a re-analizar: la que contiene el inicio del token que
+        # cubre el punto editado, con margen para la anticipación del patrón.
+        relex_from, distance = first, first_col
+        while not self.lexer.fixed_form and relex_from > 0 and self.line_states[relex_from] + STREAM_LOOKAHEAD > distance:
+            relex_from -= 1
+            distance += len(self.lines[relex_from])
+        # Sin comillas en lo borrado ni en lo insertado, las líneas con una
+        # comilla abierta no cambian: solo dependen de dónde hay comillas
+        removed = (self.lines[first][first_col:last_col] if first == last else
+                   self.lines[first][first_col:] + self.lines[last][:last_col] +
+                   "".join(self.lines[first + 1:last]))
+        if "'" in new_text or "'" in removed:
+            try:
+                relex_from = self.line_unbounded.index(True, 0, relex_from)
+            except ValueError:
+                pass
+
+        replaced = split_lines(self.lines[first][:first_col] + new_text +
+                               self.lines[last][last_col:])
+        if last < len(self.lines) - 1:
+            replaced.pop()  # el "\n" final de la línea last no abre otra línea
+
+        self.lines[first:last + 1] = replaced
+        self._starts = self._starts[:first + 1]
+        self._text = None
+        self.line_tokens[first:last + 1] = [[] for _ in replaced]
+        self.line_unbounded[first:last + 1] = [False] * len(replaced)
+        self.line_states[first + 1:last + 1] = [None] * (len(replaced) - 1)
+
+        last_relexed = self._relex(relex_from, first + len(replaced) - 1)
+        return relex_from + 1, last_relexed + 1
+
+    def _relex(self, first: int, last_edited: int) -> int:
+        """Re-analiza desde la línea first hasta resincronizar pasada last_edited."""
+        i = first
+        carry = self.line_states[first]
+        while True:
+            self.line_tokens[i], carry, self.line_unbounded[i] = self._lex_line(i, carry)
+            if i + 1 == len(self.lines):
+                return i
+            if i + 1 > last_edited and self.line_states[i + 1] == carry:
+                # Línea sin cambios con el mismo estado: el resto es idéntico
+                return i
+            i += 1
+            self.line_states[i] = carry
+
+    def _lex_line(self, i: int, carry: int) -> tuple[list[LineToken], int, bool]:
+        """Tokens que comienzan en la línea i, el estado de la línea siguiente y
+        si algún token de la línea dependió del texto hasta el final."""
+        if self.lexer.fixed_form:
+            # En formato fijo cada línea se analiza por separado
+            return list(self.lexer._scan_fixed(self.lines[i], self.lexer.current_spec())), 0, False
+
+        spec = self.lexer.current_spec()
+        match = spec.pattern.match
+        lines = self.lines
+        line_length = len(lines[i])
+        # El segmento crece con las líneas siguientes solo si un token llega al
+        # final (espacios que cruzan el salto de línea, cadenas multilínea)
+        segment, next_line = lines[i], i + 1
+        tokens: list[LineToken] = []
+        pos = carry
+        unbounded = False
+
+        while pos < line_length:
+            m = match(segment, pos)
+            if match_needs_more_text(m, segment, pos):
+                stop = next_line + 1
+                if m is None or segment[m.end() - 1] == "'":
+                    # Cadena abierta (o que podría seguir con ''): solo la
+                    # cambia la próxima comilla, así que se agrega de una vez
+                    # hasta la línea que la tiene, y si no hay ninguna el
+                    # resultado ya es el definitivo
+                    stop = next_line
+                    while stop < len(lines) and "'" not in lines[stop]:
+                        stop += 1
+                    stop += 1
+                if stop <= len(lines):
+                    segment += "".join(lines[next_line:stop])
+                    next_line = stop
+                    continue
+                unbounded = m is None or segment[m.end() - 1] == "'"
+
+            if not m:
+                # Una racha de caracteres desconocidos nunca cruza el "\n"
+                end = self.lexer._unknown_run_end(segment, pos, len(segment), spec, None)
+                tokens.append(("ERROR", pos, end))
+                pos = end
+                continue
+
+            if m.lastgroup not in SKIPPED_GROUPS:
+                tokens.append((m.lastgroup, pos, m.end()))
+            pos = m.end()
+
+        return tokens, pos - line_length, unbounded
+
+    def tokens(self) -> Iterator[Token]:
+        """Flujo completo de tokens, equivalente al de Lexer(self.text).tokens()."""
+        create_token = self.lexer.current_spec().token_factory.create_token
+        symbols = self.lexer.symbols
+        line_start = self._line_start
+        index = LineIndex.from_starts(self._starts)
+        lines = self.lines
+        for i, line_tokens in enumerate(self.line_tokens):
+            if not line_tokens:
+                continue
+            line, base = lines[i], line_start(i)
+            for token_type, start, end in line_tokens:
+                lexeme = line[start:end] if end <= len(line) else self._lexeme(i, start, end)
+                yield create_token(token_type, lexeme, base + start, index, symbols)
+        end = line_start(len(lines) - 1) + len(lines[-1])
+        yield Token(Category.EOF, "EOF", "", offset=end, lines=index)
+
+    def line_tokens_at(self, line: int) -> list[Token]:
+        """Tokens que comienzan en la línea indicada (desde 1)."""
+        i = line - 1
+        create_token = self.lexer.current_spec().token_factory.create_token
+        symbols = self.lexer.symbols
+        base = self._line_start(i)
+        index = LineIndex(self.lines[i], base, line)
+        return [create_token(token_type, self._lexeme(i, start, end), base + start, index, symbols)
+                for token_type, start, end in self.line_tokens[i]]
+
+    def _lexeme(self, i: int, start: int, end: int) -> str:
+        text, j = self.lines[i], i + 1
+        while end > len(text) and j < len(self.lines):
+            text += self.lines[j]
+            j += 1
+        return text[start:end]
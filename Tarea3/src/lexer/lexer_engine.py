@@ -1,8 +1,16 @@
 from __future__ import annotations
-from dataclasses import dataclass
+from bisect import bisect_right
+import codecs
+from dataclasses import dataclass, field
 from enum import Enum, unique
+import hashlib
+from itertools import accumulate, islice
 import re
-from typing import Iterator, Dict, Callable, Pattern
+import string
+import threading
+from typing import Iterator, Dict, Callable, Pattern, IO, AnyStr, Sequence
+
+from .symbols import KINDS, NO_SYMBOL, SymbolTable
 
 @unique
 class Category(Enum):
@@ -17,20 +25,147 @@ class Category(Enum):
     EOF = "EOF"
     ERROR = "ERROR"
 
-@dataclass(frozen=True)
+class LineIndex:
+    """Índice de inicios de línea: (línea, columna) se resuelven bajo demanda
+    con búsqueda binaria en lugar de recorrer cada lexema carácter a carácter."""
+
+    def __init__(self, text: str, base: int = 0, line: int = 1, col: int = 1):
+        # base/line/col describen la posición absoluta del primer carácter de
+        # text, lo que permite indexar un archivo por trozos (chunks).
+        self.base = base
+        self.line = line
+        self.col = col
+        self.starts: list[int] = list(
+            accumulate((len(part) + 1 for part in text.split("\n")[:-1]), initial=base)
+        )
+
+    @classmethod
+    def from_starts(cls, starts: Sequence[int], base: int = 0, line: int = 1,
+                    col: int = 1) -> LineIndex:
+        """Índice con los inicios de línea ya calculados (p. ej. leídos de la
+        caché de tokens); starts puede ser cualquier secuencia de enteros."""
+        index = cls.__new__(cls)
+        index.base, index.line, index.col = base, line, col
+        index.starts = starts
+        return index
+
+    def line_col(self, offset: int) -> tuple[int, int]:
+        i = bisect_right(self.starts, offset) - 1
+        if i <= 0:
+            return self.line, self.col + offset - self.base
+        return self.line + i, offset - self.starts[i] + 1
+
+# Conversión de cada categoría de literal desde su lexema
+def integer_value(lexeme: str) -> int:
+    return int(lexeme)
+
+def real_value(lexeme: str) -> float:
+    # Manejo de notación científica y doble precisión
+    clean_lexeme = lexeme.lower().replace('d', 'e')  # Double precision
+    try:
+        return float(clean_lexeme)
+    except ValueError:
+        return 0.0
+
+def string_value(lexeme: str) -> str:
+    # Remover comillas y manejar comillas dobles
+    return lexeme[1:-1].replace("''", "'")
+
+def label_value(lexeme: str) -> int:
+    return int(lexeme.strip())
+
+LITERAL_VALUES: Dict[Category, Callable[[str], "int | float | str"]] = {
+    Category.LIT_INT: integer_value,
+    Category.LIT_REAL: real_value,
+    Category.LIT_STRING: string_value,
+    Category.LABEL: label_value,
+}
+
+class _Lazy:
+    def __repr__(self) -> str:
+        return "LAZY"
+
+# Valor de un literal todavía no convertido
+LAZY = _Lazy()
+
+class _LazyValue:
+    """Descriptor de Token.value: un literal guarda LAZY y se convierte
+    desde su lexema la primera vez que se lee el valor."""
+
+    def __get__(self, token: Token | None, owner: type) -> int | float | str | None:
+        if token is None:
+            return None  # valor por defecto del campo
+        value = token.__dict__["_value"]
+        if value is LAZY:
+            value = token.__dict__["_value"] = LITERAL_VALUES[token.category](token.lexeme)
+        return value
+
+    def __set__(self, token: Token, value: int | float | str | None) -> None:
+        token.__dict__["_value"] = value
+
+@dataclass(frozen=True, init=False)
 class Token:
+    """Token del lexer.
+
+    Los argumentos posicionales son los de siempre, (category, kind, lexeme,
+    line, col, value); los del lexer van por nombre. Un token del lexer no
+    guarda línea ni columna: guarda su offset y el LineIndex del texto, y
+    position las resuelve al leerlas. Un token creado con line y col
+    explícitos las devuelve tal cual.
+    """
+
     category: Category
     kind: str
     lexeme: str
-    line: int
-    col: int
-    value: int | float | str | None = None
+    offset: int
+    value: int | float | str | None = _LazyValue()
+    lines: LineIndex | None = field(default=None, repr=False, compare=False)
+    # kind como entero (ver symbols.KINDS) e id del identificador en la
+    # SymbolTable del lexer (NO_SYMBOL si no es un identificador)
+    kind_id: int = field(default=-1, repr=False, compare=False)
+    symbol: int = field(default=NO_SYMBOL, repr=False, compare=False)
+    # (line, col) explícitos, o LAZY si se resuelven con lines
+    _position: tuple[int, int] = field(default=LAZY, repr=False)
+
+    def __init__(self, category: Category, kind: str, lexeme: str,
+                 line: int | None = None, col: int | None = None,
+                 value: int | float | str | None = None, *, offset: int = -1,
+                 lines: LineIndex | None = None, kind_id: int = -1,
+                 symbol: int = NO_SYMBOL):
+        if kind_id < 0:
+            kind_id = KINDS.id(kind)
+        # Un solo update en vez de un object.__setattr__ por campo; _value es
+        # donde lee el descriptor de value
+        self.__dict__.update(category=category, kind=kind, lexeme=lexeme, offset=offset,
+                             _value=value, lines=lines, kind_id=kind_id, symbol=symbol,
+                             _position=LAZY if line is None else (line, col or 0))
+
+    @property
+    def position(self) -> tuple[int, int]:
+        position = self._position
+        if position is not LAZY:
+            return position
+        if self.lines is None:
+            return 0, 0
+        return self.lines.line_col(self.offset)
+
+    @property
+    def line(self) -> int:
+        return self.position[0]
+
+    @property
+    def col(self) -> int:
+        return self.position[1]
 
     def __str__(self) -> str:
         val_str = f" = {self.value}" if self.value is not None else ""
-        return (f"[{self.line}:{self.col}] {self.category.value:<14} "
+        line, col = self.position
+        return (f"[{line}:{col}] {self.category.value:<14} "
                 f"{self.kind:<10} '{self.lexeme}'{val_str}")
 
+# Forma de los operadores lógicos/relacionales de Fortran: .eq., .and., ...
+DOTTED_OPERATOR = re.compile(r"\.[A-Za-z]+\.")
+
 class TokenRegistry:
     def __init__(self):
         # Palabras clave más importantes de Fortran 77
@@ -64,164 +199,604 @@ class TokenRegistry:
             "(": "LPAREN", ")": "RPAREN",
             }
 
+    def fingerprint(self) -> str:
+        """Huella del contenido del registro; cambia si se agregan o quitan
+        palabras clave, operadores o puntuación."""
+        content = repr((
+            type(self).__module__, type(self).__qualname__,
+            sorted(self.keywords.items()),
+            sorted(self.operators.items()),
+            sorted(self.punctuation.items()),
+        ))
+        return hashlib.sha1(content.encode("utf-8")).hexdigest()
+
+    def kind_table(self) -> list[tuple[Category, str]]:
+        """Todos los pares (categoría, kind) que puede producir un lexer con
+        este registro (la tabla de kinds de los volcados binarios)."""
+        kinds = [(Category.KEYWORD, kind) for kind in self.keywords.values()]
+        kinds += [(Category.OPERATOR, kind) for kind in self.operators.values()]
+        kinds += [(Category.PUNCT, kind) for kind in self.punctuation.values()]
+        kinds += [(Category.IDENT, "ID"), (Category.LIT_INT, "INT"),
+                  (Category.LIT_REAL, "REAL"), (Category.LIT_STRING, "STRING"),
+                  (Category.LABEL, "LABEL"), (Category.ERROR, "UNKNOWN_CHAR"),
+                  (Category.EOF, "EOF")]
+        return list(dict.fromkeys(kinds))
+
     def _create_alternation(self, symbols: list[str]) -> str:
         if not symbols:
             return r"(?!x)x"
         return "|".join(re.escape(s) for s in sorted(symbols, key=len, reverse=True))
 
+    def token_start_chars(self) -> str:
+        """Caracteres con los que puede comenzar algún token (incluidos los
+        espacios y comentarios); lo demás nunca inicia un match."""
+        chars = set(string.ascii_letters + string.digits + " \t\r\n'.*")
+        for symbol in (*self.operators, *self.punctuation):
+            chars.update((symbol[0].lower(), symbol[0].upper()))
+        return "".join(sorted(chars))
+
+    def dotted_operators(self) -> list[str]:
+        """Operadores con forma .palabra. (.eq., .gt., ...)."""
+        return [op for op in self.operators if DOTTED_OPERATOR.fullmatch(op)]
+
     def build_regex_pattern(self) -> str:
-        kw_alt = self._create_alternation(list(self.keywords.keys()))
-        op_alt = self._create_alternation(list(self.operators.keys()))
+        # Las palabras clave no van en la regex: se reconocen como ID y luego
+        # se resuelven con una búsqueda en la tabla (ver TokenFactory).
+        # COMMENT y LABEL no llevan [ \t]* delante del ^: WS se prueba antes
+        # y ya consume esos espacios, así que el prefijo nunca participaba.
+        dotted = self.dotted_operators()
+        symbols = [op for op in self.operators if op not in dotted]
+        # Los operadores con punto comparten el prefijo "\.": el motor solo
+        # prueba sus alternativas cuando el carácter actual es un punto.
+        dot_alt = self._create_alternation([op[1:-1] for op in dotted])
+        op_alt = self._create_alternation(symbols)
         punct_alt = self._create_alternation(list(self.punctuation.keys()))
 
         return rf"""
             (?P<WS>        [ \t\r\n]+ )                        |  
-            (?P<COMMENT>   ^[ \t]*[cC*][^\n]* )                |  
-            (?P<LABEL>     ^[ \t]*[0-9]{{1,5}}[ \t]+ )         |
-            (?P<KEYWORD>   \b(?i:{kw_alt})\b )                 |  
+            (?P<COMMENT>   ^[cC*][^\n]* )                      |  
+            (?P<LABEL>     ^[0-9]{{1,5}}[ \t]+ )               |
             (?P<ID>        [A-Za-z][A-Za-z0-9_]* )             |  
             (?P<REAL>      [0-9]+\.[0-9]*([eE][+-]?[0-9]+)?[dD]? |
                            [0-9]+[eE][+-]?[0-9]+[dD]? |
                            \.[0-9]+([eE][+-]?[0-9]+)?[dD]? )   |
             (?P<INT>       [0-9]+ )                            |  
             (?P<STRING>    '([^']|'')*' )                      |
+            (?P<DOTOP>     \.(?i:{dot_alt})\. )                |
             (?P<OP>        (?i:{op_alt}) )                     |  
             (?P<PUNCT>     (?:{punct_alt}) )                   
         """
 
+# (categoría, kind, valor) de un token antes de materializarlo
+TokenInfo = tuple[Category, str, "int | float | str | None"]
+_IDENT_INFO: TokenInfo = (Category.IDENT, "ID", None)
+_INT_INFO: TokenInfo = (Category.LIT_INT, "INT", LAZY)
+_REAL_INFO: TokenInfo = (Category.LIT_REAL, "REAL", LAZY)
+_STRING_INFO: TokenInfo = (Category.LIT_STRING, "STRING", LAZY)
+_LABEL_INFO: TokenInfo = (Category.LABEL, "LABEL", LAZY)
+# Máximo de grafías recordadas por fábrica (las fábricas viven en la caché)
+_WORD_TABLE_LIMIT = 1 << 16
+
 class TokenFactory:
     def __init__(self, registry: TokenRegistry):
         self.registry = registry
-        self._creators: Dict[str, Callable] = {
-            "KEYWORD": self._create_keyword,
-            "ID": self._create_identifier,
-            "INT": self._create_integer,
-            "REAL": self._create_real,
-            "STRING": self._create_string,
-            "OP": self._create_operator,
-            "PUNCT": self._create_punctuation,
-            "LABEL": self._create_label,
+        # Copias de las tablas: la fábrica puede quedar en caché y compartirse
+        # entre registros con el mismo contenido aunque el original cambie.
+        self.keywords = dict(registry.keywords)
+        self.operators = dict(registry.operators)
+        self.punctuation = dict(registry.punctuation)
+        # Tabla precalculada de palabras: cada grafía vista se resuelve una sola
+        # vez (un lower() + una búsqueda) y luego es un acceso directo al dict.
+        self._words: Dict[str, TokenInfo] = {}
+        for word, kind in self.keywords.items():
+            for spelling in (word, word.upper(), word.capitalize()):
+                self._words[spelling] = (Category.KEYWORD, kind, None)
+        self._describers: Dict[str, Callable[[str], TokenInfo]] = {
+            "KEYWORD": self._describe_keyword,
+            "ID": self._describe_word,
+            "DOTOP": self._describe_operator,
+            "INT": self._describe_integer,
+            "REAL": self._describe_real,
+            "STRING": self._describe_string,
+            "OP": self._describe_operator,
+            "PUNCT": self._describe_punctuation,
+            "LABEL": self._describe_label,
         }
-
-    def create_token(self, token_type: str, lexeme: str, line: int, col: int) -> Token:
-        creator = self._creators.get(token_type)
-        if creator:
-            return creator(lexeme, line, col)
-        return self._create_error(lexeme, line, col)
-
-    def _create_keyword(self, lexeme: str, line: int, col: int) -> Token:
+        # Todos los kinds que puede producir la fábrica quedan numerados
+        KINDS.register(self.keywords.values())
+        KINDS.register(self.operators.values())
+        KINDS.register(self.punctuation.values())
+        self._kind_ids = KINDS.ids
+
+    def create_token(self, token_type: str, lexeme: str, offset: int,
+                     lines: LineIndex | None = None,
+                     symbols: SymbolTable | None = None) -> Token:
+        category, kind, value = self.describe(token_type, lexeme)
+        symbol = NO_SYMBOL
+        if symbols is not None and category is Category.IDENT:
+            lexeme, symbol = symbols.intern(lexeme)
+        return Token(category, kind, lexeme, value=value, offset=offset, lines=lines,
+                     kind_id=self._kind_ids[kind], symbol=symbol)
+
+    def describe(self, token_type: str, lexeme: str) -> TokenInfo:
+        """Clasifica un lexema sin crear el Token (lo usan los buffers columnares)."""
+        describer = self._describers.get(token_type, self._describe_error)
+        return describer(lexeme)
+
+    def _describe_keyword(self, lexeme: str) -> TokenInfo:
         # Fortran es case-insensitive
-        kind = self.registry.keywords[lexeme.lower()]
-        return Token(Category.KEYWORD, kind, lexeme, line, col)
-
-    def _create_identifier(self, lexeme: str, line: int, col: int) -> Token:
-        return Token(Category.IDENT, "ID", lexeme, line, col)
-
-    def _create_integer(self, lexeme: str, line: int, col: int) -> Token:
-        return Token(Category.LIT_INT, "INT", lexeme, line, col, value=int(lexeme))
-
-    def _create_real(self, lexeme: str, line: int, col: int) -> Token:
-        # Manejo de notación científica y doble precisión
-        clean_lexeme = lexeme.lower().replace('d', 'e')  # Double precision
-        try:
-            value = float(clean_lexeme)
-        except ValueError:
-            value = 0.0
-        return Token(Category.LIT_REAL, "REAL", lexeme, line, col, value=value)
-
-    def _create_string(self, lexeme: str, line: int, col: int) -> Token:
-        # Remover comillas y manejar comillas dobles
-        string_value = lexeme[1:-1].replace("''", "'")
-        return Token(Category.LIT_STRING, "STRING", lexeme, line, col, value=string_value)
-
-    def _create_operator(self, lexeme: str, line: int, col: int) -> Token:
-        kind = self.registry.operators[lexeme.lower()]
-        return Token(Category.OPERATOR, kind, lexeme, line, col)
-
-    def _create_punctuation(self, lexeme: str, line: int, col: int) -> Token:
-        kind = self.registry.punctuation[lexeme]
-        return Token(Category.PUNCT, kind, lexeme, line, col)
-
-    def _create_label(self, lexeme: str, line: int, col: int) -> Token:
-        label_num = lexeme.strip()
-        return Token(Category.LABEL, "LABEL", lexeme, line, col, value=int(label_num))
-
-    def _create_error(self, lexeme: str, line: int, col: int) -> Token:
-        return Token(Category.ERROR, "UNKNOWN_CHAR", lexeme, line, col)
-
-class PositionTracker:
-    def __init__(self, line: int = 1, col: int = 1):
-        self.line = line
-        self.col = col
+        kind = self.keywords[lexeme.lower()]
+        return Category.KEYWORD, kind, None
 
-    def advance(self, text: str) -> tuple[int, int]:
-        start_line, start_col = self.line, self.col
-        
-        for char in text:
-            if char == "\n":
-                self.line += 1
-                self.col = 1
-            else:
-                self.col += 1
-                
-        return start_line, start_col
+    def _describe_word(self, lexeme: str) -> TokenInfo:
+        info = self._words.get(lexeme)
+        if info is None:
+            # Fortran es case-insensitive
+            kind = self.keywords.get(lexeme.lower())
+            info = _IDENT_INFO if kind is None else (Category.KEYWORD, kind, None)
+            if len(self._words) < _WORD_TABLE_LIMIT:
+                self._words[lexeme] = info
+        return info
 
-    def advance_single_char(self, char: str) -> tuple[int, int]:
-        start_line, start_col = self.line, self.col
-        
-        if char == "\n":
-            self.line += 1
-            self.col = 1
-        else:
-            self.col += 1
-            
-        return start_line, start_col
+    # Los literales no se convierten aquí: el valor queda LAZY y se calcula
+    # con LITERAL_VALUES solo si alguien lo lee (el Parser nunca lo hace)
+    def _describe_integer(self, lexeme: str) -> TokenInfo:
+        return _INT_INFO
 
-class Lexer:
-    def __init__(self, text: str, registry: TokenRegistry | None = None):
-        self.text = text
-        self.pos = 0
-        self.position_tracker = PositionTracker()
-        
-        self.registry = registry or TokenRegistry()
-        self.token_factory = TokenFactory(self.registry)
-        self.pattern = self._compile_pattern()
+    def _describe_real(self, lexeme: str) -> TokenInfo:
+        return _REAL_INFO
 
-    def _compile_pattern(self) -> Pattern[str]:
-        pattern_str = self.registry.build_regex_pattern()
-        return re.compile(pattern_str, re.VERBOSE | re.MULTILINE)
+    def _describe_string(self, lexeme: str) -> TokenInfo:
+        return _STRING_INFO
 
-    def recompile_pattern(self) -> None:
-        self.pattern = self._compile_pattern()
+    def _describe_operator(self, lexeme: str) -> TokenInfo:
+        kind = self.operators[lexeme.lower()]
+        return Category.OPERATOR, kind, None
 
-    def tokens(self) -> Iterator[Token]:
-        while self.pos < len(self.text):
-            token = self._next_token()
-            if token:
-                yield token
+    def _describe_punctuation(self, lexeme: str) -> TokenInfo:
+        kind = self.punctuation[lexeme]
+        return Category.PUNCT, kind, None
 
-        yield Token(Category.EOF, "EOF", "", 
-                   self.position_tracker.line, self.position_tracker.col)
+    def _describe_label(self, lexeme: str) -> TokenInfo:
+        return _LABEL_INFO
 
-    def _next_token(self) -> Token | None:
-        match = self.pattern.match(self.text, self.pos)
-        
-        if not match:
-            return self._handle_unknown_character()
+    def _describe_error(self, lexeme: str) -> TokenInfo:
+        return Category.ERROR, "UNKNOWN_CHAR", None
 
-        token_type = match.lastgroup      
-        lexeme = match.group(token_type)
-        start_line, start_col = self.position_tracker.advance(lexeme)
-        self.pos = match.end()
+# Los grupos que el lexer reconoce pero no entrega como tokens
+SKIPPED_GROUPS = frozenset(("WS", "COMMENT"))
 
-        if token_type in ("WS", "COMMENT"):
+@dataclass(frozen=True)
+class LexerSpec:
+    """Patrón compilado y fábrica de tokens para un contenido de registro."""
+    fingerprint: str
+    pattern: Pattern[str]
+    token_factory: TokenFactory
+    # Consume caracteres que no pueden iniciar ningún token: con él una
+    # racha de basura se reporta como un solo token de error
+    unknown_run: Pattern[str]
+
+class TooManyLexicalErrors(SyntaxError):
+    """El análisis superó el presupuesto de errores léxicos del Lexer."""
+
+    def __init__(self, message: str, errors: int, error_chars: int, offset: int):
+        super().__init__(message)
+        self.errors = errors
+        self.error_chars = error_chars
+        self.offset = offset
+
+# La proporción de errores solo se evalúa después de leer esta cantidad de
+# caracteres, para no abortar por un error al comienzo de un archivo corto
+ERROR_RATIO_MIN_CHARS = 4096
+
+class ErrorBudget:
+    """Cuenta los errores de un análisis y detecta cuándo superan el máximo
+    de errores o la proporción máxima de caracteres erróneos."""
+
+    def __init__(self, max_errors: int | None = None, max_ratio: float | None = None):
+        self.max_errors = max_errors
+        self.max_ratio = max_ratio
+        self.errors = 0
+        self.error_chars = 0
+        self.first_error: int | None = None
+        # Posición absoluta del texto que se está analizando (modo streaming)
+        self.base = 0
+        self.line = 1
+
+    def charge(self, start: int, end: int) -> bool:
+        """Registra el error [start, end) y dice si se agotó el presupuesto."""
+        self.errors += 1
+        self.error_chars += end - start
+        if self.first_error is None:
+            self.first_error = self.base + start
+        if self.max_errors is not None and self.errors > self.max_errors:
+            return True
+        scanned = self.base + end
+        return (self.max_ratio is not None and scanned >= ERROR_RATIO_MIN_CHARS and
+                self.error_chars / scanned > self.max_ratio)
+
+    def exceeded(self, line: int, offset: int) -> TooManyLexicalErrors:
+        scanned = max(offset, 1)
+        limits = []
+        if self.max_errors is not None:
+            limits.append(f"máximo {self.max_errors} errores")
+        if self.max_ratio is not None:
+            limits.append(f"máximo {self.max_ratio:.0%} de caracteres erróneos")
+        message = (f"Análisis léxico abortado en la línea {line}: {self.errors} errores "
+                   f"({self.error_chars} caracteres, {self.error_chars / scanned:.0%} de "
+                   f"lo leído; el primero en el offset {self.first_error}). "
+                   f"Límite: {', '.join(limits)}")
+        return TooManyLexicalErrors(message, self.errors, self.error_chars, offset)
+
+# Caché de todo el proceso, indexada por TokenRegistry.fingerprint()
+_SPEC_CACHE: Dict[str, LexerSpec] = {}
+_SPEC_CACHE_LOCK = threading.Lock()
+_SPEC_CACHE_SIZE = 32
+
+def compiled_spec(registry: TokenRegistry) -> LexerSpec:
+    fingerprint = registry.fingerprint()
+    spec = _SPEC_CACHE.get(fingerprint)
+    if spec is not None:
+        return spec
+
+    with _SPEC_CACHE_LOCK:
+        spec = _SPEC_CACHE.get(fingerprint)
+        if spec is None:
+            pattern = re.compile(registry.build_regex_pattern(), re.VERBOSE | re.MULTILINE)
+            unknown_run = re.compile(f"[^{re.escape(registry.token_start_chars())}]*")
+            spec = LexerSpec(fingerprint, pattern, TokenFactory(registry), unknown_run)
+            if len(_SPEC_CACHE) >= _SPEC_CACHE_SIZE:
+                # Se descarta la entrada más antigua (orden de inserción)
+                del _SPEC_CACHE[next(iter(_SPEC_CACHE))]
+            _SPEC_CACHE[fingerprint] = spec
+    return spec
+
+# Tamaño de lectura por defecto del modo streaming (caracteres o bytes)
+DEFAULT_CHUNK_SIZE = 1 << 16
+# Caracteres que el patrón puede necesitar ver después de un token (p. ej.
+# "1.5e+3" o el \b tras una palabra clave) antes de aceptar el match
+STREAM_LOOKAHEAD = 8
+# Tokens por lote de token_batches() (lo que consume TokenSource)
+DEFAULT_TOKEN_BATCH = 1 << 9
+
+def match_needs_more_text(m: re.Match[str] | None, text: str, pos: int) -> bool:
+    """Indica si el resultado de match(text, pos) podría cambiar al agregar
+    texto al final: una cadena todavía sin cerrar, un token que termina a
+    menos de STREAM_LOOKAHEAD del final, o una cadena que terminó justo antes
+    de otra comilla (con más texto podría continuar como '' escapada)."""
+    if m is None:
+        return text[pos] == "'"
+    end = m.end()
+    return (end + STREAM_LOOKAHEAD > len(text) or
+            text[end - 1] == "'" and text[end] == "'")
+
+def read_chunks(stream: IO[AnyStr], chunk_size: int,
+                encoding: str = "utf-8") -> Iterator[str]:
+    """Lee stream por trozos; los bytes (archivos binarios, mmap) se decodifican
+    de forma incremental para no cortar caracteres multibyte."""
+    decoder = None
+    while True:
+        data = stream.read(chunk_size)
+        if isinstance(data, (bytes, bytearray)):
+            if decoder is None:
+                decoder = codecs.getincrementaldecoder(encoding)()
+            text = decoder.decode(data, final=not data)
+        else:
+            text = data
+        if text:
+            yield text
+        if not data:
+            return
+
+# Formato fijo de Fortran 77: columna 1 marca comentario, columnas 1-5 la
+# etiqueta, la 6 la continuación y la sentencia ocupa las columnas 7-72
+FIXED_COMMENT_MARKS = "Cc*!"
+FIXED_LABEL_WIDTH = 5
+FIXED_BLANK_LABEL = " " * FIXED_LABEL_WIDTH
+FIXED_STATEMENT_START = 6
+FIXED_LINE_WIDTH = 72
+
+class Lexer:
+    def __init__(self, text: str = "", registry: TokenRegistry | None = None,
+                 fixed_form: bool = False, max_errors: int | None = None,
+                 max_error_ratio: float | None = None):
+        self.text = text
+        self.line_index: LineIndex | None = None
+        self.stream: IO[AnyStr] | None = None
+        self.chunk_size = DEFAULT_CHUNK_SIZE
+        # Con fixed_form las líneas se preclasifican por columnas y solo el
+        # campo de sentencia pasa por la expresión regular
+        self.fixed_form = fixed_form
+        # Presupuesto de errores: al superarlo se lanza TooManyLexicalErrors
+        self.max_errors = max_errors
+        self.max_error_ratio = max_error_ratio
+        
+        self.registry = registry or TokenRegistry()
+        # Identificadores internados de todo lo que tokeniza este lexer
+        self.symbols = SymbolTable()
+        self._use_spec(compiled_spec(self.registry))
+
+    @classmethod
+    def from_stream(cls, stream: IO[AnyStr], registry: TokenRegistry | None = None,
+                    chunk_size: int = DEFAULT_CHUNK_SIZE, fixed_form: bool = False,
+                    max_errors: int | None = None,
+                    max_error_ratio: float | None = None) -> Lexer:
+        """Lexer que lee un archivo abierto (texto o binario) o un mmap por trozos.
+
+        tokens() mantiene el mismo contrato, pero la memoria usada no depende
+        del tamaño de la entrada sino de chunk_size y del token más largo.
+        chunk_size nunca baja de STREAM_LOOKAHEAD: el escáner mantiene un trozo
+        por delante de la posición y con menos no vería un operador como
+        .eq. completo antes de decidir.
+        """
+        lexer = cls("", registry, fixed_form, max_errors, max_error_ratio)
+        lexer.stream = stream
+        lexer.chunk_size = max(chunk_size, STREAM_LOOKAHEAD)
+        return lexer
+
+    def _use_spec(self, spec: LexerSpec) -> None:
+        self.spec = spec
+        self.pattern = spec.pattern
+        self.token_factory = spec.token_factory
+
+    def current_spec(self) -> LexerSpec:
+        """Devuelve el spec vigente; si el registro cambió, toma el nuevo de la caché."""
+        spec = compiled_spec(self.registry)
+        if spec is not self.spec:
+            self._use_spec(spec)
+        return spec
+
+    def error_budget(self) -> ErrorBudget | None:
+        """Presupuesto nuevo para un análisis (None si no hay límites)."""
+        if self.max_errors is None and self.max_error_ratio is None:
             return None
+        return ErrorBudget(self.max_errors, self.max_error_ratio)
 
-        return self.token_factory.create_token(token_type, lexeme, start_line, start_col)
+    def recompile_pattern(self) -> None:
+        # Se conserva por compatibilidad: la caché ya detecta cambios en el registro
+        self.current_spec()
 
-    def _handle_unknown_character(self) -> Token:
-        bad_char = self.text[self.pos]
-        start_line, start_col = self.position_tracker.advance_single_char(bad_char)
-        self.pos += 1
-        
-        return self.token_factory._create_error(bad_char, start_line, start_col)
\ No newline at end of file
+    def tokens(self) -> Iterator[Token]:
+        if self.stream is not None:
+            if self.fixed_form:
+                return self._tokenize_stream_fixed(self.stream, self.current_spec())
+            return self._tokenize_stream(self.stream, self.current_spec())
+        # El índice de líneas se construye una sola vez por entrada; los
+        # tokens solo guardan su offset y lo consultan al leer line/col.
+        self.line_index = LineIndex(self.text)
+        return self._tokenize(self.text, self.line_index, self.current_spec())
+
+    def token_batches(self, batch_size: int = DEFAULT_TOKEN_BATCH) -> Iterator[list[Token]]:
+        """Los mismos tokens que tokens(), en listas de hasta batch_size.
+
+        Con texto en memoria cada lote se arma con una comprensión sobre el
+        escáner, sin reanudar un generador por token.
+        """
+        if self.stream is not None:
+            tokens = self.tokens()
+            while batch := list(islice(tokens, batch_size)):
+                yield batch
+            return
+        text = self.text
+        self.line_index = lines = LineIndex(text)
+        spec = self.current_spec()
+        create_token = spec.token_factory.create_token
+        symbols = self.symbols
+        scanned = self._scan_text(text, spec, self.error_budget())
+        while True:
+            batch = [create_token(token_type, text[start:end], start, lines, symbols)
+                     for token_type, start, end in islice(scanned, batch_size)]
+            if len(batch) < batch_size:
+                batch.append(Token(Category.EOF, "EOF", "", offset=len(text), lines=lines))
+                yield batch
+                return
+            yield batch
+
+    def tokenize(self, text: str) -> Iterator[Token]:
+        """Tokeniza text sin modificar el estado del lexer.
+
+        Es reentrante: un mismo Lexer configurado puede atender muchas
+        entradas, incluso desde varios hilos, sin recompilar nada.
+        """
+        return self._tokenize(text, LineIndex(text), self.current_spec())
+
+    def _tokenize(self, text: str, lines: LineIndex, spec: LexerSpec) -> Iterator[Token]:
+        create_token = spec.token_factory.create_token
+        symbols = self.symbols
+
+        for token_type, start, end in self._scan_text(text, spec, self.error_budget()):
+            yield create_token(token_type, text[start:end], start, lines, symbols)
+
+        yield Token(Category.EOF, "EOF", "", offset=len(text), lines=lines)
+
+    def _tokenize_stream_fixed(self, stream: IO[AnyStr], spec: LexerSpec) -> Iterator[Token]:
+        # En formato fijo ningún token cruza líneas: se analizan bloques de
+        # líneas completas y solo se arrastra la última línea incompleta.
+        create_token = spec.token_factory.create_token
+        symbols = self.symbols
+        pending, base, line = "", 0, 1
+        lines = LineIndex("")
+        budget = self.error_budget()
+
+        for chunk in read_chunks(stream, self.chunk_size):
+            pending += chunk
+            cut = pending.rfind("\n") + 1
+            if not cut:
+                continue
+            block, pending = pending[:cut], pending[cut:]
+            lines = LineIndex(block, base, line)
+            if budget is not None:
+                budget.base, budget.line = base, line
+            for token_type, start, end in self._scan_fixed(block, spec, budget):
+                yield create_token(token_type, block[start:end], base + start, lines, symbols)
+            base += len(block)
+            line += block.count("\n")
+
+        lines = LineIndex(pending, base, line)
+        if budget is not None:
+            budget.base, budget.line = base, line
+        for token_type, start, end in self._scan_fixed(pending, spec, budget):
+            yield create_token(token_type, pending[start:end], base + start, lines, symbols)
+        yield Token(Category.EOF, "EOF", "", offset=base + len(pending), lines=lines)
+
+    def _tokenize_stream(self, stream: IO[AnyStr], spec: LexerSpec) -> Iterator[Token]:
+        chunks = read_chunks(stream, self.chunk_size)
+        match = spec.pattern.match
+        unknown_run = spec.unknown_run.match
+        create_token = spec.token_factory.create_token
+        symbols = self.symbols
+        budget = self.error_budget()
+
+        # buf contiene el texto aún no consumido (más un carácter de contexto
+        # para que ^ y \b vean lo anterior); base es su offset absoluto.
+        buf, base, pos = "", 0, 0
+        lines = LineIndex("")
+        eof = False
+
+        def refill(keep_from: int) -> bool:
+            nonlocal buf, base, pos, lines
+            chunk = next(chunks, None)
+            if chunk is None:
+                return False
+            line, col = lines.line_col(base + keep_from)
+            buf = buf[keep_from:] + chunk
+            pos -= keep_from
+            base += keep_from
+            lines = LineIndex(buf, base, line, col)
+            return True
+
+        while True:
+            # Se mantiene al menos un trozo completo por delante de pos
+            if not eof and len(buf) - pos < self.chunk_size:
+                eof = not refill(max(pos - 1, 0))
+                continue
+            if pos >= len(buf):
+                break
+
+            m = match(buf, pos)
+            if not eof and match_needs_more_text(m, buf, pos):
+                # El token podría continuar en el siguiente trozo: se lee más
+                # sin descartar nada y se vuelve a intentar.
+                eof = not refill(0)
+                continue
+
+            if not m:
+                end = unknown_run(buf, pos + 1).end()
+                if end == len(buf) and not eof:
+                    # La racha de caracteres desconocidos puede seguir
+                    eof = not refill(0)
+                    continue
+                if budget is not None and budget.charge(base + pos, base + end):
+                    raise budget.exceeded(lines.line_col(base + pos)[0], base + end)
+                yield create_token("ERROR", buf[pos:end], base + pos, lines)
+                pos = end
+                continue
+
+            token_type = m.lastgroup
+            end = m.end()
+            if token_type not in SKIPPED_GROUPS:
+                yield create_token(token_type, buf[pos:end], base + pos, lines, symbols)
+            pos = end
+
+        yield Token(Category.EOF, "EOF", "", offset=base + len(buf), lines=lines)
+
+    def _scan_text(self, text: str, spec: LexerSpec | None = None,
+                   budget: ErrorBudget | None = None) -> Iterator[tuple[str, int, int]]:
+        """Escáner según el formato configurado (fijo o libre)."""
+        if self.fixed_form:
+            return self._scan_fixed(text, spec, budget)
+        return self._scan(text, 0, spec, None, budget)
+
+    def _scan_fixed(self, text: str, spec: LexerSpec | None = None,
+                    budget: ErrorBudget | None = None) -> Iterator[tuple[str, int, int]]:
+        """Escáner de formato fijo: clasifica cada línea por columnas antes de
+        usar la expresión regular, que solo ve el campo de sentencia."""
+        spec = spec or self.spec
+        match = spec.pattern.match
+        find = text.find
+        end_of_text = len(text)
+        pos = 0
+
+        while pos < end_of_text:
+            eol = find("\n", pos)
+            if eol == -1:
+                eol = end_of_text
+            line_start, pos = pos, eol + 1
+
+            # Línea de comentario: se descarta entera con un solo find()
+            if text[line_start] in FIXED_COMMENT_MARKS:
+                continue
+
+            if text.startswith(FIXED_BLANK_LABEL, line_start):
+                # Caso más común: sin etiqueta; la columna 6 (continuación) se
+                # omite porque una sentencia continuada son solo más tokens
+                statement_start = line_start + FIXED_STATEMENT_START
+            else:
+                yield from self._scan_fixed_label(text, line_start, eol, spec, budget)
+                statement_start = self._fixed_statement_start(text, line_start, eol)
+
+            # Solo el campo de sentencia pasa por la regex; lo que está
+            # después de la columna 72 se ignora
+            statement_end = line_start + FIXED_LINE_WIDTH
+            if statement_end > eol:
+                statement_end = eol
+            yield from self._scan(text, statement_start, spec, statement_end, budget)
+
+    def _scan_fixed_label(self, text: str, line_start: int, eol: int, spec: LexerSpec,
+                          budget: ErrorBudget | None = None) -> Iterator[tuple[str, int, int]]:
+        """Campo de etiqueta (columnas 1-5); un tabulador lo termina antes."""
+        label_end = min(line_start + FIXED_LABEL_WIDTH, eol)
+        tab = text.find("\t", line_start, label_end)
+        if tab != -1:
+            label_end = tab
+
+        label = text[line_start:label_end].strip()
+        if label.isdigit():
+            label_start = text.find(label, line_start, label_end)
+            yield "LABEL", label_start, label_start + len(label)
+        elif label:
+            yield from self._scan(text, line_start, spec, label_end, budget)
+
+    @staticmethod
+    def _unknown_run_end(text: str, pos: int, endpos: int, spec: LexerSpec,
+                         budget: ErrorBudget | None) -> int:
+        """Fin de la racha de caracteres desconocidos que empieza en pos: se
+        reporta como un solo error hasta el próximo carácter que pueda
+        iniciar un token. Cobra el error al presupuesto, si lo hay."""
+        end = spec.unknown_run.match(text, pos + 1, endpos).end()
+        if budget is not None and budget.charge(pos, end):
+            raise budget.exceeded(budget.line + text.count("\n", 0, pos), budget.base + end)
+        return end
+
+    @staticmethod
+    def _fixed_statement_start(text: str, line_start: int, eol: int) -> int:
+        tab = text.find("\t", line_start, min(line_start + FIXED_LABEL_WIDTH, eol))
+        if tab == -1:
+            return line_start + FIXED_STATEMENT_START
+        # Formato con tabulador: un dígito 1-9 tras el tab es continuación
+        if tab + 1 < eol and text[tab + 1] in "123456789":
+            return tab + 2
+        return tab + 1
+
+    def _scan(self, text: str, pos: int = 0, spec: LexerSpec | None = None,
+              endpos: int | None = None,
+              budget: ErrorBudget | None = None) -> Iterator[tuple[str, int, int]]:
+        """Recorre text y entrega (grupo, inicio, fin) de cada token no ignorado."""
+        spec = spec or self.spec
+        match = spec.pattern.match
+        end_of_text = len(text) if endpos is None else endpos
+
+        while pos < end_of_text:
+            m = match(text, pos, end_of_text)
+
+            if not m:
+                end = self._unknown_run_end(text, pos, end_of_text, spec, budget)
+                yield "ERROR", pos, end
+                pos = end
+                continue
+
+            token_type = m.lastgroup
+            end = m.end()
+            if token_type not in SKIPPED_GROUPS:
+                yield token_type, pos, end
+            pos = end
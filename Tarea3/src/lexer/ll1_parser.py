@@ -1,84 +1,339 @@
-from .lexer_engine import Lexer, Token, Category
-
-# Definición de las producciones como tuplas
-# P1: <programa> -> PROGRAM ID <bloque_declaraciones> <bloque_ejecutable> END
-P1 = ("PROGRAM", "ID", "<bloque_declaraciones>", "<bloque_ejecutable>", "END")
-# D1: <declaracion> -> INTEGER ID
-D1 = ("INTEGER", "ID")
-# A1: <asignacion> -> ID ASSIGN <expresion>
-A1 = ("ID", "ASSIGN", "<expresion>")
-# S1: <sentencia> -> <asignacion>
-S1 = ("<asignacion>",)
-# S2: <sentencia> -> <condicional>
-S2 = ("<condicional>",)
-# ... y así sucesivamente para todas las reglas.
-
-# -----------------
-# Tabla LL(1) M (Fragmento)
-# -----------------
-PARSING_TABLE = {
-    "<programa>": {
-        "PROGRAM": P1, 
-        # EOF es necesario al inicio.
-    },
-    "<declaracion>": {
-        "INTEGER": D1,
-        "REAL": ("REAL", "ID"),
-        # Regla de épsilon para terminar declaraciones. 
-        # FOLLOW(<declaracion>) es {ID, IF, END}
-        "ID": tuple(),   # Regla de épsilon (vacía)
-        "IF": tuple(),   # Regla de épsilon
-        "END": tuple(),  # Regla de épsilon
-    },
-    "<sentencia>": {
-        "ID": S1,  # Si empieza con ID, es una asignación
-        "IF": S2,  # Si empieza con IF, es un condicional
-    },
-    # ... más No Terminales
-}
+import threading
+from array import array
+from typing import Dict
+
+from .lexer_engine import Lexer
+from .symbols import KINDS, kind_id, kind_name
+from .tracing import ParseListener
+from .grammar import END_MARKER, LL1Table, compiled_table
+from .diagnostics import DEFAULT_MAX_ERRORS, Diagnostics, ParseError
+from .token_source import TokenSource
+
+# Tabla LL(1) de fortran.bnf (ver grammar.py) y sus conjuntos de
+# sincronización; se generan (o se leen de la caché en disco) al primer uso,
+# así importar el paquete no toca el sistema de archivos
+_GRAMMAR: tuple[LL1Table, dict] | None = None
+_GRAMMAR_LOCK = threading.Lock()
+
+
+def _grammar_table() -> tuple[LL1Table, dict]:
+    global _GRAMMAR
+    grammar = _GRAMMAR
+    if grammar is None:
+        with _GRAMMAR_LOCK:
+            grammar = _GRAMMAR
+            if grammar is None:
+                table = compiled_table()
+                sync_sets = {X: follow | {END_MARKER} for X, follow in table.follow.items()}
+                grammar = _GRAMMAR = (table, sync_sets)
+    return grammar
+
+
+def parsing_table() -> dict:
+    """Tabla M: M[no terminal][kind del lookahead] -> lado derecho de la
+    producción."""
+    return _grammar_table()[0].table
+
+
+def sync_sets() -> dict:
+    """Conjuntos de sincronización de la recuperación en modo pánico:
+    FOLLOW(X) más el fin de archivo."""
+    return _grammar_table()[1]
+
+
+def __getattr__(name: str):
+    # PARSING_TABLE y SYNC_SETS se siguen pudiendo importar, pero se calculan
+    # recién cuando alguien los pide
+    if name == "PARSING_TABLE":
+        return parsing_table()
+    if name == "SYNC_SETS":
+        return sync_sets()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+EOF_KIND = kind_id("EOF")
+UNKNOWN_KIND = kind_id("UNKNOWN_CHAR")
+START_SYMBOL = "<programa>"
+
+
+def is_nonterminal(symbol) -> bool:
+    return isinstance(symbol, str) and symbol.startswith("<")
+
+
+def encode_production(production: tuple) -> tuple:
+    """Reemplaza los terminales de la producción por su id de kind."""
+    return tuple(symbol if is_nonterminal(symbol) else kind_id(symbol)
+                 for symbol in production)
+
+
+def symbol_name(symbol) -> str:
+    return symbol if isinstance(symbol, str) else kind_name(symbol)
+
+
+class _RuleExit:
+    """Marca que se apila debajo de una producción cuando hay oyente, para
+    avisar el fin del no terminal al desapilarla."""
+    __slots__ = ("rule",)
+
+    def __init__(self, rule: str):
+        self.rule = rule
+
+
+class CompiledTable:
+    """Tabla M con todos los símbolos como enteros densos.
+
+    Los terminales son los ids de kind (symbols.KINDS), así el lookahead se
+    usa tal cual viene en el token. Cada no terminal se apila ya
+    multiplicado: el no terminal i vale (i + 1) * n_terminals, de modo que
+    "X >= n_terminals" lo distingue de un terminal y su fila empieza en
+    X - n_terminals del arreglo plano table (-1 = sin producción). Las
+    producciones se guardan invertidas, listas para un solo stack.extend().
+    """
+
+    def __init__(self, table: dict, start: str = START_SYMBOL):
+        self.nonterminals = list(table)
+        # Registrar antes los terminales de la tabla, para fijar n_terminals
+        for row in table.values():
+            for a, production in row.items():
+                kind_id(a)
+                for symbol in production:
+                    if not is_nonterminal(symbol):
+                        kind_id(symbol)
+        self.n_terminals = n_terminals = len(KINDS.names)
+        code = {X: (i + 1) * n_terminals for i, X in enumerate(self.nonterminals)}
+        self.start = code[start]
+
+        def encode(symbol: str) -> int:
+            return code[symbol] if is_nonterminal(symbol) else kind_id(symbol)
+
+        self.table = array("h", [-1]) * (len(self.nonterminals) * n_terminals)
+        self.productions: list[tuple[int, ...]] = []
+        self.rules: list[tuple[str, tuple]] = []
+        index: Dict[tuple[str, tuple], int] = {}
+        for X, row in table.items():
+            for a, production in row.items():
+                if (X, production) not in index:
+                    index[X, production] = len(self.productions)
+                    self.productions.append(tuple(encode(s) for s in reversed(production)))
+                    self.rules.append((X, production))
+                self.table[code[X] - n_terminals + kind_id(a)] = index[X, production]
+        # Copia como lista para el recorrido: el array convierte cada elemento
+        # leído a int de Python y la lista no; es ~15% más rápido
+        self.lookup = self.table.tolist()
+
+    def sync_index(self, sync_sets: dict) -> frozenset[int]:
+        """Posiciones de table (fila + kind) cuyo kind sincroniza a la fila."""
+        code = {X: (i + 1) * self.n_terminals for i, X in enumerate(self.nonterminals)}
+        return frozenset(code[X] - self.n_terminals + kind_id(a)
+                         for X, kinds in sync_sets.items() if X in code for a in kinds)
+
+    def name(self, symbol: int) -> str:
+        if symbol >= self.n_terminals:
+            return self.nonterminals[symbol // self.n_terminals - 1]
+        return kind_name(symbol)
+
+
+_COMPILED: Dict[int, tuple[dict, CompiledTable]] = {}
+
+
+def compiled_table_for(table: dict) -> CompiledTable:
+    """CompiledTable de table, reutilizada mientras no cambien los kinds."""
+    cached = _COMPILED.get(id(table))
+    if (cached is None or cached[0] is not table
+            or cached[1].n_terminals != len(KINDS.names)):
+        cached = _COMPILED[id(table)] = (table, CompiledTable(table))
+    return cached[1]
+
+
+def default_sync_sets(table: dict) -> dict:
+    """Sincronización para una tabla sin gramática conocida: los kinds con
+    producción vacía están en FOLLOW(X); se agrega el fin de archivo."""
+    return {X: {a for a, production in row.items() if not production} | {END_MARKER}
+            for X, row in table.items()}
 
 
 class LL1Parser:
-    def __init__(self, lexer: Lexer, table: dict = PARSING_TABLE):
-        self.token_stream = lexer.tokens()
-        self.lookahead = next(self.token_stream)
-        self.parsing_table = table
+    """Parser LL(1) dirigido por tabla; sin table usa la de fortran.bnf
+    (parsing_table()).
+
+    Con recover=True usa recuperación en modo pánico: ante M[X, a] vacía
+    descarta el lookahead, salvo que esté en el conjunto de sincronización de
+    X (FOLLOW(X)), en cuyo caso desapila X; ante un terminal que no coincide
+    lo da por insertado. Los errores quedan en self.diagnostics; tras uno se
+    silencian los siguientes hasta consumir un terminal, para no reportar la
+    cascada del mismo error.
+    """
+
+    def __init__(self, lexer: Lexer, table: dict | None = None,
+                 listener: ParseListener | None = None, compiled: bool = True,
+                 recover: bool = False, max_errors: int | None = DEFAULT_MAX_ERRORS,
+                 sync_sets: dict | None = None):
+        if table is None:
+            table = parsing_table()
+        self.tokens = TokenSource.from_lexer(lexer)
+        self.lookahead = self.tokens.current
+        # La tabla se indexa por id de kind; cada entrada guarda la producción
+        # codificada (lo que se apila) y la original (para los mensajes)
+        self.parsing_table = {
+            X: {kind_id(a): (encode_production(production), production)
+                for a, production in row.items()}
+            for X, row in table.items()
+        }
         # Pila inicializada con el símbolo inicial y EOF
-        self.stack = ["EOF", "<programa>"]
+        self.stack = [EOF_KIND, START_SYMBOL]
+        self.listener = listener
+        self.table = table
+        self.compiled = compiled
+        self.recover = recover
+        self.diagnostics = Diagnostics(max_errors)
+        if sync_sets is None:
+            grammar, grammar_sync_sets = _grammar_table()
+            sync_sets = grammar_sync_sets if table is grammar.table else default_sync_sets(table)
+        self.sync_sets = sync_sets
+
+    def _finish(self) -> None:
+        # El resultado queda en self.diagnostics; el parser no imprime nada
+        if self.listener is not None:
+            self.listener.finish(self.diagnostics)
 
     def parse(self):
+        # Sin oyente se usa el recorrido con la tabla compilada a enteros;
+        # las trazas necesitan los nombres de las reglas
+        if self.compiled and self.listener is None:
+            return self.parse_compiled()
+        trace = self.listener
+        sync = {X: frozenset(map(kind_id, kinds)) for X, kinds in self.sync_sets.items()}
+        quiet = False
         while self.stack:
             X = self.stack[-1]
-            a = self.lookahead.kind
+            a = self.lookahead.kind_id
 
-            if X == "EOF" and a == "EOF":
-                print("\nAnálisis LL(1) completado con éxito.")
+            if X == EOF_KIND and a == EOF_KIND:
+                self._finish()
                 return
 
-            if X in PARSING_TABLE:  # X es un No Terminal (V)
+            if X in self.parsing_table:  # X es un No Terminal (V)
+                if trace is not None:
+                    trace.lookup(X, a, a in self.parsing_table[X])
                 if a in self.parsing_table[X]:
-                    production = self.parsing_table[X][a]
+                    encoded, production = self.parsing_table[X][a]
                     self.stack.pop() # POP a X
+                    if trace is not None:
+                        trace.enter_rule(X, self.lookahead)
+                        trace.apply_production(X, production, self.lookahead)
+                        self.stack.append(_RuleExit(X))
                     
                     # PUSH de la producción en orden inverso
-                    if production: # Si no es épsilon
-                        for symbol in reversed(production):
+                    if encoded: # Si no es épsilon
+                        for symbol in reversed(encoded):
                             self.stack.append(symbol)
-                    
-                    print(f"Aplicada Regla {X} -> {production} con lookahead {a}")
 
                 else:
-                    raise SyntaxError(f"Error LL(1): No hay producción para M[{X}, {a}]")
+                    error = ParseError(f"Error LL(1): No hay producción para "
+                                       f"M[{X}, {kind_name(a)}]", self.lookahead)
+                    if not self.recover:
+                        raise error
+                    if not quiet:
+                        quiet = True
+                        if not self.diagnostics.add(error):
+                            break
+                    if a == EOF_KIND or a in sync.get(X, ()):
+                        self.stack.pop()  # Se da X por reconocido
+                    else:
+                        self.lookahead = self.tokens.advance()  # Se descarta a
 
             elif X == a:  # X es un Terminal (Σ)
                 self.stack.pop()
-                print(f"Consumido Terminal: {X} ('{self.lookahead.lexeme}')")
+                quiet = False
+                if trace is not None:
+                    trace.consume(self.lookahead)
                 
                 # Avanzar el lookahead
-                try:
-                    self.lookahead = next(self.token_stream)
-                except StopIteration:
-                    self.lookahead = Token(Category.EOF, "EOF", "", 0, 0)
+                self.lookahead = self.tokens.advance()
             
+            elif type(X) is _RuleExit:  # Solo con oyente: terminó un no terminal
+                self.stack.pop()
+                trace.exit_rule(X.rule, self.lookahead)
+
             else: # X es un Terminal, pero no coincide con a
-                raise SyntaxError(f"Error LL(1): Esperado '{X}' pero encontrado '{a}'")
+                error = ParseError(f"Error LL(1): Esperado '{symbol_name(X)}' pero "
+                                   f"encontrado '{kind_name(a)}'", self.lookahead)
+                if not self.recover:
+                    raise error
+                if not quiet:
+                    quiet = True
+                    if not self.diagnostics.add(error):
+                        break
+                if X == EOF_KIND:  # Texto después del final del programa
+                    while self.lookahead.kind_id != EOF_KIND:
+                        self.lookahead = self.tokens.advance()
+                else:
+                    self.stack.pop()  # Se da X por insertado
+        self._finish()
+
+    def parse_compiled(self):
+        """Mismo análisis que parse(), sobre CompiledTable: la pila solo tiene
+        enteros, cada paso es un índice en un arreglo plano y cada producción
+        se apila con un único extend()."""
+        compiled = compiled_table_for(self.table)
+        table, productions, n_terminals = compiled.lookup, compiled.productions, compiled.n_terminals
+        stack = [EOF_KIND, compiled.start]
+        pop, extend = stack.pop, stack.extend
+        take = self.tokens.take
+        pending, i = (), 0
+        lookahead = self.lookahead
+        a = lookahead.kind_id
+        if a >= n_terminals:  # Kind registrado después de compilar: sin entradas
+            a = UNKNOWN_KIND
+        recover, quiet = self.recover, False
+        sync = compiled.sync_index(self.sync_sets) if recover else frozenset()
+
+        while True:
+            X = pop()
+            if X >= n_terminals:  # No terminal
+                rule = table[X - n_terminals + a]
+                if rule >= 0:
+                    extend(productions[rule])
+                    continue
+                error = ParseError(f"Error LL(1): No hay producción para "
+                                   f"M[{compiled.name(X)}, {lookahead.kind}]", lookahead)
+                if not recover:
+                    stack.append(X)
+                    self.stack, self.lookahead = stack, lookahead
+                    raise error
+                if not quiet:
+                    quiet = True
+                    if not self.diagnostics.add(error):
+                        break
+                if a == EOF_KIND or X - n_terminals + a in sync:
+                    continue  # Se da X por reconocido
+                stack.append(X)  # Se descarta a
+            elif X == a:  # Terminal
+                if X == EOF_KIND:
+                    break
+                quiet = False
+            else:
+                error = ParseError(f"Error LL(1): Esperado '{compiled.name(X)}' "
+                                   f"pero encontrado '{lookahead.kind}'", lookahead)
+                if not recover:
+                    stack.append(X)
+                    self.stack, self.lookahead = stack, lookahead
+                    raise error
+                if not quiet:
+                    quiet = True
+                    if not self.diagnostics.add(error):
+                        break
+                if X != EOF_KIND:
+                    continue  # Se da X por insertado
+                stack.append(X)  # Texto después del final: se descarta
+
+            if i == len(pending):
+                pending, i = take() or (lookahead,), 0
+            lookahead = pending[i]
+            i += 1
+            a = lookahead.kind_id
+            if a >= n_terminals:
+                a = UNKNOWN_KIND
+
+        self.stack, self.lookahead = stack, lookahead
+        self._finish()
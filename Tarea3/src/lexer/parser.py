@@ -1,27 +1,148 @@
 # Asumimos que las clases Token, Category, Lexer, etc., están definidas.
+from array import array
+
 from .lexer_engine import Lexer, Token, Category
+from .symbols import NO_SYMBOL, kind_id, kind_name
+from .ast_nodes import (Assignment, BinOp, Constant, Declaration, If, Name, Node, NodeList,
+                        NodeStore, Program)
+from .tracing import ParseListener
+from .diagnostics import DEFAULT_MAX_ERRORS, Diagnostics, ParseError
+from .token_source import TokenSource
+
+# Kinds como enteros: el parser compara ints en lugar de cadenas
+PROGRAM, ID, END, EOF = map(kind_id, ("PROGRAM", "ID", "END", "EOF"))
+INTEGER, REAL, INT = map(kind_id, ("INTEGER", "REAL", "INT"))
+IF, THEN, ENDIF, ASSIGN = map(kind_id, ("IF", "THEN", "ENDIF", "ASSIGN"))
+LPAREN, RPAREN = map(kind_id, ("LPAREN", "RPAREN"))
+TYPE_KINDS = (INTEGER, REAL)
+STATEMENT_KINDS = (ID, IF)
+RELATIONAL_KINDS = tuple(map(kind_id, ("EQ", "NE", "LT", "LE", "GT", "GE")))
+PLUS, MINUS, MULT, DIV, POWER = map(kind_id, ("PLUS", "MINUS", "MULT", "DIV", "POWER"))
+ARITHMETIC_KINDS = (PLUS, MINUS, MULT, DIV, POWER)
+SIGN_KINDS = (PLUS, MINUS)
+TERM_KINDS = (ID, INT, REAL)
+
+# Precedencias de Fortran 77: ** (a derecha) > * / > + - (también el signo)
+BINARY_PRECEDENCE = {POWER: 3, MULT: 2, DIV: 2, PLUS: 1, MINUS: 1}
+SIGN_PRECEDENCE = 1
+RIGHT_ASSOCIATIVE = (POWER,)
+
+# Conjuntos de sincronización de la recuperación en modo pánico: tras un
+# error se descartan tokens hasta uno de estos
+DECLARATION_SYNC = frozenset((INTEGER, REAL, ID, IF, END, EOF))
+STATEMENT_SYNC = frozenset((ID, IF, ENDIF, END, EOF))
+CONDITION_SYNC = frozenset((THEN, ENDIF, END, EOF))
+RESUME_SYNC = frozenset((ID, IF, END, EOF))
+EOF_SYNC = frozenset((EOF,))
+
+# Método -> no terminal que reconoce (para las trazas)
+RULES = {
+    "parse_programa": "<programa>",
+    "parse_bloque_declaraciones": "<bloque_declaraciones>",
+    "parse_declaracion": "<declaracion>",
+    "parse_bloque_ejecutable": "<bloque_ejecutable>",
+    "parse_sentencia": "<sentencia>",
+    "parse_asignacion": "<asignacion>",
+    "parse_condicional": "<condicional>",
+    "parse_expresion_logica": "<expresion_logica>",
+    "parse_expresion": "<expresion>",
+    "parse_termino": "<termino>",
+}
 
 
 class Parser:
-    def __init__(self, lexer: Lexer):
-        self.token_stream = lexer.tokens()
-        self.current_token = next(self.token_stream)
+    """Parser descendente recursivo.
 
-    def consume(self, expected_kind: str) -> Token:
-        """Comprueba y consume el token actual si coincide con el kind esperado."""
-        if self.current_token.kind == expected_kind:
-            consumed_token = self.current_token
+    Con recover=True no se detiene en el primer error: lo guarda en
+    self.diagnostics, se resincroniza y sigue hasta el final del archivo (o
+    hasta max_errors errores). El árbol devuelto omite las sentencias con
+    errores.
+    """
+
+    def __init__(self, lexer: Lexer, listener: ParseListener | None = None,
+                 recover: bool = False, max_errors: int | None = DEFAULT_MAX_ERRORS):
+        # Los tokens llegan por lotes a un buffer con lookahead (peek(k))
+        self.tokens = TokenSource.from_lexer(lexer)
+        self._advance = self.tokens.advance
+        self.current_token = self.tokens.current
+        # Un TokenBuffer guarda la SymbolTable en symbol_table (su atributo
+        # symbols es la columna de ids)
+        symbols = getattr(lexer, "symbol_table", None)
+        self.symbols = symbols if symbols is not None else lexer.symbols
+        # Sentencias y expresiones van al arena; las hojas se comparten: un
+        # Name por variable y un Constant por lexema
+        self.store = NodeStore()
+        self._names: dict[int | str, Name] = {}
+        self._constants: dict[str, Constant] = {}
+        self.recover = recover
+        self.diagnostics = Diagnostics(max_errors)
+        self.listener = listener
+        if listener is not None:
+            self._attach(listener)
+
+    def _attach(self, listener: ParseListener) -> None:
+        """Envuelve consume() y los métodos parse_* de esta instancia para
+        notificar al oyente. Sin oyente se usan los métodos de la clase tal
+        cual, sin ningún chequeo en el camino caliente."""
+        consume = self.consume
+
+        def traced_consume(expected_kind: int) -> Token:
+            token = consume(expected_kind)
+            listener.consume(token)
+            return token
+
+        self.consume = traced_consume
+        for method_name, rule in RULES.items():
+            setattr(self, method_name, self._traced(rule, getattr(self, method_name), listener))
+
+    def _traced(self, rule: str, method, listener: ParseListener):
+        enter, exit = listener.enter_rule, listener.exit_rule
+
+        def traced():
+            enter(rule, self.current_token)
             try:
-                self.current_token = next(self.token_stream)
-            except StopIteration:
-                pass
+                return method()
+            finally:
+                exit(rule, self.current_token)
+        return traced
+
+    def consume(self, expected_kind: int) -> Token:
+        """Comprueba y consume el token actual si coincide con el kind esperado
+        (un id de symbols.KINDS)."""
+        if self.current_token.kind_id == expected_kind:
+            consumed_token = self.current_token
+            self.current_token = self._advance()
             return consumed_token
         else:
-            raise SyntaxError(
-                f"Error Sintáctico: Esperado '{expected_kind}' pero encontrado "
-                f"'{self.current_token.kind}' ('{self.current_token.lexeme}') "
-                f"en [{self.current_token.line}:{self.current_token.col}]"
-            )
+            token = self.current_token
+            detail = (f"Esperado '{kind_name(expected_kind)}' pero encontrado "
+                      f"'{token.kind}' ('{token.lexeme}')")
+            raise ParseError(f"Error Sintáctico: {detail} en [{token.line}:{token.col}]",
+                             token, detail)
+
+    def synchronize(self, error: ParseError, sync_kinds: frozenset[int]) -> None:
+        """Registra el error y descarta tokens hasta uno de sync_kinds. Si se
+        llegó al máximo de errores salta directo al final del archivo."""
+        if not self.diagnostics.add(error):
+            token = self.current_token
+            self.current_token = Token(Category.EOF, "EOF", "", offset=token.offset, lines=token.lines)
+            return
+        while self.current_token.kind_id not in sync_kinds:
+            self.current_token = self._advance()
+
+    def name_node(self, token: Token) -> Name:
+        key = token.symbol if token.symbol != NO_SYMBOL else token.lexeme.upper()
+        node = self._names.get(key)
+        if node is None:
+            name = self.symbols.name(key) if token.symbol != NO_SYMBOL else key
+            node = self._names[key] = Name(token.symbol, name)
+        return node
+
+    def constant_node(self, token: Token) -> Constant:
+        node = self._constants.get(token.lexeme)
+        if node is None:
+            node = self._constants[token.lexeme] = Constant(token.kind, token.lexeme)
+        return node
 
     # -----------------------------------------------------------------
     # No Terminales (V) e Reglas de Producción (R)
@@ -29,114 +150,221 @@ class Parser:
     
     # V: <programa>
     # R: PROGRAM ID <bloque_declaraciones> <bloque_ejecutable> END
-    def parse_programa(self) -> str:
-        self.consume("PROGRAM")
-        program_name = self.consume("ID").lexeme
-        print(f"\n[PARSEANDO PROGRAMA: {program_name}]")
+    def parse_programa(self) -> Program:
+        offset, program_name = self.current_token.offset, ""
+        try:
+            self.consume(PROGRAM)
+            program_name = self.consume(ID).lexeme
+        except ParseError as error:
+            if not self.recover:
+                raise
+            self.synchronize(error, DECLARATION_SYNC)
         
-        self.parse_bloque_declaraciones()
-        self.parse_bloque_ejecutable()
+        declarations = self.parse_bloque_declaraciones()
+        blocks = [self.parse_bloque_ejecutable()]
         
-        self.consume("END")
-        self.consume("EOF")
+        while True:
+            try:
+                self.consume(END)
+                break
+            except ParseError as error:
+                if not self.recover:
+                    raise
+                # Un ENDIF de más o texto tras END: se sigue con las sentencias
+                # que haya a continuación
+                self.synchronize(error, RESUME_SYNC)
+                if self.current_token.kind_id == EOF:
+                    break
+                blocks.append(self.parse_bloque_ejecutable())
+        try:
+            self.consume(EOF)
+        except ParseError as error:
+            if not self.recover:
+                raise
+            self.synchronize(error, EOF_SYNC)  # Texto después de END
         
-        return f"\nPrograma '{program_name}' parseado con éxito."
+        if len(blocks) == 1:
+            statements = blocks[0]
+        else:
+            statements = self.store.block([node.index for block in blocks for node in block])
+        return Program(program_name, declarations, statements, offset)
 
     # V: <bloque_declaraciones>
     # R: <declaracion>*
-    def parse_bloque_declaraciones(self):
-        print("  [BLOQUE DE DECLARACIONES]")
+    def parse_bloque_declaraciones(self) -> list[Declaration]:
+        declarations = []
         # Sigue parseando declaraciones mientras el token actual sea INTEGER o REAL
-        while self.current_token.kind in ("INTEGER", "REAL"):
-            self.parse_declaracion()
-        print("  [FIN DECLARACIONES]")
+        while self.current_token.kind_id in TYPE_KINDS:
+            try:
+                declarations.append(self.parse_declaracion())
+            except ParseError as error:
+                if not self.recover:
+                    raise
+                self.synchronize(error, DECLARATION_SYNC)
+        return declarations
 
     # V: <declaracion>
     # R: INTEGER ID | REAL ID
-    def parse_declaracion(self):
-        if self.current_token.kind == "INTEGER":
-            type_token = self.consume("INTEGER")
-        elif self.current_token.kind == "REAL":
-            type_token = self.consume("REAL")
+    def parse_declaracion(self) -> Declaration:
+        if self.current_token.kind_id == INTEGER:
+            type_token = self.consume(INTEGER)
+        elif self.current_token.kind_id == REAL:
+            type_token = self.consume(REAL)
         else:
-            raise SyntaxError("Esperado tipo (INTEGER o REAL).")
+            raise ParseError("Esperado tipo (INTEGER o REAL).", self.current_token)
             
-        var_name = self.consume("ID").lexeme
-        print(f"    -> Declaración: {type_token.lexeme} {var_name}")
+        var_token = self.consume(ID)
+        return Declaration(type_token.kind, self.name_node(var_token), type_token.offset)
 
 
     # V: <bloque_ejecutable>
     # R: <sentencia>*
-    def parse_bloque_ejecutable(self):
-        print("  [BLOQUE EJECUTABLE]")
+    def parse_bloque_ejecutable(self) -> NodeList:
+        statements = array("i")
         # Las sentencias ejecutables comienzan con ID (asignación) o IF (condicional)
-        while self.current_token.kind in ("ID", "IF"):
-            self.parse_sentencia()
-        print("  [FIN EJECUTABLE]")
+        while self.current_token.kind_id in STATEMENT_KINDS:
+            try:
+                statements.append(self.parse_sentencia().index)
+            except ParseError as error:
+                if not self.recover:
+                    raise
+                self.synchronize(error, STATEMENT_SYNC)
+        return self.store.block(statements)
 
     # V: <sentencia>
     # R: <asignacion> | <condicional>
-    def parse_sentencia(self):
-        if self.current_token.kind == "ID":
-            self.parse_asignacion()
-        elif self.current_token.kind == "IF":
-            self.parse_condicional()
+    def parse_sentencia(self) -> Node:
+        if self.current_token.kind_id == ID:
+            return self.parse_asignacion()
+        elif self.current_token.kind_id == IF:
+            return self.parse_condicional()
         else:
-            raise SyntaxError("Esperado sentencia (Asignación o IF).")
+            raise ParseError("Esperado sentencia (Asignación o IF).", self.current_token)
             
     # V: <asignacion>
     # R: ID ASSIGN <expresion>
-    def parse_asignacion(self) -> None:
-        var_name = self.consume("ID").lexeme
-        self.consume("ASSIGN")
-        print(f"    -> Asignación: {var_name} = ...")
-        self.parse_expresion()
+    def parse_asignacion(self) -> Assignment:
+        var_token = self.consume(ID)
+        self.consume(ASSIGN)
+        value = self.parse_expresion()
+        return self.store.assignment(self.name_node(var_token), value, var_token.offset)
         
     # V: <condicional>
     # R: IF LPAREN <expresion_logica> RPAREN THEN <bloque_ejecutable> ENDIF
-    def parse_condicional(self):
-        print("    -> Sentencia IF iniciada")
-        self.consume("IF")
-        self.consume("LPAREN")
-        self.parse_expresion_logica()
-        self.consume("RPAREN")
-        self.consume("THEN")
+    def parse_condicional(self) -> If:
+        offset = self.consume(IF).offset
+        try:
+            self.consume(LPAREN)
+            condition = self.parse_expresion_logica()
+            self.consume(RPAREN)
+            self.consume(THEN)
+        except ParseError as error:
+            if not self.recover:
+                raise
+            # Se descarta la condición pero se analiza el cuerpo del IF
+            self.synchronize(error, CONDITION_SYNC)
+            condition = None
+            if self.current_token.kind_id == THEN:
+                self.consume(THEN)
         
         # Recursión: el bloque ejecutable dentro del IF
-        self.parse_bloque_ejecutable() 
+        body = self.parse_bloque_ejecutable() 
         
-        self.consume("ENDIF")
-        print("    -> Sentencia IF terminada")
+        self.consume(ENDIF)
+        return self.store.conditional(condition, body, offset)
 
     # V: <expresion_logica>
     # R: <expresion> REL_OP <expresion>
-    def parse_expresion_logica(self):
-        print("    -> Parseando Expresión Lógica...")
-        self.parse_expresion()
+    def parse_expresion_logica(self) -> BinOp:
+        left = self.parse_expresion()
         
         # Los operadores relacionales son terminales como EQ, GT, LE, etc.
-        if self.current_token.kind in ("EQ", "NE", "LT", "LE", "GT", "GE"):
-            op = self.consume(self.current_token.kind)
-            print(f"    -> Operador Relacional: {op.lexeme}")
-            self.parse_expresion()
+        if self.current_token.kind_id in RELATIONAL_KINDS:
+            op = self.consume(self.current_token.kind_id).kind_id
+            store = self.store
+            right = store.ref(self.parse_expresion())
+            return store.expression(store.binary(op, store.ref(left), right))
         else:
-            raise SyntaxError("Esperado operador relacional.")
+            raise ParseError("Esperado operador relacional.", self.current_token)
 
-    # V: <expresion> (Simplificado: soporta +, -, *, /)
-    # R: <termino> ( (PLUS | MINUS | MULT | DIV) <expresion> )?
-    def parse_expresion(self) -> None:
-        self.parse_termino()
-        
-        if self.current_token.kind in ("PLUS", "MINUS", "MULT", "DIV"):
-            op = self.consume(self.current_token.kind)
-            # print(f"    -> Operador Aritmético: {op.lexeme}")
-            self.parse_expresion()
+    # V: <expresion>
+    # R: [PLUS | MINUS] <sumando> ( (PLUS | MINUS) <sumando> )*
+    #    <sumando>  -> <factor> ( (MULT | DIV) <factor> )*
+    #    <factor>   -> <primario> [ POWER <factor> ]
+    #    <primario> -> <termino> | LPAREN <expresion> RPAREN
+    # Precedencia por escalada con pilas explícitas de operandos y operadores:
+    # tiempo lineal y sin recursión de Python, sea cual sea el largo o el
+    # anidamiento de paréntesis. El signo solo se admite al comienzo de una
+    # expresión o tras "(", como en Fortran 77.
+    def parse_expresion(self) -> Node:
+        store = self.store
+        operands: list[int] = []                # referencias del NodeStore
+        # Kinds de operadores binarios, LPAREN como marca, y ~kind para el signo
+        operators: list[int] = []
+        open_parens = 0
+        expect_operand = True
+        at_start = True
+
+        def reduce() -> None:
+            op = operators.pop()
+            if op < 0:
+                operands.append(store.unary(~op, operands.pop()))
+            else:
+                right = operands.pop()
+                operands.append(store.binary(op, operands.pop(), right))
+
+        while True:
+            kind = self.current_token.kind_id
+            if expect_operand:
+                if kind == LPAREN:
+                    self.consume(LPAREN)
+                    operators.append(LPAREN)
+                    open_parens += 1
+                    at_start = True
+                    continue
+                if at_start and kind in SIGN_KINDS:
+                    self.consume(kind)
+                    operators.append(~kind)
+                    at_start = False
+                    continue
+                operands.append(store.ref(self.parse_termino()))
+                expect_operand = at_start = False
+            elif kind in BINARY_PRECEDENCE:
+                precedence = BINARY_PRECEDENCE[kind]
+                right_associative = kind in RIGHT_ASSOCIATIVE
+                while operators and operators[-1] != LPAREN:
+                    top = operators[-1]
+                    top_precedence = SIGN_PRECEDENCE if top < 0 else BINARY_PRECEDENCE[top]
+                    if top_precedence < precedence or (top_precedence == precedence
+                                                       and right_associative):
+                        break
+                    reduce()
+                self.consume(kind)
+                operators.append(kind)
+                expect_operand = True
+            elif kind == RPAREN and open_parens:
+                while operators[-1] != LPAREN:
+                    reduce()
+                operators.pop()
+                self.consume(RPAREN)
+                open_parens -= 1
+            else:
+                break
+
+        if open_parens:
+            self.consume(RPAREN)  # Error: paréntesis sin cerrar
+        while operators:
+            reduce()
+        return store.expression(operands[0])
             
     # V: <termino>
     # R: ID | INT | REAL
-    def parse_termino(self) -> None:
-        if self.current_token.kind in ("ID", "INT", "REAL"):
-            value = self.consume(self.current_token.kind).lexeme
-            # print(f"    -> Consumido término: {value}")
+    def parse_termino(self) -> Node:
+        if self.current_token.kind_id in TERM_KINDS:
+            token = self.consume(self.current_token.kind_id)
+            # print(f"    -> Consumido término: {token.lexeme}")
+            if token.kind_id == ID:
+                return self.name_node(token)
+            return self.constant_node(token)
         else:
-            raise SyntaxError("Esperado término (ID, INT, REAL).")
\ No newline at end of file
+            raise ParseError("Esperado término (ID, INT, REAL).", self.current_token)
\ No newline at end of file
@@ -0,0 +1,110 @@
+"""Semántica numérica de la ejecución de programas.
+
+Las mismas reglas valen para todo lo que ejecuta un Program (el código
+generado por lexer.codegen y los intérpretes de referencia):
+
+- INTEGER es un entero de 32 bits en complemento a dos, también dentro de
+  una expresión: cada resultado intermedio (y cada constante) se reduce
+  módulo 2**32, como el desborde de gfortran. Como +, - y * dan lo mismo
+  módulo 2**32 sin importar cuándo se reduzca, los motores pueden calcular
+  esas operaciones con enteros exactos (Python) o de 64 bits (NumPy) y
+  reducir solo donde el valor completo importa: los operandos de / y **, las
+  comparaciones, la conversión a REAL y la asignación (ver MODULAR_OPS).
+- REAL es un flotante IEEE de doble precisión: la división por cero, el
+  desborde y ** fuera de dominio dan inf o nan en vez de una excepción.
+- La división entera trunca hacia cero; dividir un INTEGER por cero es un
+  error (ZeroDivisionError), como la excepción de punto flotante en Fortran.
+- REAL -> INTEGER trunca hacia cero; nan, inf o un valor fuera de rango dan
+  INTEGER_MIN (el "integer indefinite" de x86).
+- Las variables sin declarar siguen la regla implícita de Fortran: I-N son
+  INTEGER, el resto REAL. Todas empiezan en cero.
+"""
+from __future__ import annotations
+import math
+
+INTEGER_BITS = 32
+INTEGER_MIN = -(1 << (INTEGER_BITS - 1))
+INTEGER_MAX = (1 << (INTEGER_BITS - 1)) - 1
+_INTEGER_MASK = (1 << INTEGER_BITS) - 1
+
+IMPLICIT_INTEGER = "IJKLMN"
+
+ARITHMETIC_OPS = ("PLUS", "MINUS", "MULT", "DIV", "POWER")
+RELATIONAL_OPS = ("EQ", "NE", "LT", "LE", "GT", "GE")
+# Operaciones INTEGER que conmutan con la reducción módulo 2**32: sus
+# operandos no necesitan estar reducidos. Cualquier otro uso de un INTEGER
+# (otra operación, un operando de una operación REAL) sí lo necesita
+MODULAR_OPS = ("PLUS", "MINUS", "MULT")
+
+
+def implicit_type(name: str) -> str:
+    return "INTEGER" if name[:1].upper() in IMPLICIT_INTEGER else "REAL"
+
+
+def binary_type(op: str, left: str, right: str) -> str:
+    """Tipo del resultado de una operación (LOGICAL para las relacionales)."""
+    if op in RELATIONAL_OPS:
+        return "LOGICAL"
+    return "INTEGER" if left == right == "INTEGER" else "REAL"
+
+
+def wrap_integer(value: int) -> int:
+    """Reduce un entero al rango de INTEGER (complemento a dos)."""
+    return ((value - INTEGER_MIN) & _INTEGER_MASK) + INTEGER_MIN
+
+
+def real_to_integer(value: float) -> int:
+    if value != value or not -2147483649.0 < value < 2147483648.0:
+        return INTEGER_MIN
+    return int(value)
+
+
+def integer_div(left: int, right: int) -> int:
+    quotient = abs(left) // abs(right)  # ZeroDivisionError si right == 0
+    return quotient if (left < 0) == (right < 0) else -quotient
+
+
+def integer_pow(base: int, exponent: int) -> int:
+    """INTEGER ** INTEGER; con exponente negativo el resultado es 1/base**n
+    truncado. Se calcula módulo 2**32, que es lo que queda al asignar."""
+    if exponent >= 0:
+        return wrap_integer(pow(base, exponent, 1 << INTEGER_BITS))
+    if base == 0:
+        raise ZeroDivisionError("0 elevado a un exponente negativo")
+    if base == 1 or base == -1:
+        return base if exponent & 1 else 1
+    return 0
+
+
+def real_div(left: float, right: float) -> float:
+    try:
+        return left / right
+    except ZeroDivisionError:
+        if left != left or not left:
+            return math.nan
+        return math.copysign(math.inf, left) * math.copysign(1.0, right)
+
+
+def real_pow(base: float, exponent: float) -> float:
+    """REAL ** REAL con los casos especiales de IEEE 754 (pow de C99).
+
+    Es la única implementación de la potencia REAL: lexer.vectorized la
+    aplica fila por fila en vez de usar np.power, que puede diferir en el
+    último bit y en casos como (-inf) ** 0.5."""
+    odd = float(exponent).is_integer() and exponent % 2 == 1
+    if (base < 0 and math.isfinite(base) and math.isfinite(exponent)
+            and not float(exponent).is_integer()):
+        return math.nan  # Python devolvería un complejo
+    try:
+        return float(base) ** exponent
+    except ZeroDivisionError:  # 0.0 ** negativo: inf con el signo de IEEE
+        return math.copysign(math.inf, base) if odd else math.inf
+    except OverflowError:
+        return -math.inf if base < 0 and odd else math.inf
+
+
+def convert(value: int | float, type_name: str) -> int | float:
+    """Valor de entrada o de asignación llevado al tipo de la variable."""
+    if type_name == "INTEGER":
+        return wrap_integer(value) if isinstance(value, int) else real_to_integer(value)
+    return float(value)
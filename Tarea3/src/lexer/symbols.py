@@ -0,0 +1,94 @@
+"""Tabla de símbolos del lexer: kinds como enteros e identificadores internados.
+
+Los kinds ("ID", "PLUS", "PROGRAM", ...) se asignan a enteros pequeños una
+sola vez por proceso, de modo que los parsers comparan ints en lugar de
+cadenas. Los ids son estables dentro del proceso; los kinds predefinidos
+abajo tienen además siempre el mismo número.
+
+Cada Lexer tiene su propia SymbolTable, que interna los identificadores sin
+distinguir mayúsculas (Fortran no las distingue): V1 y v1 tienen el mismo
+id, y cada grafía repetida comparte un único string.
+"""
+from __future__ import annotations
+import threading
+from typing import Dict, Iterable
+
+# Kinds que produce el lexer con el registro del curso, en orden fijo
+PREDEFINED_KINDS = (
+    "EOF", "UNKNOWN_CHAR", "ID", "INT", "REAL", "STRING", "LABEL",
+    "INTEGER", "IF", "THEN", "ELSE", "ENDIF", "PROGRAM", "END", "TRUE", "FALSE",
+    "PLUS", "MINUS", "MULT", "DIV", "POWER", "EQ", "NE", "LT", "LE", "GT", "GE",
+    "ASSIGN", "LPAREN", "RPAREN",
+)
+
+
+class KindTable:
+    """Asignación kind -> entero, compartida por todo el proceso."""
+
+    def __init__(self, kinds: Iterable[str] = ()):
+        self.ids: Dict[str, int] = {}
+        self.names: list[str] = []
+        self._lock = threading.Lock()
+        self.register(kinds)
+
+    def register(self, kinds: Iterable[str]) -> None:
+        for kind in kinds:
+            self.id(kind)
+
+    def id(self, kind: str) -> int:
+        kind_id = self.ids.get(kind)
+        if kind_id is None:
+            with self._lock:
+                kind_id = self.ids.get(kind)
+                if kind_id is None:
+                    kind_id = len(self.names)
+                    self.names.append(kind)
+                    self.ids[kind] = kind_id
+        return kind_id
+
+    def name(self, kind_id: int) -> str:
+        return self.names[kind_id]
+
+
+KINDS = KindTable(PREDEFINED_KINDS)
+kind_id = KINDS.id
+kind_name = KINDS.name
+
+# Marca de "no es un identificador" en Token.symbol y en las columnas
+NO_SYMBOL = -1
+
+
+class SymbolTable:
+    """Identificadores de un programa: id por nombre (sin distinguir
+    mayúsculas) y un único string por cada grafía."""
+
+    def __init__(self):
+        self._spellings: Dict[str, tuple[str, int]] = {}
+        self._ids: Dict[str, int] = {}
+        self.names: list[str] = []
+
+    def intern(self, lexeme: str) -> tuple[str, int]:
+        """Devuelve (lexema compartido, id del nombre)."""
+        entry = self._spellings.get(lexeme)
+        if entry is None:
+            name = lexeme.upper()
+            symbol = self._ids.get(name)
+            if symbol is None:
+                symbol = self._ids[name] = len(self.names)
+                self.names.append(name)
+            entry = self._spellings.setdefault(lexeme, (lexeme, symbol))
+        return entry
+
+    def id(self, name: str) -> int:
+        """Id de un nombre ya visto (KeyError si no apareció)."""
+        return self._ids[name.upper()]
+
+    def name(self, symbol: int) -> str:
+        """Nombre canónico (en mayúsculas) de un id."""
+        return self.names[symbol]
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __contains__(self, name: str) -> bool:
+        return name.upper() in self._ids
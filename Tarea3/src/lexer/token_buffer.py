@@ -0,0 +1,322 @@
+from __future__ import annotations
+from array import array
+from collections import Counter
+from typing import Callable, Iterator, Dict
+
+from .lexer_engine import Category, Lexer, LineIndex, LAZY, LITERAL_VALUES
+from .symbols import KINDS, NO_SYMBOL, SymbolTable
+
+# Marcas en la columna de índices de valores: "sin valor" y "literal
+# todavía no convertido" (se convierte al leerlo o con convert_literals)
+NO_VALUE = -1
+LAZY_VALUE = -2
+# Lexemas numéricos más largos que esto se convierten uno a uno
+_MAX_BATCH_WIDTH = 32
+# Dígitos que caben sin desbordar en un int64
+_MAX_INT64_DIGITS = 18
+
+
+class TokenView:
+    """Vista liviana de la fila `index` de un TokenBuffer.
+
+    Expone la misma interfaz de lectura que Token (category, kind, lexeme,
+    offset, line, col, value) sin copiar los datos de las columnas.
+    """
+
+    __slots__ = ("buffer", "index")
+
+    def __init__(self, buffer: TokenBuffer, index: int):
+        self.buffer = buffer
+        self.index = index
+
+    @property
+    def category(self) -> Category:
+        return self.buffer.kind_table[self.buffer.kinds[self.index]][0]
+
+    @property
+    def kind(self) -> str:
+        return self.buffer.kind_table[self.buffer.kinds[self.index]][1]
+
+    @property
+    def kind_id(self) -> int:
+        return self.buffer.kind_globals[self.buffer.kinds[self.index]]
+
+    @property
+    def symbol(self) -> int:
+        return self.buffer.symbols[self.index]
+
+    @property
+    def offset(self) -> int:
+        return self.buffer.offsets[self.index]
+
+    @property
+    def lexeme(self) -> str:
+        start = self.buffer.offsets[self.index]
+        return self.buffer.text[start:start + self.buffer.lengths[self.index]]
+
+    @property
+    def line(self) -> int:
+        return self.buffer.lines[self.index]
+
+    @property
+    def col(self) -> int:
+        buffer = self.buffer
+        line_start = buffer.line_index.starts[buffer.lines[self.index] - 1]
+        return buffer.offsets[self.index] - line_start + 1
+
+    @property
+    def position(self) -> tuple[int, int]:
+        return self.line, self.col
+
+    @property
+    def value(self) -> int | float | str | None:
+        return self.buffer.value_at(self.index)
+
+    def __str__(self) -> str:
+        val_str = f" = {self.value}" if self.value is not None else ""
+        return (f"[{self.line}:{self.col}] {self.category.value:<14} "
+                f"{self.kind:<10} '{self.lexeme}'{val_str}")
+
+    def __repr__(self) -> str:
+        return f"TokenView({self.index}, {self.kind!r}, {self.lexeme!r})"
+
+
+class TokenBuffer:
+    """Secuencia de tokens almacenada en columnas paralelas de `array`.
+
+    En lugar de un objeto Token por lexema se guardan ids de kind, offsets,
+    largos, números de línea, índices de valor e ids de identificador; los tokens se entregan como
+    TokenView al indexar. Implementa tokens(), por lo que Parser y LL1Parser
+    pueden recorrerlo igual que a un Lexer.
+    """
+
+    def __init__(self, text: str | Callable[[], str], line_index: LineIndex | None = None,
+                 symbol_table: SymbolTable | None = None):
+        # text puede ser una función que lo devuelve: se llama la primera vez
+        # que hace falta un lexema (una entrada de la caché de tokens no
+        # decodifica el archivo si solo se cuentan tokens). En ese caso
+        # line_index es obligatorio
+        if callable(text):
+            self._text, self._load_text = None, text
+        else:
+            self._text, self._load_text = text, None
+        self.line_index = line_index or LineIndex(self.text)
+        self.symbol_table = symbol_table if symbol_table is not None else SymbolTable()
+
+        # Tabla de (categoría, kind) y su id compacto; kind_globals guarda el
+        # id de cada kind en symbols.KINDS (el que comparan los parsers)
+        self.kind_table: list[tuple[Category, str]] = []
+        self.kind_globals: list[int] = []
+        self._kind_ids: Dict[tuple[Category, str], int] = {}
+
+        self.kinds = array("H")
+        self.offsets = array("q")
+        self.lengths = array("I")
+        self.lines = array("I")
+        self.value_indexes = array("i")
+        self.symbols = array("i")
+        self.values: list[int | float | str] = []
+
+    @property
+    def text(self) -> str:
+        if self._text is None:
+            self._text = self._load_text()
+            self._load_text = None
+        return self._text
+
+    @classmethod
+    def from_lexer(cls, lexer: Lexer, text: str | None = None,
+                   symbol_table: SymbolTable | None = None) -> TokenBuffer:
+        """Llena el buffer directamente desde el escáner, sin crear objetos Token.
+
+        Si se entrega text se tokeniza ese texto en vez de lexer.text. Cada
+        buffer tiene su propia SymbolTable (la de su texto), salvo que se
+        entregue una para compartir: así un lexer reutilizado para muchos
+        archivos no acumula los identificadores de todos.
+        """
+        text = lexer.text if text is None else text
+        buffer = cls(text, symbol_table=symbol_table)
+        spec = lexer.current_spec()
+        describe = spec.token_factory.describe
+
+        kind_id = buffer.kind_id
+        kinds_append = buffer.kinds.append
+        offsets_append = buffer.offsets.append
+        lengths_append = buffer.lengths.append
+        lines_append = buffer.lines.append
+        value_indexes_append = buffer.value_indexes.append
+        symbols_append = buffer.symbols.append
+        intern = buffer.symbol_table.intern
+        values = buffer.values
+
+        # Los offsets llegan en orden, así que la línea actual solo avanza
+        starts = buffer.line_index.starts
+        line, next_start = 1, starts[1] if len(starts) > 1 else len(text) + 1
+
+        for token_type, start, end in lexer._scan_text(text, spec, lexer.error_budget()):
+            while start >= next_start:
+                line += 1
+                next_start = starts[line] if line < len(starts) else len(text) + 1
+
+            lexeme = text[start:end]
+            category, kind, value = describe(token_type, lexeme)
+            kinds_append(kind_id(category, kind))
+            symbols_append(intern(lexeme)[1] if category is Category.IDENT else NO_SYMBOL)
+            offsets_append(start)
+            lengths_append(end - start)
+            lines_append(line)
+            if value is None:
+                value_indexes_append(NO_VALUE)
+            elif value is LAZY:
+                value_indexes_append(LAZY_VALUE)
+            else:
+                value_indexes_append(len(values))
+                values.append(value)
+
+        buffer.append_eof()
+        return buffer
+
+    def kind_id(self, category: Category, kind: str) -> int:
+        key = (category, kind)
+        kind_id = self._kind_ids.get(key)
+        if kind_id is None:
+            kind_id = self._kind_ids[key] = len(self.kind_table)
+            self.kind_table.append(key)
+            self.kind_globals.append(KINDS.id(kind))
+        return kind_id
+
+    def append_eof(self) -> None:
+        end = len(self.text)
+        self.kinds.append(self.kind_id(Category.EOF, "EOF"))
+        self.offsets.append(end)
+        self.lengths.append(0)
+        self.lines.append(self.line_index.line_col(end)[0])
+        self.value_indexes.append(NO_VALUE)
+        self.symbols.append(NO_SYMBOL)
+
+    def value_at(self, index: int) -> int | float | str | None:
+        value_index = self.value_indexes[index]
+        if value_index == NO_VALUE:
+            return None
+        if value_index == LAZY_VALUE:
+            start = self.offsets[index]
+            lexeme = self.text[start:start + self.lengths[index]]
+            value = LITERAL_VALUES[self.kind_table[self.kinds[index]][0]](lexeme)
+            self.value_indexes[index] = len(self.values)
+            self.values.append(value)
+            return value
+        return self.values[value_index]
+
+    def convert_literals(self) -> int:
+        """Convierte de una vez todos los literales pendientes y devuelve
+        cuántos eran.
+
+        Con NumPy los enteros y reales se convierten en bloque sobre las
+        columnas de offsets y largos: los caracteres de todos los lexemas se
+        reúnen en una matriz y los enteros se calculan como suma de dígitos
+        por potencias de 10, los reales con un único astype(float64). Sin
+        NumPy (o para cadenas y etiquetas) se convierten uno a uno.
+        """
+        try:
+            import numpy
+        except ImportError:
+            numpy = None
+
+        if numpy is None:
+            pending = [i for i, value_index in enumerate(self.value_indexes)
+                       if value_index == LAZY_VALUE]
+            count = len(pending)
+        else:
+            value_indexes = numpy.frombuffer(self.value_indexes, dtype=numpy.int32)
+            count = int(numpy.count_nonzero(value_indexes == LAZY_VALUE))
+            if count:
+                self._convert_numeric_batch(numpy)
+            # Quedan cadenas, etiquetas y números fuera de rango
+            pending = numpy.flatnonzero(value_indexes == LAZY_VALUE).tolist()
+
+        for index in pending:
+            self.value_at(index)
+        return count
+
+    def _convert_numeric_batch(self, np) -> None:
+        kinds = np.frombuffer(self.kinds, dtype=np.uint16)
+        offsets = np.frombuffer(self.offsets, dtype=np.int64)
+        lengths = np.frombuffer(self.lengths, dtype=np.uint32).astype(np.int64)
+        lazy = np.frombuffer(self.value_indexes, dtype=np.int32) == LAZY_VALUE
+        # utf-32 deja un código por carácter: los offsets siguen siendo válidos
+        codes = np.frombuffer(self.text.encode("utf-32-le"), dtype=np.uint32)
+
+        converted = []
+        for category, max_width in ((Category.LIT_INT, _MAX_INT64_DIGITS),
+                                    (Category.LIT_REAL, _MAX_BATCH_WIDTH)):
+            ids = [i for i, (cat, _) in enumerate(self.kind_table) if cat is category]
+            rows = np.flatnonzero(lazy & np.isin(kinds, ids) & (lengths <= max_width))
+            if not len(rows):
+                continue
+            width = int(lengths[rows].max())
+            columns = np.arange(width)
+            inside = columns < lengths[rows, None]
+            chars = np.where(inside, codes[np.minimum(offsets[rows, None] + columns,
+                                                       len(codes) - 1)], 0)
+            if category is Category.LIT_INT:
+                # Posición j vale 10^(largo-1-j); el relleno aporta 0
+                exponents = np.where(inside, lengths[rows, None] - 1 - columns, 0)
+                digits = np.where(inside, chars.astype(np.int64) - ord("0"), 0)
+                values = (digits * 10 ** exponents).sum(axis=1)
+            else:
+                values = self._batch_reals(np, chars, width)
+                if values is None:
+                    continue
+            converted.append((rows, values.tolist()))
+
+        value_indexes = np.frombuffer(self.value_indexes, dtype=np.int32)
+        for rows, values in converted:
+            value_indexes[rows] = np.arange(len(self.values), len(self.values) + len(values))
+            self.values.extend(values)
+
+    @staticmethod
+    def _batch_reals(np, chars, width: int):
+        # Igual que real_value: d/D de doble precisión pasa a exponente e, y un
+        # lexema que termina en d/D (sin dígitos de exponente) vale 0.0
+        last = chars[np.arange(len(chars)), np.count_nonzero(chars, axis=1) - 1]
+        broken = (last == ord("d")) | (last == ord("D"))
+        chars = np.where((chars == ord("d")) | (chars == ord("D")), ord("e"), chars)
+        chars[broken] = 0
+        text = np.ascontiguousarray(chars, dtype=np.uint32).view(f"<U{width}").ravel()
+        try:
+            values = text.astype(np.float64)
+        except ValueError:
+            return None  # forma inesperada: se convierten uno a uno
+        values[broken] = 0.0
+        return values
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    def __getitem__(self, index: int) -> TokenView:
+        if index < 0:
+            index += len(self.kinds)
+        if not 0 <= index < len(self.kinds):
+            raise IndexError("índice de token fuera de rango")
+        return TokenView(self, index)
+
+    def __iter__(self) -> Iterator[TokenView]:
+        for index in range(len(self.kinds)):
+            yield TokenView(self, index)
+
+    def tokens(self) -> Iterator[TokenView]:
+        return iter(self)
+
+    def category_counts(self) -> Dict[str, int]:
+        """Cantidad de tokens por categoría, contada sobre la columna de kinds."""
+        counts: Dict[str, int] = {}
+        for kind_id, count in Counter(self.kinds).items():
+            category = self.kind_table[kind_id][0].value
+            counts[category] = counts.get(category, 0) + count
+        return counts
+
+    def nbytes(self) -> int:
+        """Memoria ocupada por las columnas numéricas (sin texto ni valores)."""
+        columns = (self.kinds, self.offsets, self.lengths, self.lines, self.value_indexes,
+                   self.symbols)
+        return sum(column.itemsize * len(column) for column in columns)
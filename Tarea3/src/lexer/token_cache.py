@@ -0,0 +1,292 @@
+"""Caché en disco de tokens, direccionada por contenido.
+
+Volver a tokenizar un corpus que no cambió repite todo el trabajo. TokenCache
+guarda las columnas de TokenBuffer de cada archivo en un archivo binario cuyo
+nombre es el hash de:
+- el contenido del archivo;
+- TokenRegistry.fingerprint();
+- las opciones del lexer que cambian el resultado.
+
+Un archivo modificado o un registro distinto producen otra clave, así que
+nunca se lee una entrada vieja. En una corrida con la caché caliente solo se
+calcula el hash de cada archivo y se mapean (mmap) sus columnas: los tokens no
+se copian ni se vuelven a crear, y el texto se decodifica recién cuando se
+pide un lexema.
+
+La escritura es atómica: se escribe un temporal en el mismo directorio y se
+renombra con os.replace, de modo que varios procesos pueden compartir la
+caché. Cuando el directorio supera max_bytes se borran las entradas usadas
+hace más tiempo (LRU por fecha de modificación, que se renueva en cada
+acierto).
+
+Formato de una entrada (orden de bytes del equipo que la escribió):
+
+    0   MAGIC (8 bytes)
+    8   largo H de la cabecera (uint32)
+    12  cabecera JSON: formato, byteorder, tabla de (categoría, kind), los
+        nombres que usa el archivo (sus ids son los de la columna symbols) y
+        [nombre, typecode, cantidad, offset] de cada columna
+    ..  columnas de array, cada una alineada a 8 bytes, con offsets
+        relativos al primer múltiplo de 8 después de la cabecera
+
+Los valores de los literales no se guardan: se recalculan desde el lexema al
+leerlos, como en cualquier TokenBuffer.
+"""
+from __future__ import annotations
+import hashlib
+import json
+import mmap
+import os
+import sys
+import tempfile
+import time
+from array import array
+from typing import Callable, Dict
+
+from .lexer_engine import Category, Lexer, LineIndex
+from .symbols import NO_SYMBOL
+from .token_buffer import LAZY_VALUE, NO_VALUE, TokenBuffer
+
+CACHE_FORMAT = 1
+MAGIC = b"F77TOKC\0"
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+# Al desalojar se baja hasta esta fracción de max_bytes, para no volver a
+# recorrer el directorio en cada escritura
+_LOW_WATER = 0.9
+# Temporales de escrituras interrumpidas que se borran al desalojar
+_STALE_TMP_SECONDS = 3600
+_SUFFIX = ".tok"
+
+# Columnas de TokenBuffer que se guardan, en orden
+_COLUMNS = ("kinds", "offsets", "lengths", "lines", "value_indexes", "symbols")
+
+
+def default_cache_dir() -> str:
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "teoria-computacion", "tokens")
+
+
+def decode_source(data: bytes) -> str:
+    """El mismo texto que da open(path, encoding="utf-8", errors="replace"):
+    bytes inválidos reemplazados y fines de línea universales."""
+    text = data.decode("utf-8", errors="replace")
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text
+
+
+def _aligned(size: int) -> int:
+    return (size + 7) & ~7
+
+
+class TokenCache:
+    def __init__(self, directory: str | None = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = directory or default_cache_dir()
+        self.max_bytes = max_bytes
+        os.makedirs(self.directory, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+        # Tamaño del directorio en el último recorrido (None: sin recorrer) y
+        # lo que este proceso escribió desde entonces
+        self._size: int | None = None
+        self._written = 0
+
+    def key(self, data: bytes, lexer: Lexer) -> str:
+        options = (CACHE_FORMAT, type(lexer).__name__, lexer.fixed_form,
+                   lexer.max_errors, lexer.max_error_ratio)
+        digest = hashlib.sha256(data)
+        digest.update(f"\0{lexer.registry.fingerprint()}\0{options!r}".encode())
+        return digest.hexdigest()
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, key + _SUFFIX)
+
+    def tokenize(self, data: bytes, lexer: Lexer) -> TokenBuffer:
+        """Tokens del contenido data (bytes de un archivo fuente): desde la
+        caché si ya se tokenizó, si no con TokenBuffer.from_lexer y se guardan."""
+        key = self.key(data, lexer)
+        buffer = self.load(key, lambda: decode_source(data))
+        if buffer is not None:
+            self.hits += 1
+            return buffer
+        self.misses += 1
+        # Con su propia SymbolTable: la del lexer (que se reutiliza entre
+        # archivos) no debe terminar en la entrada
+        buffer = TokenBuffer.from_lexer(lexer, decode_source(data))
+        self.store(key, buffer)
+        return buffer
+
+    def tokenize_file(self, path: str, lexer: Lexer) -> TokenBuffer:
+        with open(path, "rb") as file:
+            return self.tokenize(file.read(), lexer)
+
+    def load(self, key: str, text: str | Callable[[], str]) -> TokenBuffer | None:
+        """TokenBuffer de la entrada key con sus columnas mapeadas en memoria,
+        o None si no existe o no es legible por este proceso. text es el
+        texto fuente o una función que lo devuelve cuando hace falta."""
+        path = self.path(key)
+        try:
+            with open(path, "rb") as file:
+                # ACCESS_COPY: las columnas quedan escribibles para el propio
+                # proceso (value_indexes cambia al convertir literales) sin
+                # tocar el archivo
+                mapping = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_COPY)
+        except (OSError, ValueError):
+            return None
+        try:
+            buffer = self._read(mapping, text)
+        except (ValueError, KeyError, TypeError, IndexError):
+            return None
+        try:
+            os.utime(path)  # Renueva la entrada para el LRU
+        except OSError:
+            pass
+        return buffer
+
+    @staticmethod
+    def _read(mapping: mmap.mmap, text: str | Callable[[], str]) -> TokenBuffer:
+        if mapping[:len(MAGIC)] != MAGIC:
+            raise ValueError("no es una entrada de la caché de tokens")
+        header_size = int.from_bytes(mapping[8:12], sys.byteorder)
+        header = json.loads(mapping[12:12 + header_size].decode("utf-8"))
+        if header["format"] != CACHE_FORMAT or header["byteorder"] != sys.byteorder:
+            raise ValueError("formato de caché distinto")
+        text_length = header["text_length"]
+        if callable(text):
+            load_text = text
+
+            def text() -> str:
+                source = load_text()
+                if len(source) != text_length:
+                    raise ValueError("la entrada de la caché no corresponde al texto")
+                return source
+        elif len(text) != text_length:
+            raise ValueError("la entrada no corresponde al texto")
+
+        data = memoryview(mapping)[_aligned(12 + header_size):]
+        columns = {}
+        for name, typecode, count, offset in header["columns"]:
+            size = array(typecode).itemsize
+            columns[name] = data[offset:offset + count * size].cast(typecode)
+
+        buffer = TokenBuffer(text, LineIndex.from_starts(columns.pop("line_starts")))
+        for category, kind in header["kinds"]:
+            buffer.kind_id(Category(category), kind)
+        intern = buffer.symbol_table.intern
+        for name in header["symbols"]:
+            intern(name)
+        for name in _COLUMNS:
+            setattr(buffer, name, columns[name])
+        return buffer
+
+    def store(self, key: str, buffer: TokenBuffer) -> None:
+        arrays = {name: getattr(buffer, name) for name in _COLUMNS}
+        if buffer.values:
+            # Los valores ya convertidos se vuelven a marcar como pendientes:
+            # se recalculan desde el lexema
+            arrays["value_indexes"] = array("i", (NO_VALUE if index == NO_VALUE else LAZY_VALUE
+                                                  for index in buffer.value_indexes))
+        arrays["line_starts"] = array("q", buffer.line_index.starts)
+        names = buffer.symbol_table.names
+        used = set(buffer.symbols)
+        used.discard(NO_SYMBOL)
+        if len(used) < len(names):
+            # SymbolTable compartida con otros archivos: solo se guardan los
+            # nombres de este, con ids renumerados
+            ids = sorted(used)
+            renumber = {old: new for new, old in enumerate(ids)}
+            renumber[NO_SYMBOL] = NO_SYMBOL
+            arrays["symbols"] = array("i", map(renumber.__getitem__, buffer.symbols))
+            names = [names[symbol] for symbol in ids]
+
+        layout, offset = [], 0
+        for name, column in arrays.items():
+            layout.append([name, getattr(column, "typecode", None) or column.format,
+                           len(column), offset])
+            offset = _aligned(offset + len(column) * column.itemsize)
+        header = json.dumps({
+            "format": CACHE_FORMAT,
+            "byteorder": sys.byteorder,
+            "text_length": len(buffer.text),
+            "kinds": [[category.value, kind] for category, kind in buffer.kind_table],
+            "symbols": names,
+            "columns": layout,
+        }).encode("utf-8")
+
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                file.write(MAGIC)
+                file.write(len(header).to_bytes(4, sys.byteorder))
+                file.write(header)
+                file.write(bytes(_aligned(12 + len(header)) - 12 - len(header)))
+                for column in arrays.values():
+                    raw = column.tobytes()
+                    file.write(raw)
+                    file.write(bytes(_aligned(len(raw)) - len(raw)))
+                size = file.tell()
+            os.replace(tmp, self.path(key))
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+
+        # Otros procesos también escriben: además de la estimación propia, se
+        # vuelve a recorrer el directorio cada (1 - _LOW_WATER) * max_bytes
+        # escritos, así el exceso queda acotado por proceso
+        self._written += size
+        if (self._size is None or self._size + self._written > self.max_bytes
+                or self._written > self.max_bytes * (1 - _LOW_WATER)):
+            self.evict()
+
+    def entries(self) -> list[tuple[float, int, str]]:
+        """(última vez usada, tamaño, ruta) de cada entrada; de paso borra los
+        temporales abandonados."""
+        entries = []
+        now = time.time()
+        with os.scandir(self.directory) as scan:
+            for entry in scan:
+                try:
+                    stat = entry.stat()
+                    if entry.name.endswith(_SUFFIX):
+                        entries.append((stat.st_mtime, stat.st_size, entry.path))
+                    elif entry.name.endswith(".tmp") and now - stat.st_mtime > _STALE_TMP_SECONDS:
+                        os.unlink(entry.path)
+                except FileNotFoundError:
+                    pass  # La borró otro proceso
+        return entries
+
+    def evict(self) -> int:
+        """Borra las entradas menos usadas hasta quedar bajo max_bytes y
+        devuelve cuántas borró."""
+        entries = self.entries()
+        size = sum(entry[1] for entry in entries)
+        removed = 0
+        if size > self.max_bytes:
+            target = self.max_bytes * _LOW_WATER
+            for _, entry_size, path in sorted(entries):
+                if size <= target:
+                    break
+                try:
+                    os.unlink(path)
+                    removed += 1
+                except FileNotFoundError:
+                    pass
+                size -= entry_size
+        self._size, self._written = size, 0
+        return removed
+
+    def clear(self) -> None:
+        for _, _, path in self.entries():
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+        self._size, self._written = 0, 0
+
+    def stats(self) -> Dict[str, int]:
+        entries = self.entries()
+        return {"entries": len(entries), "bytes": sum(entry[1] for entry in entries),
+                "hits": self.hits, "misses": self.misses}
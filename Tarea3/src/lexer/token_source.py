@@ -0,0 +1,159 @@
+"""Fuente de tokens con lookahead de k tokens para los parsers.
+
+TokenSource pide los tokens al lexer por lotes (Lexer.token_batches) y los
+guarda en un buffer circular, así el parser no reanuda un generador ni
+atrapa StopIteration por cada token. Además permite mirar hacia adelante
+(peek(k)) y retroceder de forma acotada (mark()/reset()), para reglas que
+necesitan más de un token de lookahead sin volver a tokenizar.
+
+Al agotarse el lexer, el último token (EOF) se repite indefinidamente.
+"""
+from __future__ import annotations
+from bisect import insort
+from itertools import islice
+from typing import Iterable, Iterator
+
+from .lexer_engine import DEFAULT_TOKEN_BATCH, Token
+
+# Capacidad inicial del buffer (potencia de 2); crece si el lookahead o las
+# marcas activas la superan
+DEFAULT_CAPACITY = 1 << 10
+
+
+def _batches(tokens: Iterable[Token], batch_size: int) -> Iterator[list[Token]]:
+    iterator = iter(tokens)
+    while True:
+        batch = list(islice(iterator, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+class TokenSource:
+    """Buffer circular de tokens.
+
+    Las posiciones son absolutas (cantidad de tokens desde el comienzo):
+    _start es el token actual y _end el siguiente a los ya leídos del
+    lexer. El token de la posición p está en _ring[p & _mask]. _marks está
+    ordenada, así _marks[0] es la marca más antigua que hay que conservar.
+    """
+
+    def __init__(self, tokens: Iterable[Token] | Iterator[list[Token]],
+                 batched: bool = False, batch_size: int = DEFAULT_TOKEN_BATCH,
+                 capacity: int = DEFAULT_CAPACITY):
+        self._batches = iter(tokens) if batched else _batches(tokens, batch_size)
+        size = 1
+        while size < max(capacity, 2 * batch_size):
+            size *= 2
+        self._ring: list[Token | None] = [None] * size
+        self._mask = size - 1
+        self._start = 0
+        self._end = 0
+        self._marks: list[int] = []
+        self._exhausted = False
+        self._fill()
+        if self._end == 0:
+            raise ValueError("el lexer no entregó ningún token")
+
+    @classmethod
+    def from_lexer(cls, lexer, batch_size: int = DEFAULT_TOKEN_BATCH) -> TokenSource:
+        """Fuente sobre un Lexer (o cualquier objeto con tokens())."""
+        if hasattr(lexer, "token_batches"):
+            return cls(lexer.token_batches(batch_size), batched=True, batch_size=batch_size)
+        return cls(lexer.tokens(), batch_size=batch_size)
+
+    def _fill(self) -> bool:
+        """Agrega el siguiente lote al buffer; False si el lexer se agotó."""
+        if self._exhausted:
+            return False
+        batch = next(self._batches, None)
+        if not batch:
+            self._exhausted = True
+            return False
+        floor = min(self._marks[0], self._start) if self._marks else self._start
+        while self._end + len(batch) - floor > len(self._ring):
+            self._grow(floor)
+        ring, mask = self._ring, self._mask
+        begin = self._end & mask
+        split = len(ring) - begin
+        if len(batch) <= split:
+            ring[begin:begin + len(batch)] = batch
+        else:
+            ring[begin:] = batch[:split]
+            ring[:len(batch) - split] = batch[split:]
+        self._end += len(batch)
+        return True
+
+    def _grow(self, floor: int) -> None:
+        old, old_mask = self._ring, self._mask
+        size = 2 * len(old)
+        ring: list[Token | None] = [None] * size
+        for position in range(floor, self._end):
+            ring[position & (size - 1)] = old[position & old_mask]
+        self._ring, self._mask = ring, size - 1
+
+    @property
+    def current(self) -> Token:
+        return self._ring[self._start & self._mask]
+
+    def peek(self, k: int = 1) -> Token:
+        """k-ésimo token desde el actual (peek(1) es el actual)."""
+        position = self._start + k - 1
+        while position >= self._end:
+            if not self._fill():
+                position = self._end - 1  # EOF se repite
+                break
+        return self._ring[position & self._mask]
+
+    def advance(self) -> Token:
+        """Avanza un token y devuelve el nuevo actual."""
+        start = self._start + 1
+        if start >= self._end and not self._fill():
+            return self._ring[self._start & self._mask]  # Ya en EOF
+        self._start = start
+        return self._ring[start & self._mask]
+
+    def take(self) -> list[Token]:
+        """Entrega los tokens ya leídos que siguen al actual (si no hay,
+        pide un lote) y deja como actual el último de ellos; lista vacía en
+        EOF. Para recorridos que avanzan de a uno sin peek ni marcas, como el
+        driver compilado de LL1Parser: indexan la lista en vez de llamar a
+        advance() por token."""
+        if self._start + 1 >= self._end and not self._fill():
+            return []
+        ring, mask = self._ring, self._mask
+        begin, end = (self._start + 1) & mask, self._end & mask
+        self._start = self._end - 1
+        if begin < end:
+            return ring[begin:end]
+        return ring[begin:] + ring[:end]
+
+    def mark(self) -> int:
+        """Marca la posición actual; los tokens desde ahí no se descartan
+        hasta release() o reset() de la marca."""
+        # Tras un reset() una marca nueva puede quedar antes que otras activas
+        insort(self._marks, self._start)
+        return self._start
+
+    def reset(self, mark: int) -> Token:
+        """Vuelve a la posición marcada (y libera la marca)."""
+        self.release(mark)
+        self._start = mark
+        return self.current
+
+    def release(self, mark: int) -> None:
+        self._marks.remove(mark)
+
+    @property
+    def position(self) -> int:
+        return self._start
+
+    def __iter__(self) -> Iterator[Token]:
+        """Tokens desde el actual hasta EOF inclusive (consumiéndolos)."""
+        token = self.current
+        while True:
+            yield token
+            following = self.advance()
+            if following is token:
+                return
+            token = following
@@ -0,0 +1,215 @@
+"""Trazas de los parsers: interfaz de oyentes y oyente contador.
+
+Los parsers no imprimen nada por sí mismos; quien quiera ver o medir el
+análisis les pasa un ParseListener:
+
+    Parser(lexer, listener=CountingListener())
+    Parser(lexer, listener=DescentPrinter())   # la salida de siempre
+    LL1Parser(lexer, listener=LL1Printer())
+
+Sin oyente no hay costo: Parser solo envuelve sus métodos parse_* cuando se
+le pasa uno, y LL1Parser comprueba una variable local en las ramas que
+aplican una regla o consumen un terminal.
+
+Uso como programa (desde Tarea3/src), para ver qué producciones usa un archivo
+y cuánto tiempo se pasa en cada no terminal:
+
+    python -m lexer.tracing ARCHIVO.f
+"""
+from __future__ import annotations
+import sys
+import time
+from collections import Counter
+from typing import TYPE_CHECKING
+
+from .symbols import kind_id, kind_name
+
+if TYPE_CHECKING:
+    from .diagnostics import Diagnostics
+    from .lexer_engine import Token
+
+
+class ParseListener:
+    """Eventos del análisis sintáctico; todos los métodos son opcionales.
+
+    rule es el no terminal ("<asignacion>", ...) y lookahead el token actual
+    al entrar o salir de la regla. Un par (rule, lookahead.kind) identifica la
+    producción elegida, como la entrada M[rule, lookahead] de una tabla LL(1).
+    """
+
+    def enter_rule(self, rule: str, lookahead: Token) -> None:
+        pass
+
+    def exit_rule(self, rule: str, lookahead: Token) -> None:
+        pass
+
+    def apply_production(self, rule: str, production: tuple, lookahead: Token) -> None:
+        """Solo LL1Parser: la producción de la tabla que se apila."""
+
+    def lookup(self, rule: str, kind_id: int, found: bool) -> None:
+        """Solo LL1Parser: consulta M[rule, kind] y si había entrada."""
+
+    def consume(self, token: Token) -> None:
+        pass
+
+    def finish(self, diagnostics: Diagnostics) -> None:
+        """Solo LL1Parser: fin del análisis, con los errores registrados."""
+
+
+class CountingListener(ParseListener):
+    """Cuenta cuántas veces se usa cada producción y mide el tiempo por no
+    terminal.
+
+    El tiempo total de una regla se cuenta solo en su activación más externa
+    (la recursión de <expresion> no se suma dos veces); el tiempo propio
+    descuenta el de las reglas anidadas.
+    """
+
+    def __init__(self):
+        self.rule_counts: Counter[str] = Counter()
+        self.production_counts: Counter[tuple[str, str]] = Counter()
+        self.productions: dict[tuple[str, str], tuple] = {}
+        self.total_time: dict[str, float] = {}
+        self.self_time: dict[str, float] = {}
+        self.consumed = 0
+        self.lookups = 0
+        self.lookup_misses = 0
+        # Pila de [regla, inicio, tiempo de las reglas anidadas]
+        self._active: list[list] = []
+        self._depth: Counter[str] = Counter()
+
+    def enter_rule(self, rule: str, lookahead: Token) -> None:
+        self.rule_counts[rule] += 1
+        self.production_counts[rule, lookahead.kind] += 1
+        self._depth[rule] += 1
+        self._active.append([rule, time.perf_counter(), 0.0])
+
+    def exit_rule(self, rule: str, lookahead: Token) -> None:
+        _, start, nested = self._active.pop()
+        elapsed = time.perf_counter() - start
+        self.self_time[rule] = self.self_time.get(rule, 0.0) + elapsed - nested
+        self._depth[rule] -= 1
+        if not self._depth[rule]:
+            self.total_time[rule] = self.total_time.get(rule, 0.0) + elapsed
+        if self._active:
+            self._active[-1][2] += elapsed
+
+    def apply_production(self, rule: str, production: tuple, lookahead: Token) -> None:
+        self.productions[rule, lookahead.kind] = production
+
+    def lookup(self, rule: str, kind_id: int, found: bool) -> None:
+        self.lookups += 1
+        if not found:
+            self.lookup_misses += 1
+
+    def consume(self, token: Token) -> None:
+        self.consumed += 1
+
+    def report(self) -> str:
+        lines = ["Producciones (regla, lookahead):"]
+        for (rule, kind), count in self.production_counts.most_common():
+            production = self.productions.get((rule, kind))
+            detail = f" -> {' '.join(production) or 'ε'}" if production is not None else ""
+            lines.append(f"  {count:>10}  M[{rule}, {kind}]{detail}")
+
+        lines.append("\nTiempo por no terminal:")
+        lines.append(f"  {'regla':<26} {'veces':>10} {'total (s)':>11} {'propio (s)':>11}")
+        for rule, own in sorted(self.self_time.items(), key=lambda item: -item[1]):
+            lines.append(f"  {rule:<26} {self.rule_counts[rule]:>10} "
+                         f"{self.total_time.get(rule, 0.0):>11.4f} {own:>11.4f}")
+
+        lines.append(f"\nTerminales consumidos: {self.consumed}")
+        if self.lookups:
+            lines.append(f"Consultas a la tabla: {self.lookups} "
+                         f"({self.lookup_misses} sin entrada)")
+        return "\n".join(lines)
+
+
+_ID, _ASSIGN = kind_id("ID"), kind_id("ASSIGN")
+_RELATIONAL_KINDS = tuple(map(kind_id, ("EQ", "NE", "LT", "LE", "GT", "GE")))
+
+# Mensajes al entrar y salir de cada regla de Parser
+_DESCENT_ENTER = {
+    "<bloque_declaraciones>": "  [BLOQUE DE DECLARACIONES]",
+    "<bloque_ejecutable>": "  [BLOQUE EJECUTABLE]",
+    "<condicional>": "    -> Sentencia IF iniciada",
+    "<expresion_logica>": "    -> Parseando Expresión Lógica...",
+}
+_DESCENT_EXIT = {
+    "<bloque_declaraciones>": "  [FIN DECLARACIONES]",
+    "<bloque_ejecutable>": "  [FIN EJECUTABLE]",
+    "<condicional>": "    -> Sentencia IF terminada",
+}
+
+
+class DescentPrinter(ParseListener):
+    """Reproduce la salida de depuración histórica de Parser."""
+
+    def __init__(self):
+        self.rules: list[str] = []
+        self.previous: Token | None = None
+
+    def enter_rule(self, rule: str, lookahead: Token) -> None:
+        self.rules.append(rule)
+        if rule in _DESCENT_ENTER:
+            print(_DESCENT_ENTER[rule])
+
+    def exit_rule(self, rule: str, lookahead: Token) -> None:
+        self.rules.pop()
+        if rule in _DESCENT_EXIT:
+            print(_DESCENT_EXIT[rule])
+
+    def consume(self, token: Token) -> None:
+        rule, kind = self.rules[-1], token.kind_id
+        if rule == "<programa>" and kind == _ID:
+            print(f"\n[PARSEANDO PROGRAMA: {token.lexeme}]")
+        elif rule == "<declaracion>" and kind == _ID:
+            print(f"    -> Declaración: {self.previous.lexeme} {token.lexeme}")
+        elif rule == "<asignacion>" and kind == _ASSIGN:
+            print(f"    -> Asignación: {self.previous.lexeme} = ...")
+        elif rule == "<expresion_logica>" and kind in _RELATIONAL_KINDS:
+            print(f"    -> Operador Relacional: {token.lexeme}")
+        self.previous = token
+
+
+class LL1Printer(ParseListener):
+    """Reproduce la salida de depuración histórica de LL1Parser."""
+
+    def apply_production(self, rule: str, production: tuple, lookahead: Token) -> None:
+        print(f"Aplicada Regla {rule} -> {production} con lookahead {lookahead.kind}")
+
+    def consume(self, token: Token) -> None:
+        print(f"Consumido Terminal: {kind_name(token.kind_id)} ('{token.lexeme}')")
+
+    def finish(self, diagnostics: Diagnostics) -> None:
+        if diagnostics:
+            print(f"\nAnálisis LL(1) completado con {len(diagnostics)} error(es).")
+        else:
+            print("\nAnálisis LL(1) completado con éxito.")
+
+
+def main(argv: list[str] | None = None) -> int:
+    from .lexer_engine import Lexer
+    from .parser import Parser
+
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 1:
+        print("Uso: python -m lexer.tracing ARCHIVO", file=sys.stderr)
+        return 2
+    with open(argv[0], encoding="utf-8") as file:
+        text = file.read()
+
+    listener = CountingListener()
+    start = time.perf_counter()
+    try:
+        Parser(Lexer(text), listener=listener).parse_programa()
+    except SyntaxError as e:
+        print(f"Error: {e}", file=sys.stderr)
+    elapsed = time.perf_counter() - start
+    print(listener.report())
+    print(f"\nTiempo de análisis (con trazas): {elapsed:.3f} s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,288 @@
+"""Ejecución vectorizada: un programa sobre muchas entradas a la vez con NumPy.
+
+VectorizedProgram recibe una tabla de valores iniciales (una columna por
+variable, una fila por ejecución) y evalúa cada asignación como una operación
+sobre columnas enteras. Un IF no bifurca: su condición se convierte en una
+máscara de filas y las asignaciones del cuerpo se aplican con np.where solo
+en esas filas. Un millón de ejecuciones cuestan así unas pocas pasadas por
+arreglo por sentencia, en vez de un millón de llamadas.
+
+    programa = Parser(Lexer(texto)).parse_programa()
+    resultados = VectorizedProgram(programa).run({"X": xs, "Y": ys})
+    resultados["Z"]          # arreglo con el Z final de cada fila
+
+La semántica es la de lexer.runtime, fila por fila: los INTEGER se calculan
+en int64 (que desborda módulo 2**64) y se reducen a 32 bits en los mismos
+puntos que el código de lexer.codegen, así cada resultado intermedio vale lo
+mismo que reducido a 32 bits; las columnas del resultado son int32. Los REAL
+son float64; REAL ** REAL se calcula con runtime.real_pow fila por fila, lo
+único que no es una operación de NumPy. Dividir un INTEGER por cero en una
+fila que ejecuta la división lanza ZeroDivisionError; las filas cuyo IF no
+se cumple no cuentan.
+
+NumPy es opcional para el resto del paquete: solo este módulo lo necesita.
+"""
+from __future__ import annotations
+from typing import Any, Dict
+
+from .ast_nodes import Assignment, BinOp, Constant, If, Name, Node, Program, UnaryOp
+from .codegen import CompileError, program_variables
+from .runtime import INTEGER_MIN, MODULAR_OPS, binary_type, real_pow, wrap_integer
+
+# Filas por bloque: acota la memoria de los temporales de cada operación
+DEFAULT_CHUNK_ROWS = 1 << 18
+
+_UFUNCS = {
+    "PLUS": "add", "MINUS": "subtract", "MULT": "multiply",
+    "EQ": "equal", "NE": "not_equal", "LT": "less", "LE": "less_equal",
+    "GT": "greater", "GE": "greater_equal",
+}
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError("La ejecución vectorizada necesita NumPy (pip install numpy)") from None
+    return numpy
+
+
+class _Chunk:
+    """Estado de un bloque de filas: las columnas de las variables (int64 o
+    float64) y la posición del bloque en la tabla, para los mensajes."""
+
+    def __init__(self, np, types: Dict[str, str], columns: Dict[str, Any], first_row: int):
+        self.np = np
+        self.types = types
+        self.columns = columns
+        self.first_row = first_row
+        self._real_pow = None
+
+    def check_zero(self, zero, mask, message: str) -> None:
+        active = zero if mask is None else zero & mask
+        if active.any():
+            row = self.first_row + int(self.np.flatnonzero(active)[0]) if active.ndim else None
+            where = f" (fila {row})" if row is not None else ""
+            raise ZeroDivisionError(f"{message}{where}")
+
+    def integer_div(self, left, right, mask):
+        np = self.np
+        zero = np.asarray(right == 0)
+        if zero.any():
+            self.check_zero(zero, mask, "División entera por cero")
+            right = np.where(zero, 1, right)
+        quotient = np.abs(left) // np.abs(right)
+        return np.where((left < 0) == (right < 0), quotient, -quotient)
+
+    def integer_pow(self, base, exponent, mask):
+        np = self.np
+        base, exponent = np.broadcast_arrays(np.asarray(base, np.int64),
+                                             np.asarray(exponent, np.int64))
+        # Exponente >= 0: potencia módulo 2**32 por cuadrados sucesivos (los
+        # productos de dos valores de 32 bits caben en uint64)
+        low = np.uint64(0xFFFFFFFF)
+        factor = base.astype(np.uint64) & low
+        remaining = np.maximum(exponent, 0).astype(np.uint64)
+        result = np.ones(base.shape, np.uint64)
+        one = np.uint64(1)
+        while remaining.any():
+            result = np.where(remaining & one, result * factor & low, result)
+            factor = factor * factor & low
+            remaining = remaining >> one
+        result = result.astype(np.uint32).astype(np.int32).astype(np.int64)
+
+        negative = exponent < 0
+        if negative.any():
+            self.check_zero(negative & (base == 0), mask, "0 elevado a un exponente negativo")
+            small = np.where(base == -1, np.where(exponent & 1, -1, 1), np.where(base == 1, 1, 0))
+            result = np.where(negative, small, result)
+        return result
+
+    def real_pow(self, base, exponent):
+        # runtime.real_pow fila por fila: np.power no siempre redondea igual
+        # que el pow de C ni sigue IEEE con base -inf, y los motores tienen
+        # que coincidir bit a bit. Es la única operación que no es una
+        # pasada de NumPy, así que ** cuesta una llamada de Python por fila
+        np = self.np
+        if self._real_pow is None:
+            self._real_pow = np.frompyfunc(real_pow, 2, 1)
+        value = self._real_pow(np.asarray(base, np.float64), np.asarray(exponent, np.float64))
+        return np.asarray(value, np.float64)
+
+    def real_to_integer(self, values):
+        np = self.np
+        valid = (values > -2147483649.0) & (values < 2147483648.0)  # nan no es válido
+        truncated = np.trunc(np.where(valid, values, 0.0)).astype(np.int64)
+        return np.where(valid, truncated, INTEGER_MIN)
+
+    def wrap_integer(self, values):
+        return self.np.asarray(values, self.np.int64).astype(self.np.int32).astype(self.np.int64)
+
+    def evaluate(self, node: Node, mask) -> tuple[Any, str, bool]:
+        """Valor (arreglo o escalar de NumPy) y tipo de la expresión, y si
+        el valor ya está reducido a 32 bits (si es INTEGER)."""
+        np = self.np
+        values: list[tuple[Any, str, bool]] = []
+        stack: list[tuple[Node, bool]] = [(node, False)]
+        while stack:
+            node, expanded = stack.pop()
+            if isinstance(node, Name):
+                values.append((self.columns[node.name], self.types[node.name], True))
+                continue
+            if isinstance(node, Constant):
+                if node.kind == "INT":
+                    values.append((np.int64(wrap_integer(node.value)), "INTEGER", True))
+                else:
+                    values.append((np.float64(node.value), "REAL", True))
+                continue
+            if not isinstance(node, (BinOp, UnaryOp)):
+                raise CompileError(f"Expresión no soportada: {type(node).__name__}")
+            if not expanded:
+                stack.append((node, True))
+                if isinstance(node, BinOp):
+                    stack.append((node.right, False))
+                    stack.append((node.left, False))
+                else:
+                    stack.append((node.operand, False))
+                continue
+
+            if isinstance(node, UnaryOp):
+                if node.op == "MINUS":
+                    value, type_name, _ = values.pop()
+                    values.append((np.negative(value), type_name, type_name != "INTEGER"))
+                continue
+            right, right_type, right_wrapped = values.pop()
+            left, left_type, left_wrapped = values.pop()
+            op = node.op
+            type_name = binary_type(op, left_type, right_type)
+            if type_name != "INTEGER" or op not in MODULAR_OPS:
+                if left_type == "INTEGER" and not left_wrapped:
+                    left = self.wrap_integer(left)
+                if right_type == "INTEGER" and not right_wrapped:
+                    right = self.wrap_integer(right)
+            if op == "DIV":
+                if type_name == "INTEGER":
+                    value = self.integer_div(left, right, mask)
+                else:
+                    value = np.true_divide(left, right)
+            elif op == "POWER":
+                if type_name == "INTEGER":
+                    value = self.integer_pow(left, right, mask)
+                else:
+                    value = self.real_pow(left, right)
+            elif op in _UFUNCS:
+                value = getattr(np, _UFUNCS[op])(left, right)
+            else:
+                raise CompileError(f"Operador no soportado: {op}")
+            values.append((value, type_name, type_name != "INTEGER" or op == "POWER"))
+        return values.pop()
+
+    def assign(self, statement: Assignment, mask) -> None:
+        np = self.np
+        name = statement.target.name
+        value, type_name, wrapped = self.evaluate(statement.value, mask)
+        if type_name == "INTEGER" and not wrapped:
+            value = self.wrap_integer(value)
+        if self.types[name] == "REAL":
+            value = np.asarray(value, np.float64)
+        elif type_name == "REAL":
+            value = self.real_to_integer(value)
+        column = self.columns[name]
+        # Las columnas nunca se modifican en el lugar, así que una asignación
+        # puede compartir el arreglo de otra variable
+        if mask is None:
+            self.columns[name] = np.broadcast_to(value, column.shape)
+        else:
+            self.columns[name] = np.where(mask, value, column)
+
+    def execute(self, statements: list[Node]) -> None:
+        np = self.np
+        rows = len(next(iter(self.columns.values()))) if self.columns else 0
+        # Marcos (sentencias, posición, máscara); máscara None = todas las filas
+        stack: list[tuple[list[Node], int, Any]] = [(statements, 0, None)]
+        while stack:
+            statements, index, mask = stack.pop()
+            if index == len(statements):
+                continue
+            stack.append((statements, index + 1, mask))
+            statement = statements[index]
+            if isinstance(statement, Assignment):
+                self.assign(statement, mask)
+            elif isinstance(statement, If):
+                if statement.condition is None:
+                    raise CompileError("El programa tiene errores sintácticos (IF sin condición)")
+                condition = self.evaluate(statement.condition, mask)[0]
+                condition = np.broadcast_to(condition, (rows,))
+                inner = condition if mask is None else mask & condition
+                if not inner.any():
+                    continue  # Ninguna fila entra al IF
+                stack.append((statement.body, 0, None if inner.all() else inner))
+            else:
+                raise CompileError(f"Sentencia no soportada: {type(statement).__name__}")
+
+
+class VectorizedProgram:
+    """Un programa listo para ejecutarse sobre tablas de entradas."""
+
+    def __init__(self, program: Program):
+        self.program = program
+        self.variables = program_variables(program)     # nombre -> tipo
+
+    def run(self, table: Any, chunk_rows: int = DEFAULT_CHUNK_ROWS) -> Dict[str, Any]:
+        """Ejecuta el programa una vez por fila de table y devuelve una
+        columna (int32 o float64) con el valor final de cada variable.
+
+        table es un diccionario nombre -> columna (listas, arreglos, una
+        columna de pandas...) o un arreglo estructurado de NumPy. Las
+        variables que no están en la tabla empiezan en cero; un escalar vale
+        para todas las filas.
+        """
+        np = _numpy()
+        names = table.dtype.names if hasattr(table, "dtype") else list(table.keys())
+        inputs: Dict[str, Any] = {}
+        for name in names:
+            key = name.upper()
+            if key not in self.variables:
+                raise KeyError(f"El programa {self.program.name} no usa la variable {name}")
+            inputs[key] = np.asarray(table[name])
+        lengths = {len(column) for column in inputs.values() if column.ndim}
+        if len(lengths) > 1:
+            raise ValueError(f"Las columnas de la tabla tienen largos distintos: {sorted(lengths)}")
+        rows = lengths.pop() if lengths else 1
+
+        results = {name: np.empty(rows, np.int32 if type_name == "INTEGER" else np.float64)
+                   for name, type_name in self.variables.items()}
+        with np.errstate(all="ignore"):
+            for first in range(0, rows, chunk_rows):
+                last = min(first + chunk_rows, rows)
+                chunk = _Chunk(np, self.variables, self._columns(np, inputs, first, last), first)
+                chunk.execute(self.program.statements)
+                for name, column in chunk.columns.items():
+                    results[name][first:last] = column
+        return results
+
+    def _columns(self, np, inputs: Dict[str, Any], first: int, last: int) -> Dict[str, Any]:
+        """Columnas iniciales del bloque [first, last), ya con el tipo de
+        cada variable."""
+        converter = _Chunk(np, self.variables, {}, first)
+        columns = {}
+        for name, type_name in self.variables.items():
+            dtype = np.int64 if type_name == "INTEGER" else np.float64
+            if name not in inputs:
+                columns[name] = np.zeros(last - first, dtype)
+                continue
+            column = inputs[name]
+            column = column[first:last] if column.ndim else np.full(last - first, column)
+            if type_name == "REAL":
+                column = column.astype(np.float64)
+            elif column.dtype.kind == "f":
+                column = converter.real_to_integer(column)
+            else:
+                column = converter.wrap_integer(column)
+            columns[name] = column
+        return columns
+
+
+def run_vectorized(program: Program, table: Any,
+                   chunk_rows: int = DEFAULT_CHUNK_ROWS) -> Dict[str, Any]:
+    return VectorizedProgram(program).run(table, chunk_rows)
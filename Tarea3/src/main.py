@@ -1,4 +1,5 @@
 from lexer.lexer_engine import Lexer, Token
+from lexer.token_buffer import TokenBuffer
 
 def test_lexer_with_fortran_code():
     # Ejemplo de código Fortran 77
@@ -33,18 +34,17 @@ def test_lexer_from_file():
         print(fortran_code)
         print("\n=== ANÁLISIS LÉXICO ===")
         
-        lexer = Lexer(fortran_code)
+        # Los archivos .f/.for usan formato fijo (columnas 1-5, 6 y 7-72)
+        lexer = Lexer(fortran_code, fixed_form=True)
         
-        tokens = list(lexer.tokens())
+        # Buffer columnar: evita un objeto Token por lexema en archivos grandes
+        tokens = TokenBuffer.from_lexer(lexer)
         
         # Mostrar estadísticas
         print(f"\nTotal de tokens: {len(tokens)}")
         
         # Contar por categorías
-        categories = {}
-        for token in tokens:
-            cat = token.category.value
-            categories[cat] = categories.get(cat, 0) + 1
+        categories = tokens.category_counts()
         
         print("\nTokens por categoría:")
         for cat, count in sorted(categories.items()):
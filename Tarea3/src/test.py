@@ -1,4 +1,5 @@
 from lexer import Lexer, TokenRegistry, Parser
+from lexer.tracing import DescentPrinter
 
 fortran_code = """
       PROGRAM CALC
@@ -21,9 +22,9 @@ lexer.recompile_pattern() # Recompilar el patrón regex si se añadieron ops/key
 
 # 2. Ejecución del Parser
 try:
-    parser = Parser(lexer)
-    result = parser.parse_programa()
-    print(result)
+    parser = Parser(lexer, listener=DescentPrinter())
+    programa = parser.parse_programa()
+    print(f"\nPrograma '{programa.name}' parseado con éxito.")
 
 except SyntaxError as e:
     print(f"\n¡FALLA DE PARSEO! Error: {e}")
\ No newline at end of file
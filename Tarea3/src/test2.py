@@ -5,12 +5,14 @@ from lexer import Lexer, TokenRegistry, Parser
 
 
 registry = TokenRegistry()
+# Un solo lexer configurado atiende todas las entradas: el patrón compilado
+# se obtiene una vez de la caché y tokenize() no guarda estado por texto.
+lexer = Lexer(registry=registry)
 
 for i in string.ascii_uppercase:
     texto = f"PROGRAM {i}afasdfa"
-    lexer = Lexer(texto, registry)
 
     print(i, end=": ")
-    for token in lexer.tokens():
+    for token in lexer.tokenize(texto):
         print(token)
     
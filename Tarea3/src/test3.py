@@ -1,4 +1,5 @@
 from lexer import LL1Parser, Lexer, TokenRegistry, Parser
+from lexer.tracing import LL1Printer
 
 
 fortran_code = """
@@ -21,7 +22,7 @@ lexer.recompile_pattern()  # Recompilar el patrón regex si se añadieron ops/ke
 
 
 try:
-    ll1_parser = LL1Parser(lexer)
+    ll1_parser = LL1Parser(lexer, listener=LL1Printer())
     result = ll1_parser.parse()
     print(result)
 except SyntaxError as e:
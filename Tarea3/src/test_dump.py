@@ -0,0 +1,52 @@
+"""Volcados de tokens entre Tarea2 y Tarea3.
+
+Las dos copias de lexer/token_dump.py tienen que ser iguales y cada árbol
+tiene que leer lo que escribe el otro. Los dos paquetes se llaman lexer, así
+que cada árbol corre en su propio proceso (python -m lexer.token_dump).
+
+    python test_dump.py      (desde Tarea3/src; también funciona con pytest)
+"""
+import os
+import subprocess
+import sys
+import tempfile
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+TREES = {
+    "Tarea2": (os.path.join(HERE, os.pardir, os.pardir, "Tarea2", "src"),
+               os.path.join(HERE, os.pardir, os.pardir, "Tarea2", "recurso.src")),
+    "Tarea3": (HERE, os.path.join(HERE, os.pardir, "recurso.f")),
+}
+
+
+def token_dump(tree: str, *args: str) -> str:
+    result = subprocess.run([sys.executable, "-m", "lexer.token_dump", *args],
+                            cwd=TREES[tree][0], capture_output=True, text=True, check=True)
+    return result.stdout
+
+
+def test_copias_iguales():
+    copies = []
+    for src, _ in TREES.values():
+        with open(os.path.join(src, "lexer", "token_dump.py"), encoding="utf-8") as file:
+            copies.append(file.read())
+    assert copies[0] == copies[1], "Las copias de lexer/token_dump.py difieren"
+
+
+def test_volcados_cruzados():
+    with tempfile.TemporaryDirectory() as directory:
+        for writer, (_, source) in TREES.items():
+            path = os.path.join(directory, f"{writer}.dump")
+            token_dump(writer, "write", os.path.abspath(source), path)
+            expected = token_dump(writer, "read", path)
+            assert expected, f"El volcado de {writer} está vacío"
+            for reader in TREES:
+                assert token_dump(reader, "read", path) == expected, \
+                    f"{reader} no lee igual el volcado de {writer}"
+                print(f"{writer} -> {reader}: {expected.count(chr(10))} tokens")
+
+
+if __name__ == "__main__":
+    test_copias_iguales()
+    test_volcados_cruzados()
+    print("Volcados compatibles entre los dos árboles")